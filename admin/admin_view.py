@@ -1,28 +1,36 @@
 import io
 import sys
 import os
-import numpy as np
-from matplotlib import pyplot as plt
 import tkinter as tk
 from tkinter import ttk
 import customtkinter as ctk
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
 # Add parent directory to path so we can import from other modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import customtkinter as ctk
 from tkinter import ttk, messagebox, filedialog
 from PIL import Image
-import subprocess
 import re
 import csv
 import datetime
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from admin.admin_nav import AdminNavigation
-from config_db import connect_db
-from utils_file import hash_password, read_login_file, write_login_file
+from admin import report_export, report_jobs, table_sync
+from repositories import accounts, catalog, reports
+import query_stats
+import router
+import session
+import tasks
+import ui_profiler
+
+# Most products an inventory search lists, best matches first
+INVENTORY_SEARCH_LIMIT = 500
+# Seconds before the newest change shown that inventory refreshes read again
+INVENTORY_WATERMARK_OVERLAP = 2
+# Most orders the sales report lists; totals and the graph cover the whole period
+SALES_PREVIEW_LIMIT = 500
+# Daily sales bars get value labels up to this many days
+MAX_LABELLED_BARS = 31
+
 class AdminNavigationExtended(AdminNavigation):
     def _init_(self, parent_frame, admin_app):
         self.admin_app = admin_app
@@ -97,7 +105,7 @@ class AdminApp:
         if username and username != "login":
             if not self.get_user_info(username):
                 messagebox.showerror("Authentication Error", "You need admin privileges to access this page.")
-                self.root.destroy()
+                router.navigate("landing")
                 return
             
             # Setup UI for authenticated admin
@@ -106,10 +114,10 @@ class AdminApp:
             # Default to inventory management on startup
             self.show_inventory_management()
         else:
-            # Try to read from login file first
-            username_from_file, role = read_login_file()
-            if username_from_file and role == "admin":
-                if self.get_user_info(username_from_file):
+            # Use the session's login if an admin is already logged in
+            session_username, role = session.get_user()
+            if session_username and role == "admin":
+                if self.get_user_info(session_username):
                     # Setup UI for authenticated admin
                     self.setup_main_ui()
                     # Default to inventory management on startup
@@ -238,24 +246,12 @@ class AdminApp:
         return reports_path
             
     def logout(self):
-        # Remove the user file when logging out
-        if os.path.exists("current_user.txt"):
-            os.remove("current_user.txt")
-        
-        self.root.destroy()
-        subprocess.run(["python", os.path.join(os.path.dirname(os.path.dirname(__file__)), "login_signup.py")])
+        session.logout()
+        router.navigate("login")
     
     def get_user_info(self, username):
         try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute(
-                "SELECT user_id, username, first_name, last_name, role FROM Users WHERE username = %s",
-                (username,)
-            )
-            
-            user = cursor.fetchone()
+            user = accounts.get_user(username)
             if user:
                 self.current_user["user_id"] = user["user_id"]
                 self.current_user["username"] = user["username"]
@@ -263,9 +259,6 @@ class AdminApp:
                 self.current_user["last_name"] = user["last_name"]
                 self.current_user["role"] = user["role"]
                 
-                # Save user info for other scripts
-                write_login_file(user["username"], user["role"])
-                
                 # Check if user is admin
                 if user["role"] != "admin":
                     messagebox.showerror("Access Denied", "You don't have admin privileges.")
@@ -277,10 +270,6 @@ class AdminApp:
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return False
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def setup_login_ui(self):
         # Main frame with modern design similar to user login
@@ -444,19 +433,8 @@ class AdminApp:
             messagebox.showwarning("Input Error", "Please enter both username and password.")
             return
         
-        # Hash the password
-        hashed_password = hash_password(password)
-        
         try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute(
-                "SELECT user_id, first_name, last_name, role, status FROM Users WHERE username = %s AND password = %s",
-                (username, hashed_password)
-            )
-            
-            user = cursor.fetchone()
+            user = accounts.authenticate(username, password)
             
             if user and user["role"] == "admin":
                 # Check if admin account is active
@@ -471,8 +449,8 @@ class AdminApp:
                 self.current_user["last_name"] = user["last_name"]
                 self.current_user["role"] = user["role"]
                 
-                # Save login info for other scripts
-                write_login_file(username, user["role"])
+                # Remember the login for the other screens
+                session.login(username, user["role"])
                 
                 messagebox.showinfo("Success", f"Welcome {user['first_name']} {user['last_name']}!")
                 
@@ -490,14 +468,9 @@ class AdminApp:
                 
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def back_to_main(self):
-        self.root.destroy()
-        subprocess.run(["python", os.path.join(os.path.dirname(os.path.dirname(__file__)), "main.py")])
+        router.navigate("landing")
     
     def setup_main_ui(self):
         # Main frame
@@ -518,6 +491,9 @@ class AdminApp:
         # Using a scrollable frame to handle overflow content automatically
         self.content_frame = ctk.CTkScrollableFrame(self.main_frame, fg_color="white", corner_radius=15)
         self.content_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Hidden query statistics panel
+        self.root.bind(query_stats.SHORTCUT, self.show_query_stats)
     
     def clear_content_frame(self):
         # Destroy all widgets in the content frame
@@ -708,6 +684,12 @@ class AdminApp:
         
         self.inventory_table.bind("<Double-1>", self.edit_product)
         
+        # Rows by product_id, so refreshes only touch the products that changed
+        self.inventory_rows = table_sync.KeyedTable(self.inventory_table)
+        self.inventory_table.tag_configure("inactive", background="#f1f5f9")
+        self.inventory_watermark = None
+        self.inventory_search_term = None
+        
         action_frame = ctk.CTkFrame(self.inventory_section, fg_color="transparent")
         action_frame.pack(fill="x", padx=20, pady=10)
         
@@ -736,74 +718,94 @@ class AdminApp:
         refresh_btn.pack(side="right")
         
         self.refresh_inventory_table()
-    def fetch_inventory(self, search_term=None):
-        try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            if search_term:
-                cursor.execute(
-                    "SELECT product_id, name, price, stock, status FROM Products WHERE name LIKE %s ORDER BY name",
-                    (f"%{search_term}%",)
-                )
-            else:
-                cursor.execute("SELECT product_id, name, price, stock, status FROM Products ORDER BY name")
-            
-            products = cursor.fetchall()
-            return products
-        except Exception as err:
-            messagebox.showerror("Database Error", str(err))
-            return []
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
+    def fetch_inventory(self, search_term=None, since=None):
+        """Products for the inventory table; runs on a worker thread.
+
+        Without a search term, only the products changed at or after `since`
+        are read if it is given (through idx_products_updated_at), along with
+        the ids of all products, which show which were deleted.
+        """
+        if search_term:
+            # Ranked search over all products, whatever their status
+            products = catalog.search_inventory(search_term, INVENTORY_SEARCH_LIMIT)
+            return {"products": products, "search_term": search_term, "complete": True}
+        
+        products, product_ids = catalog.inventory(since)
+        watermark = max((product["updated_at"] for product in products), default=None)
+        return {"products": products, "search_term": None, "complete": since is None,
+                "watermark": watermark, "product_ids": product_ids}
     
     def search_inventory(self):
         search_term = self.inventory_search.get().strip()
         self.refresh_inventory_table(search_term)
     
     def refresh_inventory_table(self, search_term=None):
-        # Clear existing items
-        for item in self.inventory_table.get_children():
-            self.inventory_table.delete(item)
-        
-        # Fetch and display products
-        products = self.fetch_inventory(search_term)
-        
-        for product in products:
+        """Bring the inventory table up to date in the background.
+
+        After a full load, refreshes without a search term only read the
+        products changed since the newest change already shown.
+        """
+        if getattr(self, "inventory_task", None):
+            self.inventory_task.cancel()
+        
+        since = None
+        if not search_term and not self.inventory_search_term and self.inventory_watermark is not None:
+            # Re-read a little before the watermark for changes that committed late
+            since = self.inventory_watermark - datetime.timedelta(seconds=INVENTORY_WATERMARK_OVERLAP)
+        
+        self.inventory_task = tasks.run(self.fetch_inventory, search_term, since,
+                                        on_done=self.show_inventory_rows, owner=self.inventory_table,
+                                        loading=self.inventory_table.master if since is None else None)
+    
+    @ui_profiler.timed()
+    def show_inventory_rows(self, result):
+        """Apply fetched products to the table, changing only the rows that differ"""
+        products = result["products"]
+        search_term = result["search_term"]
+        
+        rows = {}
+        for rank, product in enumerate(products):
             product_id = product["product_id"]
-            name = product["name"]
             price = f"${float(product['price']):.2f}"
-            stock = product["stock"]
             status = product["status"].capitalize()
             
             # Set row color based on status
             tag = "inactive" if status.lower() != "active" else ""
             
-            self.inventory_table.insert("", "end", values=(name, price, stock, status, ""), tags=(str(product_id), tag))
+            # Search results keep their ranking, the full list is sorted by name
+            sort_key = rank if search_term else product["name"].casefold()
+            rows[product_id] = (sort_key, (product["name"], price, product["stock"], status, ""),
+                                (str(product_id), tag))
         
-        # Configure tag colors
-        self.inventory_table.tag_configure("inactive", background="#f1f5f9")
+        if bool(search_term) != bool(self.inventory_search_term):
+            # Search ranks and names can't be sorted together
+            self.inventory_rows.clear()
+        self.inventory_search_term = search_term
+        # Until all rows are applied the watermark doesn't describe the table
+        previous_watermark, self.inventory_watermark = self.inventory_watermark, None
+        
+        def finished():
+            if search_term:
+                return
+            # Rows of products deleted elsewhere since the last refresh
+            for product_id in [key for key in self.inventory_rows.rows if key not in result["product_ids"]]:
+                self.inventory_rows.remove(product_id)
+            if len(self.inventory_rows) == len(result["product_ids"]):
+                self.inventory_watermark = max(
+                    (w for w in (result["watermark"], previous_watermark) if w is not None), default=None
+                )
+            elif not result["complete"]:
+                # Products the refresh missed; start again with a full load
+                self.refresh_inventory_table()
+        
+        self.inventory_rows.sync(rows, complete=result["complete"], on_finished=finished)
     def update_product_status(self, product_id, status):
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            cursor.execute(
-                "UPDATE Products SET status = %s WHERE product_id = %s",
-                (status, product_id)
-            )
-            
-            connection.commit()
+            catalog.set_status(product_id, status)
             return True
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return False
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     def toggle_product_status(self):
         selected_items = self.inventory_table.selection()
         if not selected_items:
@@ -893,30 +895,15 @@ class AdminApp:
                 messagebox.showwarning("Input Error", "Price and Stock must be numeric values.")
                 return False
             
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            # Check if product with same name already exists
-            cursor.execute("SELECT product_id FROM Products WHERE name = %s", (name,))
-            if cursor.fetchone():
-                messagebox.showwarning("Input Error", f"Product '{name}' already exists.")
-                return False
-            
-            # Insert new product with image data
-            cursor.execute(
-                "INSERT INTO Products (name, price, stock, image, status) VALUES (%s, %s, %s, %s, %s)",
-                (name, price_val, stock_val, self.selected_image_data, "active")
-            )
-            
-            connection.commit()
+            # Stored with the image's pre-scaled thumbnail
+            catalog.add_product(name, price_val, stock_val, self.selected_image_data)
             return True
+        except catalog.DuplicateProductError:
+            messagebox.showwarning("Input Error", f"Product '{name}' already exists.")
+            return False
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return False
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def update_product(self, product_id, name, price, stock, status="active"):
         if not name or not price or not stock:
@@ -941,31 +928,15 @@ class AdminApp:
                 messagebox.showwarning("Input Error", "Price and Stock must be numeric values.")
                 return False
             
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            # Check if another product with same name exists
-            cursor.execute("SELECT product_id FROM Products WHERE name = %s AND product_id != %s", 
-                        (name, product_id))
-            if cursor.fetchone():
-                messagebox.showwarning("Input Error", f"Another product with name '{name}' already exists.")
-                return False
-            
-            # Update product with image data
-            cursor.execute(
-                "UPDATE Products SET name = %s, price = %s, stock = %s, image = %s, status = %s WHERE product_id = %s",
-                (name, price_val, stock_val, self.selected_image_data, status, product_id)
-            )
-            
-            connection.commit()
+            # Stored with the image's pre-scaled thumbnail
+            catalog.update_product(product_id, name, price_val, stock_val, self.selected_image_data, status)
             return True
+        except catalog.DuplicateProductError:
+            messagebox.showwarning("Input Error", f"Another product with name '{name}' already exists.")
+            return False
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return False
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def edit_product(self, event):
         """Open an improved dialog to edit product details with properly visible buttons"""
@@ -1391,63 +1362,27 @@ class AdminApp:
         # Delete the product
         if self.delete_product(product_id):
             messagebox.showinfo("Success", f"Product '{product_name}' deleted successfully!")
+            self.inventory_rows.remove(product_id)
             self.refresh_inventory_table()
             self.clear_product_fields()
     def fetch_product_details(self, product_id):
         """Fetch complete product details from the database"""
         try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute(
-                "SELECT * FROM Products WHERE product_id = %s",
-                (product_id,)
-            )
-            
-            product = cursor.fetchone()
-            
-            cursor.close()
-            connection.close()
-            
-            return product if product else {}
+            return catalog.product_details(product_id) or {}
         except Exception as e:
             print(f"Error fetching product details: {e}")
             return {}
     
     def delete_product(self, product_id):
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            # First check if product is referenced in any cart
-            cursor.execute(
-                "SELECT COUNT(*) FROM CartItems WHERE product_id = %s",
-                (product_id,)
-            )
-            
-            count = cursor.fetchone()[0]
-            if count > 0:
-                messagebox.showwarning(
-                    "Cannot Delete", 
-                    "This product is in active carts or orders. Consider marking it as out of stock instead."
-                )
-                return False
-            
-            # Delete the product
-            cursor.execute(
-                "DELETE FROM Products WHERE product_id = %s",
-                (product_id,)
-            )
-            
-            connection.commit()
+            catalog.delete_product(product_id)
             return True
+        except catalog.ProductInUseError as err:
+            messagebox.showwarning("Cannot Delete", str(err))
+            return False
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return False
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     def show_user_management(self):
         self.clear_content_frame()
         self.current_view = "users"  # Set current view for resize handling
@@ -1704,6 +1639,7 @@ class AdminApp:
         self.test_users_display = test_users_display.__get__(self, self.__class__)
         
         # Now update the refresh_users_table method to properly handle your data
+        @ui_profiler.timed("refresh_users_table")
         def updated_refresh_users_table(self, search_term=None):
             """Updated method to properly display users in the table"""
             # Clear existing items
@@ -1779,23 +1715,11 @@ class AdminApp:
     def update_user_status(self, user_id, status):
         """Update user status in database"""
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            cursor.execute(
-                "UPDATE Users SET status = %s WHERE user_id = %s",
-                (status, user_id)
-            )
-            
-            connection.commit()
+            accounts.set_status(user_id, status)
             return True
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return False
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
 
     def refresh_users_table(self, search_term=None):
         """Refresh the users table with data from the database"""
@@ -1850,47 +1774,6 @@ class AdminApp:
         # Make sure table is visible and update display
         self.users_table.update()
 
-    def fetch_users(self, search_term=None):
-        """Fetch users from database with optional search filter"""
-        try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            if search_term:
-                # Add wildcard characters to the search term for partial matching
-                search_pattern = f"%{search_term}%"
-                
-                # Search through first name, last name, username, and email
-                cursor.execute(
-                    """
-                    SELECT user_id, first_name, last_name, username, email, role, status 
-                    FROM Users 
-                    WHERE first_name LIKE %s OR last_name LIKE %s 
-                    OR username LIKE %s OR email LIKE %s
-                    ORDER BY role, first_name, last_name
-                    """,
-                    (search_pattern, search_pattern, search_pattern, search_pattern)
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT user_id, first_name, last_name, username, email, role, status 
-                    FROM Users 
-                    ORDER BY role, first_name, last_name
-                    """
-                )
-            
-            users = cursor.fetchall()
-            return users
-        except Exception as err:
-            print(f"Error fetching users: {err}")  # Add print for debugging
-            messagebox.showerror("Database Error", str(err))
-            return []
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
-
     def search_users(self):
         """Search users based on input text"""
         search_term = self.user_search.get().strip()
@@ -1950,45 +1833,8 @@ class AdminApp:
             self.user_search.delete(0, 'end')
             self.refresh_users_table()
     def fetch_users(self, search_term=None):
-        """Fetch users from database with optional search filter"""
-        try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            if search_term:
-                # Add wildcard characters to the search term for partial matching
-                search_pattern = f"%{search_term}%"
-                
-                # Search through first name, last name, username, and email
-                cursor.execute(
-                    """
-                    SELECT user_id, first_name, last_name, username, email, role, status 
-                    FROM Users 
-                    WHERE first_name LIKE %s OR last_name LIKE %s 
-                    OR username LIKE %s OR email LIKE %s
-                    ORDER BY role, first_name, last_name
-                    """,
-                    (search_pattern, search_pattern, search_pattern, search_pattern)
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT user_id, first_name, last_name, username, email, role, status 
-                    FROM Users 
-                    ORDER BY role, first_name, last_name
-                    """
-                )
-            
-            users = cursor.fetchall()
-            return users
-        except Exception as err:
-            print(f"Error fetching users: {err}")  # Add print for debugging
-            messagebox.showerror("Database Error", str(err))
-            return []
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
+        """Fetch users from database with optional search filter; runs on a worker thread"""
+        return accounts.list_users(search_term)
     def setup_users_table(self, table_frame):
         """Create and configure the users table with proper columns and styling"""
         # Create a custom style for the treeview
@@ -2042,39 +1888,11 @@ class AdminApp:
         print(f"Debug: Searching for users with term: '{search_term}'")
         
         try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            # Test database connection
-            print("Debug: Testing database connection...")
-            if not connection or not connection.is_connected():
-                print("Debug: Failed to connect to database")
-                return
-            print("Debug: Database connection successful")
-            
             # Get total users count (sanity check)
-            cursor.execute("SELECT COUNT(*) as count FROM Users")
-            total_count = cursor.fetchone()["count"]
-            print(f"Debug: Total users in database: {total_count}")
+            print(f"Debug: Total users in database: {accounts.count_users()}")
             
             if search_term:
-                # Add wildcard characters to the search term for partial matching
-                search_pattern = f"%{search_term}%"
-                
-                # Test search query
-                print(f"Debug: Testing search with pattern: '{search_pattern}'")
-                query = """
-                    SELECT user_id, first_name, last_name, username, email, role, status 
-                    FROM Users 
-                    WHERE first_name LIKE %s OR last_name LIKE %s 
-                    OR username LIKE %s OR email LIKE %s
-                    ORDER BY role, first_name, last_name
-                """
-                
-                print(f"Debug: Executing query: {query}")
-                cursor.execute(query, (search_pattern, search_pattern, search_pattern, search_pattern))
-                
-                users = cursor.fetchall()
+                users = accounts.list_users(search_term)
                 print(f"Debug: Found {len(users)} users matching the search criteria")
                 
                 # Print out each matching user (with sensitive info redacted)
@@ -2090,37 +1908,19 @@ class AdminApp:
             
         except Exception as err:
             print(f"Debug ERROR: {err}")
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
 
     def repair_user_table(self):
         """Fix common issues with user table structure"""
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
             print("Checking Users table structure...")
+            column_added, rows_updated = accounts.repair_status_column()
             
-            # Check if status column exists
-            cursor.execute("SHOW COLUMNS FROM Users LIKE 'status'")
-            has_status_column = cursor.fetchone() is not None
-            
-            if not has_status_column:
-                print("Adding missing 'status' column to Users table...")
-                cursor.execute("ALTER TABLE Users ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'active'")
-                connection.commit()
+            if column_added:
                 print("Status column added successfully")
             else:
                 print("Status column exists in Users table")
-            
-            # Set status to active for any NULL values
-            cursor.execute("UPDATE Users SET status = 'active' WHERE status IS NULL")
-            rows_updated = cursor.rowcount
             if rows_updated > 0:
                 print(f"Fixed {rows_updated} users with NULL status values")
-                connection.commit()
             
             print("User table repair completed")
             messagebox.showinfo("Repair Complete", "User table structure has been checked and repaired if needed.")
@@ -2128,10 +1928,45 @@ class AdminApp:
         except Exception as err:
             print(f"Repair ERROR: {err}")
             messagebox.showerror("Repair Failed", f"An error occurred: {err}")
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
+
+    def show_query_stats(self, event=None):
+        """Per-query latency summary (development tool, opened with query_stats.SHORTCUT)"""
+        if not query_stats.ENABLED:
+            messagebox.showinfo("Query Statistics",
+                                "Query statistics are off. Start the app with SUPERMARKET_QUERY_STATS=1 to record them.")
+            return
+        
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title("Query Statistics")
+        dialog.geometry("1000x600")
+        
+        info_label = ctk.CTkLabel(dialog, text=f"Slow-query log: {query_stats.SLOW_QUERY_LOG}",
+                                 font=("Arial", 12), text_color="gray")
+        info_label.pack(anchor="w", padx=20, pady=(15, 5))
+        
+        summary_text = ctk.CTkTextbox(dialog, font=("Courier", 12), wrap="none")
+        summary_text.pack(fill="both", expand=True, padx=20, pady=5)
+        
+        def refresh():
+            summary_text.configure(state="normal")
+            summary_text.delete("1.0", "end")
+            summary_text.insert("1.0", query_stats.summary(limit=100))
+            summary_text.configure(state="disabled")
+        
+        def reset():
+            query_stats.reset()
+            refresh()
+        
+        button_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        button_frame.pack(fill="x", padx=20, pady=(5, 15))
+        
+        for text, command in [("Refresh", refresh), ("Reset", reset),
+                              ("Print to Console", query_stats.dump_summary)]:
+            button = ctk.CTkButton(button_frame, text=text, fg_color="#6b7280", hover_color="#4b5563",
+                                  font=("Arial", 12), height=30, width=140, command=command)
+            button.pack(side="left", padx=(0, 10))
+        
+        refresh()
 
     # Optional: Add a debug button to the admin interface
     def add_debug_button(self, parent_frame):
@@ -2178,48 +2013,30 @@ class AdminApp:
             self.refresh_users_table()
             return
         
-        # Clear existing items in the table
-        for item in self.users_table.get_children():
-            self.users_table.delete(item)
-        
-        # Fetch and display users matching the search term
-        users = self.fetch_users(search_term)
-        
-        if not users:
+        self.refresh_users_table(search_term)
+    
+    @ui_profiler.timed()
+    def refresh_users_table(self, search_term=None):
+        """Reload the users table (optionally filtered) in the background"""
+        if getattr(self, "users_task", None):
+            self.users_task.cancel()
+        self.users_task = tasks.run(self.fetch_users, search_term,
+                                    on_done=lambda users: self.show_user_rows(users, search_term),
+                                    owner=self.users_table, loading=self.users_table.master)
+    
+    @ui_profiler.timed()
+    def show_user_rows(self, users, search_term=None):
+        if search_term and not users:
             # No users found - show a message
             messagebox.showinfo("Search Results", "No users found matching your search criteria.")
             # Reset to show all users
             self.refresh_users_table()
             return
         
-        # Display the filtered users
-        for user in users:
-            user_id = user["user_id"]
-            full_name = f"{user['first_name']} {user['last_name']}"
-            email = user.get("email", user["username"])
-            if "@" not in email and email:
-                email = f"{email}@example.com"  # Add domain if missing
-            role = user["role"].capitalize()
-            status = user.get("status", "active").capitalize()  # Get status with default
-            
-            # Set row color based on status
-            tag = "inactive" if status.lower() != "active" else ""
-            
-            self.users_table.insert("", "end", values=(full_name, email, role, status, ""), 
-                                tags=(str(user_id), tag))
-        
-        # Configure tag colors
-        self.users_table.tag_configure("inactive", background="#f1f5f9")
-        
-    def refresh_users_table(self, search_term=None):
-        """Refresh the users table with current data"""
         # Clear existing items
         for item in self.users_table.get_children():
             self.users_table.delete(item)
         
-        # Fetch and display users
-        users = self.fetch_users(search_term)
-        
         for user in users:
             user_id = user["user_id"]
             full_name = f"{user['first_name']} {user['last_name']}"
@@ -2288,44 +2105,16 @@ class AdminApp:
             messagebox.showwarning("Input Error", "Please fill out all required fields.")
             return False
         
-        # Create username from email (part before @)
-        username = email.split('@')[0]
-        
-        # Hash the password
-        hashed_password = hash_password(password)
-        
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            # Check if username already exists
-            cursor.execute(
-                "SELECT user_id FROM Users WHERE username = %s",
-                (username,)
-            )
-            
-            if cursor.fetchone():
-                messagebox.showwarning("Input Error", "A user with this username already exists.")
-                return False
-            
-            # Insert new user
-            cursor.execute(
-                """
-                INSERT INTO Users (first_name, last_name, username, email, password, role) 
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """,
-                (first_name, last_name, username, email, hashed_password, role)
-            )
-            
-            connection.commit()
+            # The username is the part of the email before the @
+            accounts.add_user(first_name, last_name, email, role, password)
             return True
+        except accounts.DuplicateUsernameError as err:
+            messagebox.showwarning("Input Error", str(err))
+            return False
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return False
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def open_edit_user_dialog(self, event):
         selected_items = self.users_table.selection()
@@ -2442,27 +2231,10 @@ class AdminApp:
     
     def fetch_user_details(self, user_id):
         try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute(
-                """
-                SELECT user_id, first_name, last_name, username, email, role 
-                FROM Users 
-                WHERE user_id = %s
-                """,
-                (user_id,)
-            )
-            
-            user = cursor.fetchone()
-            return user
+            return accounts.user_details(user_id)
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return None
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def save_user_edits(self, user_id):
         first_name = self.edit_first_name.get().strip()
@@ -2479,46 +2251,17 @@ class AdminApp:
             messagebox.showwarning("Input Error", "Please enter a valid email address.", parent=self.edit_dialog)
             return
         
-        # Create username from email (part before @)
-        username = email.split('@')[0]
-        
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            # Check if username already exists for another user
-            cursor.execute(
-                "SELECT user_id FROM Users WHERE username = %s AND user_id != %s",
-                (username, user_id)
-            )
-            
-            if cursor.fetchone():
-                messagebox.showwarning("Input Error", 
-                                      "Another user with this username already exists.", 
-                                      parent=self.edit_dialog)
-                return
-            
-            # Update user
-            cursor.execute(
-                """
-                UPDATE Users 
-                SET first_name = %s, last_name = %s, username = %s, email = %s, role = %s 
-                WHERE user_id = %s
-                """,
-                (first_name, last_name, username, email, role, user_id)
-            )
-            
-            connection.commit()
+            # The username follows the email (the part before the @)
+            accounts.update_user(user_id, first_name, last_name, email, role)
             messagebox.showinfo("Success", "User updated successfully!")
             self.edit_dialog.destroy()
             self.refresh_users_table()
             
+        except accounts.DuplicateUsernameError as err:
+            messagebox.showwarning("Input Error", str(err), parent=self.edit_dialog)
         except Exception as err:
             messagebox.showerror("Database Error", str(err), parent=self.edit_dialog)
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def delete_selected_user(self):
         selected_items = self.users_table.selection()
@@ -2553,38 +2296,14 @@ class AdminApp:
     
     def delete_user(self, user_id):
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            # Check if user has orders or carts
-            cursor.execute("SELECT COUNT(*) FROM Orders WHERE user_id = %s", (user_id,))
-            order_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM Carts WHERE user_id = %s", (user_id,))
-            cart_count = cursor.fetchone()[0]
-            
-            if order_count > 0 or cart_count > 0:
-                messagebox.showwarning(
-                    "Cannot Delete", 
-                    "This user has orders or carts. Consider deactivating their account instead."
-                )
-                return False
-            
-            # Delete the user
-            cursor.execute(
-                "DELETE FROM Users WHERE user_id = %s",
-                (user_id,)
-            )
-            
-            connection.commit()
+            accounts.delete_user(user_id)
             return True
+        except accounts.UserInUseError as err:
+            messagebox.showwarning("Cannot Delete", str(err))
+            return False
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return False
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def reset_selected_password(self):
         selected_items = self.users_table.selection()
@@ -2613,27 +2332,11 @@ class AdminApp:
     
     def reset_password(self, user_id, default_password="password123"):
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            # Hash the default password
-            hashed_password = hash_password(default_password)
-            
-            # Update user's password
-            cursor.execute(
-                "UPDATE Users SET password = %s WHERE user_id = %s",
-                (hashed_password, user_id)
-            )
-            
-            connection.commit()
+            accounts.reset_password(user_id, default_password)
             return True
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return False
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     def show_report_generation(self):
         self.clear_content_frame()
         self.current_view = "reports"
@@ -2643,17 +2346,81 @@ class AdminApp:
                                 font=("Arial", 24, "bold"), text_color="#2563eb")
         header_label.pack(anchor="w", padx=30, pady=(30, 20))
 
-        # Create tabview for different report types - ONLY TWO TABS
+        # Reports are generated as background jobs, so several can run while the admin keeps working
+        self.report_jobs = report_jobs.ReportScheduler()
+        self.sales_data = None
+        self.inventory_data = None
+        self.setup_report_jobs_panel()
+
+        # Create tabview for different report types
         self.report_tabview = ctk.CTkTabview(self.content_frame, corner_radius=15, height=600)
         self.report_tabview.pack(fill="both", expand=True, padx=30, pady=10)
 
-        # Create only two tabs - remove User Activity
         sales_tab = self.report_tabview.add("Sales Report")
         inventory_tab = self.report_tabview.add("Inventory Report")
+        user_tab = self.report_tabview.add("User Activity")
 
         # Setup each tab
         self.setup_sales_report_tab(sales_tab)
         self.setup_inventory_report_tab(inventory_tab)
+        self.setup_user_activity_tab(user_tab)
+
+    def setup_report_jobs_panel(self):
+        """Buttons to generate or cancel all reports, and the progress of each one"""
+        jobs_frame = ctk.CTkFrame(self.content_frame, fg_color="#f8fafc", corner_radius=10)
+        jobs_frame.pack(fill="x", padx=30, pady=(0, 10))
+        
+        generate_all_btn = ctk.CTkButton(jobs_frame, text="Generate All Reports",
+                                    fg_color="#10b981", hover_color="#059669",
+                                    font=("Arial", 14), height=35,
+                                    command=self.generate_all_reports)
+        generate_all_btn.pack(side="left", padx=(15, 10), pady=10)
+        
+        self.cancel_reports_btn = ctk.CTkButton(jobs_frame, text="Cancel",
+                                        fg_color="#ef4444", hover_color="#dc2626",
+                                        font=("Arial", 14), height=35, width=90, state="disabled",
+                                        command=self.report_jobs.cancel_all)
+        self.cancel_reports_btn.pack(side="left", padx=(0, 20), pady=10)
+        
+        # One progress bar and status per report job
+        self.report_progress = {}
+        for name, title in [("sales", "Sales"), ("inventory", "Inventory"), ("users", "User Activity")]:
+            job_frame = ctk.CTkFrame(jobs_frame, fg_color="transparent")
+            job_frame.pack(side="left", padx=(0, 20), pady=10)
+            
+            title_label = ctk.CTkLabel(job_frame, text=title, font=("Arial", 12, "bold"))
+            title_label.pack(anchor="w")
+            
+            progress_bar = ctk.CTkProgressBar(job_frame, width=120, progress_color="#3b82f6")
+            progress_bar.set(0)
+            progress_bar.pack(anchor="w", pady=2)
+            
+            status_label = ctk.CTkLabel(job_frame, text="Not started", font=("Arial", 11), text_color="#64748b")
+            status_label.pack(anchor="w")
+            
+            self.report_progress[name] = (progress_bar, status_label)
+
+    def generate_all_reports(self):
+        """Start the sales, inventory and user activity reports at once"""
+        self.generate_sales_report()
+        self.generate_inventory_report()
+        self.generate_user_report()
+
+    def show_report_progress(self, job):
+        """Show the stage a report job is at; called by the job on the main loop"""
+        progress_bar, status_label = self.report_progress[job.name]
+        progress_bar.set(job.progress())
+        
+        if job.status == "running":
+            status_label.configure(text=f"{job.stage.capitalize()}...", text_color="#2563eb")
+        elif job.status == "done":
+            status_label.configure(text="Done", text_color="#10b981")
+        elif job.status == "failed":
+            status_label.configure(text="Failed", text_color="#ef4444")
+        else:
+            status_label.configure(text="Cancelled", text_color="#64748b")
+        
+        self.cancel_reports_btn.configure(state="normal" if self.report_jobs.running() else "disabled")
 
     def setup_sales_report_tab(self, parent_frame):
         # Main container frame
@@ -2938,8 +2705,13 @@ class AdminApp:
                                             font=("Arial", 14), text_color="gray")
         self.inventory_graph_message.pack(expand=True)
 
+    @ui_profiler.timed()
     def preview_inventory_graph(self):
         """Preview inventory data as a graph"""
+        # matplotlib is imported on first use so it doesn't slow down opening the admin panel
+        from matplotlib import pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
         if not self.inventory_data:
             messagebox.showwarning("No Data", "Please generate a report first.")
             return
@@ -2953,7 +2725,7 @@ class AdminApp:
             fig, ax = plt.subplots(figsize=(10, 5), dpi=100)
             
             # Limit to top 10 products for better visualization
-            products = sorted(self.inventory_data, key=lambda x: x['stock'], reverse=True)[:10]
+            products = [self.inventory_data[i] for i in self.inventory_columns.top_stocked(10)]
             
             if not products:
                 raise ValueError("No product data available for visualization")
@@ -2991,11 +2763,10 @@ class AdminApp:
             ax.grid(axis='x', linestyle='--', alpha=0.7)
             
             # Add a summary text
-            total_stock = sum(product['stock'] for product in self.inventory_data)
-            total_products = len(self.inventory_data)
-            total_value = sum(float(product['price']) * product['stock'] for product in self.inventory_data)
+            summary = self.inventory_columns.summary()
             
-            summary_text = f'Total Products: {total_products} | Total Stock: {total_stock} | Total Value: ${total_value:.2f}'
+            summary_text = (f"Total Products: {summary['total_products']} | Total Stock: {summary['total_stock']} | "
+                            f"Total Value: ${summary['total_value']:.2f}")
             plt.figtext(0.5, 0.01, summary_text, ha='center', fontsize=10)
             
             # Ensure tight layout
@@ -3030,14 +2801,89 @@ class AdminApp:
                                             border_width=1, border_color="#e5e7eb")
         self.user_options_panel.pack(side="top", fill="x", expand=False, padx=10, pady=(0, 10))
         
-        # (keep existing options code)
+        # User type selection - Row 1
+        type_frame = ctk.CTkFrame(self.user_options_panel, fg_color="transparent")
+        type_frame.pack(fill="x", padx=15, pady=(15, 5))
+        
+        type_label = ctk.CTkLabel(type_frame, text="Users:", font=("Arial", 14, "bold"))
+        type_label.pack(side="left", padx=(0, 10))
+        
+        self.user_type_var = ctk.StringVar(value="all_users")
+        
+        for text, value in [("All Users", "all_users"), ("Customers", "customers"), ("Admins", "admins")]:
+            radio = ctk.CTkRadioButton(type_frame, text=text, variable=self.user_type_var, value=value)
+            radio.pack(side="left", padx=(0, 10))
+        
+        # Activity and period selection - Row 2
+        activity_frame = ctk.CTkFrame(self.user_options_panel, fg_color="transparent")
+        activity_frame.pack(fill="x", padx=15, pady=5)
+        
+        activity_label = ctk.CTkLabel(activity_frame, text="Activity:", font=("Arial", 14, "bold"))
+        activity_label.pack(side="left", padx=(0, 10))
+        
+        self.user_activity_var = ctk.StringVar(value="all_activity")
+        
+        for text, value in [("Orders", "all_activity"), ("Accounts Only", "accounts")]:
+            radio = ctk.CTkRadioButton(activity_frame, text=text, variable=self.user_activity_var, value=value)
+            radio.pack(side="left", padx=(0, 10))
+        
+        period_label = ctk.CTkLabel(activity_frame, text="Time Period:", font=("Arial", 14, "bold"))
+        period_label.pack(side="left", padx=(20, 10))
+        
+        self.user_period_var = ctk.StringVar(value="last_30_days")
+        
+        for text, value in [("Last 7 Days", "last_7_days"), ("Last 30 Days", "last_30_days"), ("All Time", "all_time")]:
+            radio = ctk.CTkRadioButton(activity_frame, text=text, variable=self.user_period_var, value=value)
+            radio.pack(side="left", padx=(0, 10))
+        
+        # Format and chart selection - Row 3
+        format_frame = ctk.CTkFrame(self.user_options_panel, fg_color="transparent")
+        format_frame.pack(fill="x", padx=15, pady=(5, 15))
+        
+        format_label = ctk.CTkLabel(format_frame, text="Export Format:", font=("Arial", 14, "bold"))
+        format_label.pack(side="left", padx=(0, 10))
+        
+        self.user_format_var = ctk.StringVar(value="csv")
+        
+        for text, value in [("CSV", "csv"), ("Text", "txt")]:
+            radio = ctk.CTkRadioButton(format_frame, text=text, variable=self.user_format_var, value=value)
+            radio.pack(side="left", padx=(0, 10))
+        
+        chart_label = ctk.CTkLabel(format_frame, text="Chart:", font=("Arial", 14, "bold"))
+        chart_label.pack(side="left", padx=(20, 10))
+        
+        self.user_chart_var = ctk.StringVar(value="bar")
+        
+        for text, value in [("Bar", "bar"), ("Pie", "pie"), ("Line", "line")]:
+            radio = ctk.CTkRadioButton(format_frame, text=text, variable=self.user_chart_var, value=value)
+            radio.pack(side="left", padx=(0, 10))
         
         # Bottom panel - Buttons and Preview
         self.user_preview_panel = ctk.CTkFrame(report_frame, fg_color="#f8fafc", corner_radius=10,
                                             border_width=1, border_color="#e5e7eb")
         self.user_preview_panel.pack(side="top", fill="both", expand=True, padx=10, pady=(10, 0))
         
-        # (keep existing buttons code)
+        # Action buttons
+        buttons_frame = ctk.CTkFrame(self.user_preview_panel, fg_color="transparent")
+        buttons_frame.pack(fill="x", padx=15, pady=(10, 0))
+        
+        generate_btn = ctk.CTkButton(buttons_frame, text="Generate Report",
+                                fg_color="#10b981", hover_color="#059669",
+                                font=("Arial", 14), height=35,
+                                command=self.generate_user_report)
+        generate_btn.pack(side="left", padx=(0, 10))
+        
+        self.preview_user_graph_btn = ctk.CTkButton(buttons_frame, text="Preview Graph",
+                                            fg_color="#3b82f6", hover_color="#2563eb",
+                                            font=("Arial", 14), height=35, state="disabled",
+                                            command=self.preview_user_graph)
+        self.preview_user_graph_btn.pack(side="left", padx=(0, 10))
+        
+        self.user_download_btn = ctk.CTkButton(buttons_frame, text="Download Report",
+                                        fg_color="#6366f1", hover_color="#4f46e5",
+                                        font=("Arial", 14), height=35, state="disabled",
+                                        command=self.download_user_report)
+        self.user_download_btn.pack(side="left")
         
         # Tab view for switching between graph and text preview
         self.user_tabs = ctk.CTkTabview(self.user_preview_panel, corner_radius=5,
@@ -3119,72 +2965,22 @@ class AdminApp:
         self.user_summary_label.pack(pady=10, padx=10, anchor="w")
         
         # Store report data
-        self.user_report_data = None
         self.user_data = None
 
-    def generate_user_report(self):
-        # Clear existing data
-        for item in self.user_table.get_children():
-            self.user_table.delete(item)
-        
-        # Simulate generating report data (replace with actual data logic)
-        sample_data = [
-            ("2", "2025-04-23 18:51", "jashwanth vemula", "completed", "$6.00"),
-            ("3", "2025-04-23 23:44", "jashwanth vemula", "completed", "$14.00")
-        ]
-        for row in sample_data:
-            self.user_table.insert("", "end", values=row)
-        
-        # Store data for download
-        self.user_report_data = sample_data
-        self.user_download_btn.configure(state="normal")
-
-    def download_user_report(self):
-        if self.user_report_data:
-            import csv
-            format_type = self.user_format_var.get()
-            if format_type == "csv":
-                with open("user_activity_report.csv", "w", newline="") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["Order ID", "Date", "Customer", "Status", "Total Amount"])
-                    writer.writerows(self.user_report_data)
-                print("Report downloaded as user_activity_report.csv")
-            elif format_type == "txt":
-                with open("user_activity_report.txt", "w") as f:
-                    f.write("Order ID,Date,Customer,Status,Total Amount\n")
-                    for row in self.user_report_data:
-                        f.write(",".join(row) + "\n")
-                print("Report downloaded as user_activity_report.txt")
-            elif format_type == "pdf":
-                
-                pdf = SimpleDocTemplate("user_activity_report.pdf", pagesize=letter)
-                table_data = [["Order ID", "Date", "Customer", "Status", "Total Amount"]] + list(self.user_report_data)
-                table = Table(table_data)
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 14),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 12),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ]))
-                pdf.build([table])
-                print("Report downloaded as user_activity_report.pdf")
-        else:
-            print("No report data to download")
-
     def toggle_custom_date_range(self):
         """Show or hide custom date range based on selection"""
         if self.sales_period_var.get() == "custom_range":
             self.custom_date_frame.pack(fill="x", padx=20, pady=(0, 10))
         else:
             self.custom_date_frame.pack_forget()
+    @ui_profiler.timed()
     def preview_user_graph(self):
+        # matplotlib and numpy are imported on first use so they don't slow down opening the admin panel
+        import numpy as np
+        from matplotlib import pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from admin import report_columns
+        
         if not self.user_data:
             messagebox.showwarning("No Data", "Please generate a report first.")
             return
@@ -3213,15 +3009,15 @@ class AdminApp:
 
             # Prepare data for visualization
             # Limit to top 15 users for better visualization, sorted by spending
-            data_to_show = self.user_data
-            if len(data_to_show) > 15:
-                sorted_data = sorted(data_to_show, key=lambda x: sum(float(o['total_amount']) for o in x.get('orders', [])), reverse=True)
-                data_to_show = sorted_data[:15]
+            columns = self.user_columns
+            if len(self.user_data) > 15:
+                rows = columns.top_spenders(15)
+            else:
+                rows = np.arange(len(self.user_data))
+            data_to_show = [self.user_data[row] for row in rows]
 
             names = [f"{user['first_name']} {user['last_name']}"[:15] + '...' if len(f"{user['first_name']} {user['last_name']}") > 15 else f"{user['first_name']} {user['last_name']}" for user in data_to_show]
-            orders_count = [len(user.get('orders', [])) for user in data_to_show]
-            total_spent = [sum(float(order['total_amount']) for order in user.get('orders', [])) for user in data_to_show]
-            roles = [user['role'] for user in data_to_show]
+            total_spent = columns.total_spent[rows]
 
             if chart_type == "bar":
                 bars = ax.barh(names, total_spent, color='#3b82f6')
@@ -3239,14 +3035,7 @@ class AdminApp:
 
             elif chart_type == "pie":
                 # Show spending distribution by role (like sales pie chart by status)
-                role_spending = {}
-                for user in data_to_show:
-                    role = user['role']
-                    spent = sum(float(order['total_amount']) for order in user.get('orders', []))
-                    if role in role_spending:
-                        role_spending[role] += spent
-                    else:
-                        role_spending[role] = spent
+                role_spending = columns.spend_by_role(rows)
 
                 labels = list(role_spending.keys())
                 values = list(role_spending.values())
@@ -3277,16 +3066,11 @@ class AdminApp:
 
             elif chart_type == "line":
                 # Plot spending trend over time (like sales line chart)
-                date_totals = {}
-                for user in data_to_show:
-                    for order in user.get('orders', []):
-                        date_str = order['order_date'].strftime("%Y-%m-%d")
-                        if date_str in date_totals:
-                            date_totals[date_str] += float(order['total_amount'])
-                        else:
-                            date_totals[date_str] = float(order['total_amount'])
+                shown_orders = np.isin(columns.orders.user_id, columns.user_id[rows])
+                days, totals, _ = report_columns.group_sum(columns.orders.day[shown_orders],
+                                                           columns.orders.total_amount[shown_orders])
 
-                if not date_totals:
+                if len(days) == 0:
                     self.user_graph_message = ctk.CTkLabel(self.user_graph_frame,
                                                         text="No order data available for visualization",
                                                         font=("Arial", 14), text_color="gray")
@@ -3294,9 +3078,7 @@ class AdminApp:
                     plt.close(fig)
                     return
 
-                sorted_dates = sorted(date_totals.keys())
-                totals = [date_totals[date] for date in sorted_dates]
-                display_dates = [date.split('-')[1] + '/' + date.split('-')[2] for date in sorted_dates]
+                display_dates = [str(day)[5:7] + '/' + str(day)[8:10] for day in days]
 
                 ax.plot(display_dates, totals, marker='o', linestyle='-', color='#3b82f6', linewidth=2)
                 ax.set_title('User Spending Trend')
@@ -3305,9 +3087,10 @@ class AdminApp:
                 ax.grid(True, linestyle='--', alpha=0.7)
 
             # Add data summary
-            total_users = len(self.user_data)
-            total_orders = sum(len(user.get('orders', [])) for user in self.user_data)
-            total_spent_all = sum(sum(float(order['total_amount']) for order in user.get('orders', [])) for user in self.user_data)
+            summary = columns.totals()
+            total_users = summary['total_users']
+            total_orders = summary['total_orders']
+            total_spent_all = summary['total_spent']
             avg_spent = total_spent_all / total_users if total_users > 0 else 0
 
             title_text = f'Total Users: {total_users} | Orders: {total_orders} | '
@@ -3331,162 +3114,99 @@ class AdminApp:
             print(f"Graph error: {e}")
 
     def generate_sales_report(self):
-        """Generate a simplified sales report for demo purposes"""
-        try:
-            # Clear the existing table
-            for item in self.sales_preview_table.get_children():
-                self.sales_preview_table.delete(item)
-            
-            # For testing, create some sample data if fetch_sales_data is not working
-            if not hasattr(self, 'fetch_sales_data'):
-                # Create sample data for display
-                self.sales_data = [
-                    {
-                        'order_id': 1,
-                        'order_date': datetime.datetime.now() - datetime.timedelta(days=5),
-                        'first_name': 'John',
-                        'last_name': 'Doe',
-                        'status': 'completed',
-                        'total_amount': 125.75
-                    },
-                    {
-                        'order_id': 2,
-                        'order_date': datetime.datetime.now() - datetime.timedelta(days=3),
-                        'first_name': 'Jane',
-                        'last_name': 'Smith',
-                        'status': 'pending',
-                        'total_amount': 89.99
-                    },
-                    {
-                        'order_id': 3,
-                        'order_date': datetime.datetime.now() - datetime.timedelta(days=1),
-                        'first_name': 'Robert',
-                        'last_name': 'Johnson',
-                        'status': 'completed',
-                        'total_amount': 210.50
-                    }
-                ]
-            else:
-                # Use the period selected to fetch real data
-                period = self.sales_period_var.get()
-                today = datetime.datetime.now()
-                
-                if period == "last_7_days":
-                    from_date = today - datetime.timedelta(days=7)
-                elif period == "last_30_days":
-                    from_date = today - datetime.timedelta(days=30)
-                elif period == "this_year":
-                    from_date = datetime.datetime(today.year, 1, 1)
-                else:
-                    from_date = today - datetime.timedelta(days=30)  # Default to 30 days
-                    
-                self.sales_data = self.fetch_sales_data(from_date, today)
-            
-            # If we still don't have data, show a message
-            if not self.sales_data:
-                self.sales_summary_label.configure(text="No sales data found for the selected period.")
-                self.sales_download_btn.configure(state="disabled")
-                return
-            
-            # Populate the table with data
-            for order in self.sales_data:
-                order_id = order['order_id']
-                date = order['order_date'].strftime("%Y-%m-%d %H:%M")
-                customer = f"{order['first_name']} {order['last_name']}"
-                status = order['status'].capitalize()
-                total = f"${float(order['total_amount']):.2f}"
-                
-                # Add with tag based on status for conditional formatting
-                status_tag = status.lower()
-                self.sales_preview_table.insert("", "end", values=(order_id, date, customer, status, total), tags=(status_tag,))
-            
-            # Configure tags for different statuses
-            self.sales_preview_table.tag_configure("completed", background="#d1fae5")  # Green for completed
-            self.sales_preview_table.tag_configure("pending", background="#fef3c7")    # Yellow for pending
-            self.sales_preview_table.tag_configure("cancelled", background="#fee2e2")  # Red for cancelled
-            
-            # Update summary
-            total_orders = len(self.sales_data)
-            total_sales = sum(float(order['total_amount']) for order in self.sales_data)
-            
-            self.sales_summary_label.configure(
-                text=f"Total Orders: {total_orders} | Total Revenue: ${total_sales:.2f}"
-            )
-            
-            # Enable download button
-            self.sales_download_btn.configure(state="normal")
-            
-            # Show success message
-            messagebox.showinfo("Success", "Sales report has been generated successfully.")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
-            print(f"Error in generate_sales_report: {e}")
+        """Generate the sales report of the selected period as a background job"""
+        period = self.sales_period_var.get()
+        today = datetime.datetime.now()
+        
+        if period == "last_7_days":
+            from_date = today - datetime.timedelta(days=7)
+        elif period == "last_30_days":
+            from_date = today - datetime.timedelta(days=30)
+        elif period == "this_year":
+            from_date = datetime.datetime(today.year, 1, 1)
+        else:
+            from_date = today - datetime.timedelta(days=30)  # Default to 30 days
+        # Whole days, so the order list agrees with the daily totals
+        from_date = datetime.datetime.combine(from_date.date(), datetime.time.min)
+        
+        # Downloads export the same period as the preview
+        self.sales_report_period = (from_date, today)
+        
+        self.report_jobs.start("sales", [
+            ("query", self.fetch_sales_data),
+            ("aggregate", self.aggregate_sales_report),
+            ("format", self.format_sales_report),
+            ("render", self.show_sales_report),
+        ], from_date, today, on_progress=self.show_report_progress, on_error=self.report_failed,
+            owner=self.sales_preview_table, loading=self.sales_preview_table.master)
+    
+    def aggregate_sales_report(self, sales):
+        """Totals of the period from its daily rows; runs on a worker thread"""
+        orders, days = sales
+        total_orders = sum(order_count for _, order_count, _ in days)
+        total_sales = sum(float(day_total) for _, _, day_total in days)
+        return {
+            "orders": orders,
+            "days": days,
+            "total_orders": total_orders,
+            "total_sales": total_sales,
+            "avg_daily": total_sales / len(days) if days else 0,
+        }
+    
+    def format_sales_report(self, report):
+        """Table rows and summary text of the sales preview; runs on a worker thread"""
+        rows = []
+        for order in report["orders"]:
+            order_id = order['order_id']
+            date = order['order_date'].strftime("%Y-%m-%d %H:%M")
+            customer = f"{order['first_name']} {order['last_name']}"
+            status = order['status'].capitalize()
+            total = f"${float(order['total_amount']):.2f}"
+            
+            # Tag based on status for conditional formatting
+            rows.append(((order_id, date, customer, status, total), status.lower()))
+        report["rows"] = rows
+        
+        # The summary comes from the daily totals, which cover every order of the period
+        summary = (f"Total Orders: {report['total_orders']} | Total Revenue: ${report['total_sales']:.2f} | "
+                   f"Average Daily: ${report['avg_daily']:.2f}")
+        if report["total_orders"] > len(rows):
+            summary += f" (showing the latest {len(rows)} orders)"
+        report["summary"] = summary
+        return report
+    
+    @ui_profiler.timed()
+    def show_sales_report(self, report):
+        self.sales_data = report["orders"]
+        self.sales_days = report["days"]
+        
+        # Clear the existing table
+        for item in self.sales_preview_table.get_children():
+            self.sales_preview_table.delete(item)
+        
+        # If there is no data, show a message
+        if not self.sales_data:
+            self.sales_summary_label.configure(text="No sales data found for the selected period.")
+            self.sales_download_btn.configure(state="disabled")
+            return
+        
+        # Populate the table with data
+        for values, status_tag in report["rows"]:
+            self.sales_preview_table.insert("", "end", values=values, tags=(status_tag,))
+        
+        # Configure tags for different statuses
+        self.sales_preview_table.tag_configure("completed", background="#d1fae5")  # Green for completed
+        self.sales_preview_table.tag_configure("pending", background="#fef3c7")    # Yellow for pending
+        self.sales_preview_table.tag_configure("cancelled", background="#fee2e2")  # Red for cancelled
+        
+        self.sales_summary_label.configure(text=report["summary"])
+        
+        # Enable download button
+        self.sales_download_btn.configure(state="normal")
 
     def fetch_sales_data(self, from_date, to_date):
-        """Fetch sales data from database for given period"""
-        try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            # Format dates for SQL query
-            from_date_str = from_date.strftime("%Y-%m-%d %H:%M:%S") if from_date else None
-            to_date_str = to_date.strftime("%Y-%m-%d %H:%M:%S") if to_date else None
-            
-            # Query to get orders in date range
-            if from_date and to_date:
-                cursor.execute("""
-                    SELECT o.order_id, u.username, u.first_name, u.last_name, 
-                        o.order_date, o.total_amount, o.status
-                    FROM Orders o
-                    JOIN Users u ON o.user_id = u.user_id
-                    WHERE o.order_date BETWEEN %s AND %s
-                    ORDER BY o.order_date DESC
-                """, (from_date_str, to_date_str))
-            elif from_date:
-                cursor.execute("""
-                    SELECT o.order_id, u.username, u.first_name, u.last_name, 
-                        o.order_date, o.total_amount, o.status
-                    FROM Orders o
-                    JOIN Users u ON o.user_id = u.user_id
-                    WHERE o.order_date >= %s
-                    ORDER BY o.order_date DESC
-                """, (from_date_str,))
-            else:
-                cursor.execute("""
-                    SELECT o.order_id, u.username, u.first_name, u.last_name, 
-                        o.order_date, o.total_amount, o.status
-                    FROM Orders o
-                    JOIN Users u ON o.user_id = u.user_id
-                    ORDER BY o.order_date DESC
-                """)
-            
-            orders = cursor.fetchall()
-            
-            # If we have orders, fetch details for each order
-            if orders:
-                for order in orders:
-                    # Get items in this order
-                    cursor.execute("""
-                        SELECT p.name, ci.quantity, p.price
-                        FROM CartItems ci
-                        JOIN Products p ON ci.product_id = p.product_id
-                        WHERE ci.cart_id = (
-                            SELECT cart_id FROM Orders WHERE order_id = %s
-                        )
-                    """, (order['order_id'],))
-                    
-                    order['items'] = cursor.fetchall()
-            
-            return orders
-            
-        except Exception as err:
-            messagebox.showerror("Database Error", str(err))
-            return []
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
+        """Fetch the latest orders and the daily totals of the period; runs on a worker thread"""
+        return reports.sales_report(from_date, to_date, limit=SALES_PREVIEW_LIMIT)
 
     def format_sales_data(self, sales_data, format_type):
         """Format sales data for display and download with proper tabular formatting"""
@@ -3550,9 +3270,14 @@ class AdminApp:
                 report += row + "\n"
             
             return report
+    @ui_profiler.timed()
     def preview_sales_graph(self):
         """Preview sales data as a graph"""
-        if not self.sales_data:
+        # matplotlib is imported on first use so it doesn't slow down opening the admin panel
+        from matplotlib import pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
+        if not getattr(self, "sales_days", None):
             messagebox.showwarning("No Data", "Please generate a report first.")
             return
         
@@ -3564,34 +3289,26 @@ class AdminApp:
             # Create a figure with appropriate size
             fig, ax = plt.subplots(figsize=(10, 5), dpi=100)
             
-            # Group data by date
-            date_totals = {}
-            for order in self.sales_data:
-                date_str = order['order_date'].strftime("%Y-%m-%d")
-                if date_str in date_totals:
-                    date_totals[date_str] += float(order['total_amount'])
-                else:
-                    date_totals[date_str] = float(order['total_amount'])
-            
-            # Sort dates
-            sorted_dates = sorted(date_totals.keys())
-            if not sorted_dates:
-                raise ValueError("No date data available for visualization")
-                
-            # Get values for each date
-            values = [date_totals[date] for date in sorted_dates]
+            # One bar per day with orders, straight from the DailySales rollup (oldest first)
+            values = [float(day_total) for _, _, day_total in self.sales_days]
             
             # Format dates for display (MM/DD)
-            display_dates = [f"{date[5:7]}/{date[8:10]}" for date in sorted_dates]
+            display_dates = [sales_date.strftime("%m/%d") for sales_date, _, _ in self.sales_days]
             
             # Create bar chart
             bars = ax.bar(display_dates, values, color='#3b82f6')
             
-            # Add value labels on top of bars
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                        f'${height:.2f}', ha='center', va='bottom', fontsize=9)
+            # Add value labels on top of bars while they still fit
+            if len(bars) <= MAX_LABELLED_BARS:
+                for bar in bars:
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+                            f'${height:.2f}', ha='center', va='bottom', fontsize=9)
+            else:
+                # Only every few dates on the axis, or they overlap
+                step = len(display_dates) // MAX_LABELLED_BARS + 1
+                ax.set_xticks(range(0, len(display_dates), step))
+                ax.set_xticklabels(display_dates[::step])
             
             # Add labels and title
             ax.set_xlabel('Date (MM/DD)')
@@ -3662,180 +3379,97 @@ class AdminApp:
         if not filename:
             return
         
-        try:
-            # Format data based on selected format
-            if ext == "csv":
-                # CSV format
-                with open(filename, 'w', newline='') as file:
-                    file.write("Order ID,Date,Customer,Status,Total Amount\n")
-                    
-                    for order in self.sales_data:
-                        order_id = str(order['order_id'])
-                        date = order['order_date'].strftime("%Y-%m-%d %H:%M")
-                        customer = f"{order['first_name']} {order['last_name']}"
-                        status = order['status']
-                        total = f"${float(order['total_amount']):.2f}"
-                        
-                        file.write(f"{order_id},{date},{customer},{status},{total}\n")
-            else:
-                # Text format with better tabular structure
-                with open(filename, 'w') as file:
-                    file.write("SALES REPORT\n")
-                    file.write("=" * 80 + "\n\n")
-                    
-                    # Write summary
-                    total_sales = sum(float(order['total_amount']) for order in self.sales_data)
-                    file.write(f"Total Orders: {len(self.sales_data)}\n")
-                    file.write(f"Total Revenue: ${total_sales:.2f}\n\n")
-                    
-                    # Write header
-                    file.write(f"{'Order ID':<10}{'Date':<20}{'Customer':<30}{'Status':<15}{'Total':<10}\n")
-                    file.write("-" * 80 + "\n")
-                    
-                    # Write data rows
-                    for order in self.sales_data:
-                        order_id = str(order['order_id'])
-                        date = order['order_date'].strftime("%Y-%m-%d %H:%M")
-                        customer = f"{order['first_name']} {order['last_name']}"
-                        status = order['status']
-                        total = f"${float(order['total_amount']):.2f}"
-                        
-                        file.write(f"{order_id:<10}{date:<20}{customer:<30}{status:<15}{total:<10}\n")
-            
-            # Show success message
-            messagebox.showinfo("Success", f"Report saved to:\n{os.path.basename(filename)}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save report: {str(e)}")
+        # Streamed straight from the database to the file, in the background
+        from_date, to_date = self.sales_report_period
+        tasks.run(report_export.export_sales, filename, ext, from_date, to_date,
+                  on_done=lambda count: self.report_saved(filename),
+                  on_error=self.report_save_failed, loading=self.sales_preview_table.master)
+    
+    def report_saved(self, filename):
+        messagebox.showinfo("Success", f"Report saved to:\n{os.path.basename(filename)}")
+    
+    def report_save_failed(self, error):
+        messagebox.showerror("Error", f"Failed to save report: {str(error)}")
+    
+    def report_failed(self, error):
+        print(f"Error generating report: {error}")
+        messagebox.showerror("Error", f"Failed to generate report: {str(error)}")
 
-            
     def generate_inventory_report(self):
-        """Generate a simplified inventory report for demo purposes"""
-        try:
-            # Clear the existing table
-            for item in self.inventory_preview_table.get_children():
-                self.inventory_preview_table.delete(item)
-            
-            # For testing, create some sample data if fetch_inventory_data is not working
-            if not hasattr(self, 'fetch_inventory_data'):
-                # Create sample data for display
-                self.inventory_data = [
-                    {
-                        'product_id': 1,
-                        'name': 'Organic Apples',
-                        'price': 2.99,
-                        'stock': 45
-                    },
-                    {
-                        'product_id': 2,
-                        'name': 'Whole Grain Bread',
-                        'price': 3.49,
-                        'stock': 12
-                    },
-                    {
-                        'product_id': 3,
-                        'name': 'Milk (1 Gallon)',
-                        'price': 4.25,
-                        'stock': 8
-                    },
-                    {
-                        'product_id': 4,
-                        'name': 'Cheddar Cheese',
-                        'price': 5.99,
-                        'stock': 0
-                    }
-                ]
+        """Generate the inventory report with the selected settings as a background job"""
+        report_type = self.inventory_type_var.get()
+        sort_by = self.inventory_sort_var.get()
+        
+        self.inventory_report_options = (report_type, sort_by)
+        
+        self.report_jobs.start("inventory", [
+            ("query", reports.inventory_report),
+            ("aggregate", self.aggregate_inventory_report),
+            ("format", self.format_inventory_report),
+            ("render", self.show_inventory_report),
+        ], report_type, sort_by, on_progress=self.show_report_progress, on_error=self.report_failed,
+            owner=self.inventory_preview_table, loading=self.inventory_preview_table.master)
+    
+    def aggregate_inventory_report(self, inventory_data):
+        """Stock values and summary of the products; runs on a worker thread"""
+        from admin import report_columns
+        
+        columns = report_columns.ProductColumns.from_rows(inventory_data)
+        return {"products": inventory_data, "columns": columns, "totals": columns.summary()}
+    
+    def format_inventory_report(self, report):
+        """Table rows and summary text of the inventory preview; runs on a worker thread"""
+        rows = []
+        for product, value in zip(report["products"], report["columns"].values()):
+            product_id = product['product_id']
+            name = product['name']
+            price = f"${float(product['price']):.2f}"
+            stock = product['stock']
+            value_str = f"${value:.2f}"
+            
+            # Tag based on stock level for conditional formatting
+            if stock == 0:
+                stock_tag = "out_of_stock"
+            elif stock <= 10:
+                stock_tag = "low_stock"
             else:
-                # Use the settings to fetch real data
-                report_type = self.inventory_type_var.get()
-                sort_by = self.inventory_sort_var.get()
-                self.inventory_data = self.fetch_inventory_data(report_type, sort_by)
-            
-            # If we still don't have data, show a message
-            if not self.inventory_data:
-                self.inventory_summary_label.configure(text="No inventory data found.")
-                self.inventory_download_btn.configure(state="disabled")
-                return
-            
-            # Populate the table with data
-            for product in self.inventory_data:
-                product_id = product['product_id']
-                name = product['name']
-                price = f"${float(product['price']):.2f}"
-                stock = product['stock']
-                value = float(product['price']) * product['stock']
-                value_str = f"${value:.2f}"
-                
-                # Add with tag based on stock level for conditional formatting
-                if stock == 0:
-                    stock_tag = "out_of_stock"
-                elif stock <= 10:
-                    stock_tag = "low_stock"
-                else:
-                    stock_tag = "in_stock"
-                    
-                self.inventory_preview_table.insert("", "end", 
-                                                values=(product_id, name, price, stock, value_str), 
-                                                tags=(stock_tag,))
-            
-            # Configure tags for different stock levels
-            self.inventory_preview_table.tag_configure("out_of_stock", background="#fee2e2") # Red for out of stock
-            self.inventory_preview_table.tag_configure("low_stock", background="#fef3c7")    # Yellow for low stock
-            self.inventory_preview_table.tag_configure("in_stock", background="#d1fae5")     # Green for in stock
-            
-            # Update summary
-            total_products = len(self.inventory_data)
-            total_value = sum(float(product['price']) * product['stock'] for product in self.inventory_data)
-            out_of_stock = sum(1 for product in self.inventory_data if product['stock'] == 0)
-            low_stock = sum(1 for product in self.inventory_data if 0 < product['stock'] <= 10)
-            
-            self.inventory_summary_label.configure(
-                text=f"Total Products: {total_products} | Total Value: ${total_value:.2f} | Out of Stock: {out_of_stock} | Low Stock: {low_stock}"
-            )
-            
-            # Enable download button
-            self.inventory_download_btn.configure(state="normal")
-            
-            # Show success message
-            messagebox.showinfo("Success", "Inventory report has been generated successfully.")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
-            print(f"Error in generate_inventory_report: {e}")
-    def fetch_inventory_data(self, report_type, sort_by):
-        """Fetch inventory data from database"""
-        try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            # Prepare SQL based on report type and sort order
-            query = "SELECT product_id, name, price, stock, image FROM Products"
-            
-            # Filter by report type
-            if report_type == "low_stock":
-                query += " WHERE stock <= 10 AND stock > 0"
-            elif report_type == "out_of_stock":
-                query += " WHERE stock = 0"
-            
-            # Add sort order
-            if sort_by == "name":
-                query += " ORDER BY name"
-            elif sort_by == "price":
-                query += " ORDER BY price DESC"
-            elif sort_by == "stock":
-                query += " ORDER BY stock"
-            
-            cursor.execute(query)
-            products = cursor.fetchall()
-            
-            return products
-            
-        except Exception as err:
-            messagebox.showerror("Database Error", str(err))
-            return []
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
+                stock_tag = "in_stock"
+            rows.append(((product_id, name, price, stock, value_str), stock_tag))
+        report["rows"] = rows
+        
+        totals = report["totals"]
+        report["summary"] = (f"Total Products: {totals['total_products']} | Total Value: ${totals['total_value']:.2f} | "
+                             f"Out of Stock: {totals['out_of_stock']} | Low Stock: {totals['low_stock']}")
+        return report
+    
+    @ui_profiler.timed()
+    def show_inventory_report(self, report):
+        self.inventory_data = report["products"]
+        self.inventory_columns = report["columns"]
+        
+        # Clear the existing table
+        for item in self.inventory_preview_table.get_children():
+            self.inventory_preview_table.delete(item)
+        
+        # If there is no data, show a message
+        if not self.inventory_data:
+            self.inventory_summary_label.configure(text="No inventory data found.")
+            self.inventory_download_btn.configure(state="disabled")
+            return
+        
+        # Populate the table with data
+        for values, stock_tag in report["rows"]:
+            self.inventory_preview_table.insert("", "end", values=values, tags=(stock_tag,))
+        
+        # Configure tags for different stock levels
+        self.inventory_preview_table.tag_configure("out_of_stock", background="#fee2e2") # Red for out of stock
+        self.inventory_preview_table.tag_configure("low_stock", background="#fef3c7")    # Yellow for low stock
+        self.inventory_preview_table.tag_configure("in_stock", background="#d1fae5")     # Green for in stock
+        
+        self.inventory_summary_label.configure(text=report["summary"])
+        
+        # Enable download button
+        self.inventory_download_btn.configure(state="normal")
 
     def save_product_edits(self, product_id):
         """Save product edits with validation and feedback - simplified version"""
@@ -3892,38 +3526,8 @@ class AdminApp:
         self.edit_product_dialog.update()
         
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            # Check if another product with same name exists
-            cursor.execute(
-                "SELECT product_id FROM Products WHERE name = %s AND product_id != %s", 
-                (name, product_id)
-            )
-            if cursor.fetchone():
-                # Remove status indicator
-                status_label.destroy()
-                self.edit_product_dialog.update()
-                
-                messagebox.showwarning("Input Error", 
-                                    f"Another product with name '{name}' already exists.", 
-                                    parent=self.edit_product_dialog)
-                return
-            
-            # Update product with all fields
-            cursor.execute(
-                """
-                UPDATE Products 
-                SET name = %s, price = %s, stock = %s, image = %s, status = %s
-                WHERE product_id = %s
-                """,
-                (name, price_val, stock_val, self.edit_selected_image_data, status, product_id)
-            )
-            
-            connection.commit()
-            
-            cursor.close()
-            connection.close()
+            # Update product with all fields, including the pre-scaled thumbnail
+            catalog.update_product(product_id, name, price_val, stock_val, self.edit_selected_image_data, status)
             
             # Success! Close dialog and refresh inventory
             self.edit_product_dialog.destroy()
@@ -3932,6 +3536,14 @@ class AdminApp:
             # Show success message
             messagebox.showinfo("Success", "Product updated successfully!")
             
+        except catalog.DuplicateProductError:
+            # Remove status indicator
+            status_label.destroy()
+            self.edit_product_dialog.update()
+            
+            messagebox.showwarning("Input Error", 
+                                f"Another product with name '{name}' already exists.", 
+                                parent=self.edit_product_dialog)
         except Exception as e:
             # Remove status indicator
             status_label.destroy()
@@ -4041,65 +3653,17 @@ class AdminApp:
         if not filename:
             return
         
-        try:
-            # Format data based on selected format
-            if ext == "csv":
-                # CSV format
-                with open(filename, 'w', newline='') as file:
-                    file.write("Product ID,Name,Price,Stock,Value\n")
-                    
-                    for product in self.inventory_data:
-                        product_id = str(product['product_id'])
-                        name = product['name'].replace(',', ' ')  # Remove commas to avoid CSV issues
-                        price = f"${float(product['price']):.2f}"
-                        stock = str(product['stock'])
-                        value = f"${float(product['price']) * product['stock']:.2f}"
-                        
-                        file.write(f"{product_id},{name},{price},{stock},{value}\n")
-            else:
-                # Text format with better tabular structure
-                with open(filename, 'w') as file:
-                    file.write("INVENTORY REPORT\n")
-                    file.write("=" * 80 + "\n\n")
-                    
-                    # Write summary
-                    total_products = len(self.inventory_data)
-                    total_value = sum(float(product['price']) * product['stock'] for product in self.inventory_data)
-                    out_of_stock = sum(1 for product in self.inventory_data if product['stock'] == 0)
-                    low_stock = sum(1 for product in self.inventory_data if 0 < product['stock'] <= 10)
-                    
-                    file.write(f"Total Products: {total_products}\n")
-                    file.write(f"Total Inventory Value: ${total_value:.2f}\n")
-                    file.write(f"Out of Stock Items: {out_of_stock}\n")
-                    file.write(f"Low Stock Items: {low_stock}\n\n")
-                    
-                    # Write header
-                    file.write(f"{'ID':<8}{'Name':<30}{'Price':<10}{'Stock':<8}{'Value':<12}\n")
-                    file.write("-" * 80 + "\n")
-                    
-                    # Write data rows
-                    for product in self.inventory_data:
-                        product_id = str(product['product_id'])
-                        name = product['name']
-                        if len(name) > 27:
-                            name = name[:24] + "..."
-                        price = f"${float(product['price']):.2f}"
-                        stock = str(product['stock'])
-                        value = f"${float(product['price']) * product['stock']:.2f}"
-                        
-                        file.write(f"{product_id:<8}{name:<30}{price:<10}{stock:<8}{value:<12}\n")
-            
-            # Show success message
-            messagebox.showinfo("Success", f"Report saved to:\n{os.path.basename(filename)}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save report: {str(e)}")
+        # Streamed straight from the database to the file, in the background
+        report_type, sort_by = self.inventory_report_options
+        tasks.run(report_export.export_inventory, filename, ext, report_type, sort_by,
+                  on_done=lambda count: self.report_saved(filename),
+                  on_error=self.report_save_failed, loading=self.inventory_preview_table.master)
 
     def generate_user_report(self):
-        """Generate user activity report based on selected options"""
+        """Generate the user activity report for the selected options as a background job"""
         user_type = self.user_type_var.get()
         activity_type = self.user_activity_var.get()
         period = self.user_period_var.get()
-        report_format = self.user_format_var.get()
         
         # Define date range based on selected period
         today = datetime.datetime.now()
@@ -4110,14 +3674,58 @@ class AdminApp:
         elif period == "last_30_days":
             from_date = today - datetime.timedelta(days=30)
         
-        # Fetch user data
-        self.user_data = self.fetch_user_data(user_type, activity_type, from_date)
+        self.user_report_options = (user_type, activity_type, from_date)
+        
+        self.report_jobs.start("users", [
+            ("query", reports.user_activity_report),
+            ("aggregate", self.aggregate_user_report),
+            ("format", self.format_user_report),
+            ("render", self.show_user_report),
+        ], user_type, activity_type, from_date, on_progress=self.show_report_progress, on_error=self.report_failed,
+            owner=self.user_table, loading=self.user_table.master)
+    
+    def aggregate_user_report(self, user_data):
+        """Per-user order counts and spend, and the report totals; runs on a worker thread"""
+        from admin import report_columns
+        
+        columns = report_columns.UserColumns(user_data)
+        return {"users": user_data, "columns": columns, "totals": columns.totals(),
+                "role_counts": columns.role_counts()}
+    
+    def format_user_report(self, report):
+        """Table rows and summary text of the user preview; runs on a worker thread"""
+        columns = report["columns"]
+        rows = []
+        for user, orders_count, total_spent in zip(report["users"], columns.orders_count, columns.total_spent):
+            user_id = user['user_id']
+            name = f"{user['first_name']} {user['last_name']}"
+            email = user.get("email", user["username"]) or ""
+            role = user["role"].capitalize()
+            created = user["created_at"].strftime("%Y-%m-%d") if user["created_at"] else "N/A"
+            spent_str = f"${total_spent:.2f}"
+            
+            # Tag based on role for conditional formatting
+            rows.append(((user_id, name, email, role, created, int(orders_count), spent_str), role.lower()))
+        report["rows"] = rows
+        
+        totals = report["totals"]
+        role_counts = report["role_counts"]
+        summary_text = f"Total Users: {totals['total_users']} | "
+        summary_text += f"Admins: {role_counts.get('admin', 0)} | Regular Users: {role_counts.get('user', 0)} | "
+        summary_text += f"Total Orders: {totals['total_orders']} | Total Spent: ${totals['total_spent']:.2f}"
+        report["summary"] = summary_text
+        return report
+    
+    @ui_profiler.timed()
+    def show_user_report(self, report):
+        self.user_data = report["users"]
+        self.user_columns = report["columns"]
+        
+        # Clear the table
+        for item in self.user_table.get_children():
+            self.user_table.delete(item)
         
         if not self.user_data:
-            # Clear the table
-            for item in self.user_table.get_children():
-                self.user_table.delete(item)
-                
             self.user_summary_label.configure(text="No user data found for the selected criteria.")
             self.user_download_btn.configure(state="disabled")
             self.preview_user_graph_btn.configure(state="disabled")
@@ -4130,111 +3738,15 @@ class AdminApp:
             self.user_graph_message.pack(expand=True)
             return
         
-        # Format data for preview and download
-        self.user_report_data = self.format_user_data(self.user_data, report_format)
+        # Add user data to the table
+        for values, role_tag in report["rows"]:
+            self.user_table.insert("", "end", values=values, tags=(role_tag,))
         
-        # Update the table view
-        for item in self.user_table.get_children():
-            self.user_table.delete(item)
-            
-        # Add user data to the table with proper formatting
-        for user in self.user_data:
-            user_id = user['user_id']
-            name = f"{user['first_name']} {user['last_name']}"
-            email = user.get("email", user["username"]) or ""
-            role = user["role"].capitalize()
-            created = user["created_at"].strftime("%Y-%m-%d") if user["created_at"] else "N/A"
-            
-            # Calculate orders stats
-            orders_count = len(user.get("orders", []))
-            total_spent = sum(float(order["total_amount"]) for order in user.get("orders", []))
-            spent_str = f"${total_spent:.2f}"
-            
-            # Insert with tag based on role for conditional formatting
-            self.user_table.insert("", "end", 
-                                values=(user_id, name, email, role, created, orders_count, spent_str),
-                                tags=(role.lower(),))
-        
-        # Update summary
-        total_users = len(self.user_data)
-        admin_count = sum(1 for user in self.user_data if user["role"] == "admin")
-        customer_count = sum(1 for user in self.user_data if user["role"] == "user")
-        total_orders = sum(len(user.get("orders", [])) for user in self.user_data)
-        total_spent = sum(sum(float(order["total_amount"]) for order in user.get("orders", [])) for user in self.user_data)
-        
-        summary_text = f"Total Users: {total_users} | "
-        summary_text += f"Admins: {admin_count} | Regular Users: {customer_count} | "
-        summary_text += f"Total Orders: {total_orders} | Total Spent: ${total_spent:.2f}"
-        
-        self.user_summary_label.configure(text=summary_text)
+        self.user_summary_label.configure(text=report["summary"])
         
         # Enable download and preview buttons
         self.user_download_btn.configure(state="normal")
         self.preview_user_graph_btn.configure(state="normal")
-        
-        # Show success message
-        messagebox.showinfo("Report Generated", "User activity report has been generated successfully. You can now preview the graph or download the report.")
-
-    def fetch_user_data(self, user_type, activity_type, from_date):
-        """Fetch user data from database based on criteria"""
-        try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            # Base query for users
-            user_query = """
-                SELECT user_id, first_name, last_name, username, email, role, created_at
-                FROM Users
-            """
-            
-            # Apply user type filter
-            if user_type == "admins":
-                user_query += " WHERE role = 'admin'"
-            elif user_type == "customers":
-                user_query += " WHERE role = 'user'"
-            
-            user_query += " ORDER BY created_at DESC"
-            
-            # Execute user query
-            cursor.execute(user_query)
-            users = cursor.fetchall()
-            
-            # If requested activity includes orders, get order data
-            if activity_type in ["all_activity", "orders"] and users:
-                for user in users:
-                    # Query to get user's orders
-                    order_query = """
-                        SELECT order_id, order_date, total_amount, status
-                        FROM Orders
-                        WHERE user_id = %s
-                    """
-                    
-                    # Add date filter if needed
-                    if from_date:
-                        order_query += " AND order_date >= %s"
-                        cursor.execute(order_query, (user["user_id"], from_date))
-                    else:
-                        cursor.execute(order_query, (user["user_id"],))
-                    
-                    user["orders"] = cursor.fetchall()
-                    
-                    # Count total orders (including those outside the date range)
-                    cursor.execute(
-                        "SELECT COUNT(*) as total_orders FROM Orders WHERE user_id = %s",
-                        (user["user_id"],)
-                    )
-                    total_orders = cursor.fetchone()
-                    user["total_orders"] = total_orders["total_orders"] if total_orders else 0
-            
-            return users
-            
-        except Exception as err:
-            messagebox.showerror("Database Error", str(err))
-            return []
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
 
     def format_user_data(self, user_data, format_type):
         """Format user data for display and download with proper tabular formatting"""
@@ -4325,7 +3837,7 @@ class AdminApp:
 
     def download_user_report(self):
         """Download user report to file in reports folder"""
-        if not self.user_report_data:
+        if not self.user_data:
             messagebox.showwarning("No Data", "Please generate a report first.")
             return
         
@@ -4356,14 +3868,11 @@ class AdminApp:
         if not filename:
             filename = default_path
         
-        # Save the file
-        try:
-            with open(filename, 'w', newline='') as file:
-                file.write(self.user_report_data)
-            
-            messagebox.showinfo("Success", f"Report saved to {os.path.basename(filename)}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save file: {str(e)}")
+        # Streamed straight from the database to the file, in the background
+        user_type, activity_type, from_date = self.user_report_options
+        tasks.run(report_export.export_user_activity, filename, ext, user_type, activity_type, from_date,
+                  on_done=lambda count: self.report_saved(filename),
+                  on_error=self.report_save_failed, loading=self.user_table.master)
 
     
 if __name__ == "__main__":
@@ -4382,17 +3891,15 @@ if __name__ == "__main__":
             username = sys.argv[1]
             print(f"Starting with username: {username}")  # Debug message
     else:
-        # Try to read from file
-        username, role = read_login_file()
-        if not username or role != "admin":
-            login_mode = True
-            print("No valid admin credentials found, starting in login mode")  # Debug message
+        login_mode = True
+        print("No admin username given, starting in login mode")  # Debug message
     
     # Print debugging information
     print(f"Admin view starting with login_mode={login_mode}")
     
     try:
-        app = AdminApp(root, None if login_mode else username)
+        router.init(root)
+        router.show("admin", username=None if login_mode else username)
         root.mainloop()
     except Exception as e:
         print(f"Error starting AdminApp: {e}")
@@ -0,0 +1,69 @@
+"""One-shot backfill of OrderItems for orders placed before the table existed.
+
+Usage: python admin/backfill_order_items.py [--batch-size 1000]
+
+Orders that already have OrderItems rows are skipped, so the script can be
+stopped and re-run safely. Old orders never recorded what they were sold
+for, so their lines are copied from the cart with the product's current
+name and price - the best information left.
+"""
+import sys
+import os
+import argparse
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_db import db_connection
+
+def backfill_order_items(batch_size=1000):
+    """Copy cart lines into OrderItems for orders that have none; returns the number of orders filled"""
+    filled = 0
+    last_order_id = 0
+
+    with db_connection() as connection:
+        cursor = connection.cursor()
+        try:
+            while True:
+                cursor.execute(
+                    """
+                    SELECT o.order_id FROM Orders o
+                    WHERE o.order_id > %s
+                        AND NOT EXISTS (SELECT 1 FROM OrderItems oi WHERE oi.order_id = o.order_id)
+                    ORDER BY o.order_id
+                    LIMIT %s
+                    """,
+                    (last_order_id, batch_size)
+                )
+                order_ids = [row[0] for row in cursor.fetchall()]
+                if not order_ids:
+                    break
+
+                placeholders = ", ".join(["%s"] * len(order_ids))
+                cursor.execute(
+                    f"""
+                    INSERT INTO OrderItems (order_id, product_id, product_name, unit_price, quantity)
+                    SELECT o.order_id, p.product_id, p.name, p.price, ci.quantity
+                    FROM Orders o
+                    JOIN CartItems ci ON ci.cart_id = o.cart_id
+                    JOIN Products p ON p.product_id = ci.product_id
+                    WHERE o.order_id IN ({placeholders})
+                    """,
+                    order_ids
+                )
+                connection.commit()
+
+                filled += len(order_ids)
+                last_order_id = order_ids[-1]
+                print(f"Backfilled {filled} orders (up to order #{last_order_id})")
+        finally:
+            cursor.close()
+
+    return filled
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    count = backfill_order_items(args.batch_size)
+    print(f"Done, {count} orders backfilled")
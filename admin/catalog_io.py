@@ -0,0 +1,331 @@
+"""Bulk import and export of the product catalog.
+
+Usage:
+    python admin/catalog_io.py import products.csv [--images DIR] [--batch-size 1000] [--workers N] [--restart]
+    python admin/catalog_io.py export products.csv [--images DIR]
+
+Import reads CSV (with a header row) or JSON (a list of objects) with the
+fields name, price, stock and optionally status (active, inactive or
+available, default active) and image (a file name in --images). Products
+are upserted on their unique name: new names are inserted, existing ones
+get the new price, stock and status, and keep their image unless the row
+names a new one.
+Rows that don't validate are reported and skipped.
+
+Rows are written batch_size at a time with executemany, and each batch is
+committed with its search index entries. Images of the next batch are read
+and thumbnailed in a process pool while the current batch is written.
+After every commit the number of input rows done is saved in a progress
+file next to the input, so an interrupted import continues where it
+stopped when run again (--restart starts over). Upserts are idempotent, so
+a batch written again after a crash does no harm.
+
+Export writes every product as CSV; with --images the images are written
+to that directory and named in the image column, so the file can be
+imported again.
+"""
+import sys
+import os
+import io
+import csv
+import json
+import argparse
+from decimal import Decimal, InvalidOperation
+from concurrent.futures import ProcessPoolExecutor
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_db import db_connection
+from product_images import prepare_product_image
+from product_search import index_products
+
+# Products written (and committed) per batch
+BATCH_SIZE = 1000
+# Longest name Products.name holds
+MAX_NAME_LENGTH = 100
+# Products.price is DECIMAL(10,2) and Products.stock an INT
+MAX_PRICE = Decimal(10) ** 8
+MAX_STOCK = 2 ** 31 - 1
+# 'available' is the column default, which the default products still have
+STATUSES = ("active", "inactive", "available")
+# Largest image Products.image (a BLOB) holds
+MAX_IMAGE_BYTES = 65535
+
+FIELDS = ["name", "price", "stock", "status", "image"]
+
+UPSERT_PRODUCTS = """
+    INSERT INTO Products (name, price, stock, status, image, thumbnail, image_hash)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        price = VALUES(price),
+        stock = VALUES(stock),
+        status = VALUES(status),
+        image = COALESCE(VALUES(image), image),
+        thumbnail = COALESCE(VALUES(thumbnail), thumbnail),
+        image_hash = COALESCE(VALUES(image_hash), image_hash)
+"""
+
+class CatalogFormatError(Exception):
+    """Raised when the input file can't be read at all"""
+
+def read_rows(path):
+    """Yield (row number, dict) for every product in a CSV or JSON file"""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as file:
+            products = json.load(file)
+        if not isinstance(products, list):
+            raise CatalogFormatError("A JSON catalog must be a list of objects")
+        for number, product in enumerate(products, start=1):
+            yield number, product
+        return
+
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.DictReader(file)
+        missing = {"name", "price", "stock"} - set(reader.fieldnames or [])
+        if missing:
+            raise CatalogFormatError(f"Missing columns: {', '.join(sorted(missing))}")
+        # Row numbers as a spreadsheet shows them, after the header
+        for number, product in enumerate(reader, start=2):
+            yield number, product
+
+def parse_row(product, images_dir=None):
+    """(name, price, stock, status, image path) of an input row; raises ValueError if invalid"""
+    if not isinstance(product, dict):
+        raise ValueError("not an object with product fields")
+    name = str(product.get("name") or "").strip()
+    if not name:
+        raise ValueError("name is empty")
+    if len(name) > MAX_NAME_LENGTH:
+        raise ValueError(f"name is longer than {MAX_NAME_LENGTH} characters")
+
+    try:
+        # Rounded to cents first, so e.g. 0.001 is checked as the 0.00 it would be stored as
+        price = Decimal(str(product.get("price")).strip().lstrip("$")).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"price {product.get('price')!r} is not a number")
+    if not price.is_finite() or price <= 0:
+        raise ValueError("price must be at least 0.01")
+    if price >= MAX_PRICE:
+        raise ValueError(f"price must be less than {MAX_PRICE}")
+
+    try:
+        stock = int(str(product.get("stock")).strip())
+    except ValueError:
+        raise ValueError(f"stock {product.get('stock')!r} is not a whole number")
+    if stock < 0:
+        raise ValueError("stock cannot be negative")
+    if stock > MAX_STOCK:
+        raise ValueError(f"stock cannot be more than {MAX_STOCK}")
+
+    status = str(product.get("status") or "active").strip().lower()
+    if status not in STATUSES:
+        raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+
+    image_path = None
+    image = str(product.get("image") or "").strip()
+    if image:
+        if not images_dir:
+            raise ValueError("row names an image but no --images directory was given")
+        image_path = os.path.join(images_dir, image)
+
+    return name, price, stock, status, image_path
+
+def load_image(path):
+    """(image bytes, thumbnail, image hash, error) of an image file; runs in a worker process"""
+    if path is None:
+        return None, None, None, None
+    try:
+        with open(path, "rb") as file:
+            image_data = file.read()
+    except OSError as e:
+        return None, None, None, f"can't read image: {e}"
+    if len(image_data) > MAX_IMAGE_BYTES:
+        return None, None, None, f"image is larger than {MAX_IMAGE_BYTES} bytes"
+
+    thumbnail, content_hash = prepare_product_image(image_data)
+    if thumbnail is None:
+        return None, None, None, "image can't be decoded"
+    return image_data, thumbnail, content_hash, None
+
+class ProgressLog:
+    """Number of input rows already imported from a file, kept in a small JSON file"""
+    def __init__(self, source, path=None):
+        self.source = os.path.abspath(source)
+        self.path = path or f"{source}.progress.json"
+        stat = os.stat(source)
+        # An edited input file starts from the beginning again
+        self.identity = {"source": self.source, "size": stat.st_size, "mtime": stat.st_mtime}
+
+    def load(self):
+        """Rows done by an earlier run of the same file, or 0"""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return 0
+        if any(saved.get(key) != value for key, value in self.identity.items()):
+            return 0
+        return saved.get("rows_done", 0)
+
+    def save(self, rows_done):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(dict(self.identity, rows_done=rows_done), file)
+        os.replace(temp_path, self.path)
+
+    def finish(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+def batches(rows, size):
+    """Lists of at most size items from an iterator"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def write_batch(cursor, products):
+    """Upsert product tuples and index their names for search"""
+    cursor.executemany(UPSERT_PRODUCTS, products)
+
+    names = [product[0] for product in products]
+    placeholders = ", ".join(["%s"] * len(names))
+    cursor.execute(f"SELECT product_id, name FROM Products WHERE name IN ({placeholders})", names)
+    # INSERT IGNORE: products that were already indexed keep their entries
+    index_products(cursor, cursor.fetchall())
+
+def import_catalog(path, images_dir=None, batch_size=BATCH_SIZE, workers=None, restart=False):
+    """Import products from a CSV/JSON file; returns (rows written, rows skipped)"""
+    progress = ProgressLog(path)
+    rows_done = 0 if restart else progress.load()
+    if rows_done:
+        print(f"Resuming after {rows_done} rows")
+
+    written = skipped = 0
+    rows = read_rows(path)
+    for _ in range(rows_done):
+        next(rows, None)
+
+    def parsed_batches():
+        """Valid rows per input batch, with the number of input rows each covers"""
+        nonlocal skipped
+        for batch in batches(rows, batch_size):
+            products = []
+            for number, product in batch:
+                try:
+                    products.append(parse_row(product, images_dir))
+                except ValueError as e:
+                    print(f"Row {number} skipped: {e}")
+                    skipped += 1
+            yield len(batch), products
+
+    # Images are decoded and scaled in other processes, so every CPU helps
+    pool = ProcessPoolExecutor(max_workers=workers) if images_dir else None
+
+    def submit(batch):
+        if batch is None:
+            return None
+        input_rows, products = batch
+        paths = [product[4] for product in products]
+        images = pool.map(load_image, paths, chunksize=16) if pool else map(load_image, paths)
+        return input_rows, products, images
+
+    with db_connection() as connection:
+        cursor = connection.cursor()
+        try:
+            pending = parsed_batches()
+            current = submit(next(pending, None))
+            while current is not None:
+                # Start on the next batch's images before writing this one
+                upcoming = submit(next(pending, None))
+
+                input_rows, products, images = current
+                values = []
+                for (name, price, stock, status, image_path), image in zip(products, images):
+                    image_data, thumbnail, content_hash, error = image
+                    if error:
+                        print(f"{name}: {error}; imported without an image")
+                    values.append((name, price, stock, status, image_data, thumbnail, content_hash))
+
+                if values:
+                    write_batch(cursor, values)
+                connection.commit()
+
+                written += len(values)
+                rows_done += input_rows
+                progress.save(rows_done)
+                print(f"Imported {rows_done} rows ({written} written, {skipped} skipped)")
+                current = upcoming
+        finally:
+            cursor.close()
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+    progress.finish()
+    return written, skipped
+
+def image_extension(image_data):
+    """File extension matching the image's format"""
+    from PIL import Image
+    try:
+        return (Image.open(io.BytesIO(image_data)).format or "bin").lower()
+    except Exception:
+        return "bin"
+
+def export_catalog(path, images_dir=None):
+    """Write every product to a CSV file; returns the number of products"""
+    # Imported here so the import command doesn't need the report modules
+    from admin.report_export import stream_rows
+
+    if images_dir:
+        os.makedirs(images_dir, exist_ok=True)
+        query = "SELECT product_id, name, price, stock, status, image, image_hash FROM Products ORDER BY product_id"
+    else:
+        query = "SELECT product_id, name, price, stock, status FROM Products ORDER BY product_id"
+
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDS)
+        for product in stream_rows(query):
+            image = ""
+            if images_dir and product["image"]:
+                image_data = bytes(product["image"])
+                image = f"{product['image_hash'] or product['product_id']}.{image_extension(image_data)}"
+                with open(os.path.join(images_dir, image), "wb") as image_file:
+                    image_file.write(image_data)
+            writer.writerow([product["name"], product["price"], product["stock"], product["status"], image])
+            count += 1
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="upsert products from a CSV or JSON file")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--images", help="directory the image column refers to")
+    import_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    import_parser.add_argument("--workers", type=int, help="image processes (default: one per CPU)")
+    import_parser.add_argument("--restart", action="store_true", help="ignore the progress of an earlier run")
+
+    export_parser = commands.add_parser("export", help="write all products to a CSV file")
+    export_parser.add_argument("file")
+    export_parser.add_argument("--images", help="directory to write the product images to")
+
+    args = parser.parse_args()
+    if args.command == "import":
+        try:
+            written, skipped = import_catalog(args.file, args.images, args.batch_size, args.workers, args.restart)
+        except CatalogFormatError as e:
+            raise SystemExit(f"Can't import {args.file}: {e}")
+        print(f"Done, {written} products written, {skipped} rows skipped")
+    else:
+        count = export_catalog(args.file, args.images)
+        print(f"Done, {count} products exported")
@@ -0,0 +1,67 @@
+"""Rebuild the DailySales rollup from Orders.
+
+Usage: python admin/rebuild_daily_sales.py [--from 2024-01-01] [--to 2024-12-31] [--days-per-batch 31]
+
+Checkout keeps DailySales up to date; run this after orders were inserted,
+changed or deleted some other way (imports, manual fixes). Without --from /
+--to every day from the first order to the last is rebuilt. Days are
+rebuilt and committed --days-per-batch at a time, so checkouts are only
+held up briefly and the script can be stopped and re-run safely.
+"""
+import sys
+import os
+import argparse
+import datetime
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_db import db_connection
+import daily_sales
+
+def rebuild_daily_sales(from_date=None, to_date=None, days_per_batch=31):
+    """Recompute DailySales for the period from Orders; returns the number of days with orders"""
+    days = 0
+
+    with db_connection() as connection:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT DATE(MIN(order_date)), DATE(MAX(order_date)) FROM Orders")
+            first_day, last_day = cursor.fetchone()
+            if first_day is None:
+                # No orders at all: nothing should be left in the rollup either
+                daily_sales.rebuild(cursor, from_date, to_date)
+                connection.commit()
+                return 0
+
+            # Days left over outside the orders' range, e.g. after orders were deleted
+            if from_date is None:
+                cursor.execute("DELETE FROM DailySales WHERE sales_date < %s", (first_day,))
+            if to_date is None:
+                cursor.execute("DELETE FROM DailySales WHERE sales_date > %s", (last_day,))
+            connection.commit()
+
+            start = from_date or first_day
+            end = to_date or last_day
+            while start <= end:
+                batch_end = min(start + datetime.timedelta(days=days_per_batch - 1), end)
+                days += daily_sales.rebuild(cursor, start, batch_end)
+                connection.commit()
+                print(f"Rebuilt {start} to {batch_end}")
+                start = batch_end + datetime.timedelta(days=1)
+        finally:
+            cursor.close()
+
+    return days
+
+def parse_date(value):
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from", dest="from_date", type=parse_date)
+    parser.add_argument("--to", dest="to_date", type=parse_date)
+    parser.add_argument("--days-per-batch", type=int, default=31)
+    args = parser.parse_args()
+
+    count = rebuild_daily_sales(args.from_date, args.to_date, args.days_per_batch)
+    print(f"Done, {count} days with orders")
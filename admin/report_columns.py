@@ -0,0 +1,181 @@
+"""Columnar (NumPy) form of report rows for the admin report tabs.
+
+Query results arrive as lists of dicts. The report totals, group-bys and
+top-N lists are computed here on one array per column instead of Python
+loops over the dicts: rows are converted once, then every statistic is a
+vectorized operation. Money is held as float64, as the report screens
+already print it.
+
+Like repositories.reports, nothing here touches Tk. numpy is imported by
+whoever imports this module, so the admin panel imports it on first use.
+"""
+import numpy as np
+
+# Stock levels the reports flag (matching inventory_filter)
+LOW_STOCK_LEVEL = 10
+
+# date.toordinal() of 1970-01-01, day 0 of datetime64[D]
+EPOCH_ORDINAL = 719163
+
+def day_column(dates):
+    """datetime64[D] array of the days of datetimes (or dates)"""
+    # Converting the datetimes to datetime64 one by one is many times slower
+    ordinals = np.fromiter((date.toordinal() for date in dates), dtype=np.int64)
+    return (ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+
+def group_sum(keys, values):
+    """Sum values per distinct key; returns (keys, sums, counts) with keys sorted"""
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=values, minlength=len(unique_keys))
+    counts = np.bincount(inverse, minlength=len(unique_keys))
+    return unique_keys, sums, counts
+
+def top_n(values, n):
+    """Indices of the n largest values, largest first (equal values in row order)"""
+    if n < len(values):
+        candidates = np.argpartition(-values, n - 1)[:n]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
+class OrderColumns:
+    """Orders as parallel arrays: order_id, user_id, day, status and total_amount"""
+    def __init__(self, order_id, user_id, day, status, total_amount):
+        self.order_id = order_id
+        self.user_id = user_id
+        self.day = day
+        self.status = status
+        self.total_amount = total_amount
+
+    @classmethod
+    def from_rows(cls, orders, user_id=None):
+        """Convert order dicts; user_id fills the column when the rows don't carry one"""
+        count = len(orders)
+        if user_id is None:
+            user_ids = np.fromiter((order["user_id"] for order in orders), dtype=np.int64, count=count)
+        else:
+            user_ids = np.full(count, user_id, dtype=np.int64)
+        return cls(
+            np.fromiter((order["order_id"] for order in orders), dtype=np.int64, count=count),
+            user_ids,
+            day_column(order["order_date"] for order in orders),
+            np.array([order["status"] for order in orders], dtype=str),
+            np.fromiter((order["total_amount"] for order in orders), dtype=np.float64, count=count),
+        )
+
+    @classmethod
+    def from_users(cls, users):
+        """All orders of user activity rows (users with an "orders" list) in one set of columns"""
+        orders = [order for user in users for order in user.get("orders", [])]
+        columns = cls.from_rows(orders, user_id=0)
+        counts = np.fromiter((len(user.get("orders", [])) for user in users), dtype=np.int64, count=len(users))
+        user_ids = np.fromiter((user["user_id"] for user in users), dtype=np.int64, count=len(users))
+        columns.user_id = np.repeat(user_ids, counts)
+        return columns
+
+    def __len__(self):
+        return len(self.order_id)
+
+    def total(self):
+        return float(self.total_amount.sum())
+
+    def by_day(self):
+        """(days, totals, order counts), oldest day first"""
+        return group_sum(self.day, self.total_amount)
+
+    def by_status(self):
+        """(statuses, totals, order counts), statuses in alphabetical order"""
+        return group_sum(self.status, self.total_amount)
+
+    def by_user(self):
+        """(user_ids, totals, order counts), by user_id"""
+        return group_sum(self.user_id, self.total_amount)
+
+    def top_users(self, n):
+        """(user_ids, totals) of the n biggest spenders, biggest first"""
+        user_ids, totals, _ = self.by_user()
+        top = top_n(totals, n)
+        return user_ids[top], totals[top]
+
+class ProductColumns:
+    """Products as parallel arrays: product_id, price and stock"""
+    def __init__(self, product_id, price, stock):
+        self.product_id = product_id
+        self.price = price
+        self.stock = stock
+
+    @classmethod
+    def from_rows(cls, products):
+        count = len(products)
+        return cls(
+            np.fromiter((product["product_id"] for product in products), dtype=np.int64, count=count),
+            np.fromiter((product["price"] for product in products), dtype=np.float64, count=count),
+            np.fromiter((product["stock"] for product in products), dtype=np.int64, count=count),
+        )
+
+    def __len__(self):
+        return len(self.product_id)
+
+    def values(self):
+        """Stock value (price * stock) of each product"""
+        return self.price * self.stock
+
+    def summary(self):
+        """Product count, total stock and value, and the out-of-stock and low-stock counts"""
+        return {
+            "total_products": len(self),
+            "total_stock": int(self.stock.sum()),
+            "total_value": float(self.values().sum()),
+            "out_of_stock": int(np.count_nonzero(self.stock == 0)),
+            "low_stock": int(np.count_nonzero((self.stock > 0) & (self.stock <= LOW_STOCK_LEVEL))),
+        }
+
+    def top_stocked(self, n):
+        """Indices of the n products with the most stock, most first"""
+        return top_n(self.stock, n)
+
+class UserColumns:
+    """User activity rows as parallel arrays: role, orders_count and total_spent.
+
+    Index i of every column is users[i] of the rows it was built from. The
+    orders of all users are kept as OrderColumns in `orders`.
+    """
+    def __init__(self, users):
+        count = len(users)
+        self.orders = OrderColumns.from_users(users)
+        self.user_id = np.fromiter((user["user_id"] for user in users), dtype=np.int64, count=count)
+        self.role = np.array([user["role"] for user in users], dtype=str)
+        self.orders_count = np.fromiter((len(user.get("orders", [])) for user in users),
+                                        dtype=np.int64, count=count)
+        # Orders are grouped per user in row order, so each user's spend is a bincount
+        # over the row index repeated once per order
+        row_of_order = np.repeat(np.arange(count), self.orders_count)
+        self.total_spent = np.bincount(row_of_order, weights=self.orders.total_amount, minlength=count)
+
+    def __len__(self):
+        return len(self.user_id)
+
+    def role_counts(self):
+        """Number of users per role"""
+        roles, counts = np.unique(self.role, return_counts=True)
+        return {str(role): int(count) for role, count in zip(roles, counts)}
+
+    def spend_by_role(self, rows=None):
+        """Total spent per role, over all users or the given row indices"""
+        roles, spent = self.role, self.total_spent
+        if rows is not None:
+            roles, spent = roles[rows], spent[rows]
+        unique_roles, sums, _ = group_sum(roles, spent)
+        return {str(role): float(total) for role, total in zip(unique_roles, sums)}
+
+    def top_spenders(self, n):
+        """Row indices of the n users who spent the most, most first"""
+        return top_n(self.total_spent, n)
+
+    def totals(self):
+        """Number of users and their orders and spend"""
+        return {
+            "total_users": len(self),
+            "total_orders": int(self.orders_count.sum()),
+            "total_spent": float(self.total_spent.sum()),
+        }
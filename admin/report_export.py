@@ -0,0 +1,169 @@
+"""Streaming exports of the admin reports to CSV and text files.
+
+Rows are read from an unbuffered cursor EXPORT_CHUNK_SIZE at a time and
+written as they arrive, so an export runs in constant memory however many
+rows it covers. CSV files are written with the csv module, which quotes
+names containing commas, quotes or newlines. The text reports start with a
+summary, which comes from one aggregate query run before the rows.
+
+The export functions open their own connections and don't touch Tk, so
+they can run as background tasks.
+"""
+import csv
+
+from config_db import db_connection, db_cursor
+from repositories import reports
+
+# Rows fetched from the server per round trip
+EXPORT_CHUNK_SIZE = 1000
+
+def stream_rows(query, params=(), chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the rows (as dicts) of a query without loading them all into memory"""
+    with db_connection() as connection:
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            # Rows left unread (the export stopped early) have to be drained
+            # before the connection can go back to the pool
+            if connection.unread_result:
+                connection.consume_results()
+            cursor.close()
+
+def fetch_summary(query, params=()):
+    """The single row of an aggregate query"""
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchone()
+
+def money(amount):
+    return f"${float(amount):.2f}"
+
+def export_sales(filename, format_type, from_date=None, to_date=None):
+    """Write the orders of the period to filename; returns the number of orders"""
+    query, params = reports.sales_orders_query(from_date, to_date)
+    count = 0
+
+    if format_type == "csv":
+        with open(filename, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["Order ID", "Date", "Customer", "Status", "Total Amount"])
+            for order in stream_rows(query, params):
+                writer.writerow([
+                    order["order_id"], order["order_date"].strftime("%Y-%m-%d %H:%M"),
+                    f"{order['first_name']} {order['last_name']}", order["status"],
+                    money(order["total_amount"])
+                ])
+                count += 1
+        return count
+
+    summary = fetch_summary(*reports.sales_summary_query(from_date, to_date))
+    with open(filename, "w") as file:
+        file.write("SALES REPORT\n")
+        file.write("=" * 80 + "\n\n")
+        file.write(f"Total Orders: {summary['total_orders']}\n")
+        file.write(f"Total Revenue: {money(summary['total_sales'])}\n\n")
+
+        file.write(f"{'Order ID':<10}{'Date':<20}{'Customer':<30}{'Status':<15}{'Total':<10}\n")
+        file.write("-" * 80 + "\n")
+        for order in stream_rows(query, params):
+            date = order["order_date"].strftime("%Y-%m-%d %H:%M")
+            customer = f"{order['first_name']} {order['last_name']}"
+            total = money(order["total_amount"])
+            file.write(f"{order['order_id']:<10}{date:<20}{customer:<30}{order['status']:<15}{total:<10}\n")
+            count += 1
+    return count
+
+def export_inventory(filename, format_type, report_type, sort_by):
+    """Write the products of an inventory report to filename; returns the number of products"""
+    query = reports.inventory_report_query(report_type, sort_by)
+    count = 0
+
+    if format_type == "csv":
+        with open(filename, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["Product ID", "Name", "Price", "Stock", "Value"])
+            for product in stream_rows(query):
+                writer.writerow([
+                    product["product_id"], product["name"], money(product["price"]), product["stock"],
+                    money(product["price"] * product["stock"])
+                ])
+                count += 1
+        return count
+
+    summary = fetch_summary(reports.inventory_summary_query(report_type))
+    with open(filename, "w") as file:
+        file.write("INVENTORY REPORT\n")
+        file.write("=" * 80 + "\n\n")
+        file.write(f"Total Products: {summary['total_products']}\n")
+        file.write(f"Total Inventory Value: {money(summary['total_value'])}\n")
+        file.write(f"Out of Stock Items: {summary['out_of_stock']}\n")
+        file.write(f"Low Stock Items: {summary['low_stock']}\n\n")
+
+        file.write(f"{'ID':<8}{'Name':<30}{'Price':<10}{'Stock':<8}{'Value':<12}\n")
+        file.write("-" * 80 + "\n")
+        for product in stream_rows(query):
+            name = product["name"]
+            if len(name) > 27:
+                name = name[:24] + "..."
+            price = money(product["price"])
+            value = money(product["price"] * product["stock"])
+            file.write(f"{product['product_id']:<8}{name:<30}{price:<10}{product['stock']:<8}{value:<12}\n")
+            count += 1
+    return count
+
+# Column widths of the text user report (the longest values the old report allowed)
+USER_COLUMNS = [("User ID", 8), ("Name", 25), ("Email", 30), ("Role", 8), ("Created", 12), ("Orders", 10)]
+
+def export_user_activity(filename, format_type, user_type, activity_type, from_date=None):
+    """Write one line per user with their orders in the period; returns the number of users"""
+    query, params = reports.user_activity_export_query(user_type, activity_type, from_date)
+    count = 0
+
+    if format_type == "csv":
+        with open(filename, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["User ID", "Name", "Email", "Role", "Created Date", "Orders Count", "Total Spent"])
+            for user in stream_rows(query, params):
+                writer.writerow([
+                    user["user_id"], f"{user['first_name']} {user['last_name']}",
+                    user["email"] or user["username"], user["role"],
+                    user["created_at"].strftime("%Y-%m-%d") if user["created_at"] else "N/A",
+                    user["orders_count"], money(user["total_spent"])
+                ])
+                count += 1
+        return count
+
+    summary = fetch_summary(reports.user_summary_query(user_type))
+    separator_length = sum(width for _, width in USER_COLUMNS) + 15 + 7
+    with open(filename, "w") as file:
+        file.write("USER ACTIVITY REPORT\n")
+        file.write("=" * separator_length + "\n\n")
+        file.write(f"Total Users: {summary['total_users']}\n")
+        file.write(f"Administrators: {summary['admin_count']}\n")
+        file.write(f"Regular Users: {summary['customer_count']}\n\n")
+
+        file.write("".join(title.ljust(width) for title, width in USER_COLUMNS) + "Total Spent\n")
+        file.write("-" * separator_length + "\n")
+        for user in stream_rows(query, params):
+            values = [
+                str(user["user_id"]),
+                f"{user['first_name']} {user['last_name']}",
+                user["email"] or user["username"] or "",
+                user["role"],
+                user["created_at"].strftime("%Y-%m-%d") if user["created_at"] else "N/A",
+                str(user["orders_count"]),
+            ]
+            row = ""
+            for value, (_, width) in zip(values, USER_COLUMNS):
+                if len(value) > width - 2:
+                    value = value[:width - 5] + "..."
+                row += value.ljust(width)
+            file.write(row + money(user["total_spent"]) + "\n")
+            count += 1
+    return count
@@ -0,0 +1,117 @@
+"""Report jobs: several reports generated at once, in stages, with progress.
+
+A report job is a list of (stage name, function) pairs run one after the
+other, each function getting the previous one's result. The reports use
+the stages "query", "aggregate", "format" and "render". All but the last
+run on the shared tasks worker pool, so the jobs of different reports run
+at the same time; the last one runs on the main loop, as it fills in the
+report's widgets. on_progress(job) is called on the main loop before every
+stage, and once more when the job has finished, failed or was cancelled.
+
+Cancelling a job cancels the stage that is running (its result is thrown
+away) and skips the rest. Starting a job with the name of one that is
+still running cancels the old one first.
+"""
+import tasks
+
+class ReportJob:
+    """One report being generated: its stage functions and where it has got to"""
+    def __init__(self, name, stages, on_progress=None, on_error=None, owner=None, loading=None):
+        self.name = name
+        self.stages = stages
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self.owner = owner
+        self.loading = loading
+        self.stage = None
+        self.completed_stages = 0
+        self.status = "pending"
+        self.error = None
+        self._task = None
+
+    def progress(self):
+        """Fraction (0-1) of the stages finished"""
+        return self.completed_stages / len(self.stages)
+
+    def running(self):
+        if self.status in ("pending", "running") and self.owner is not None and not self.owner.winfo_exists():
+            # The screen was left, so the task callbacks that would move it on are skipped
+            self.status = "cancelled"
+        return self.status in ("pending", "running")
+
+    def start(self, *args):
+        """Run the first stage with args; the later ones get the result of the one before"""
+        self.status = "running"
+        self._run_stage(0, args)
+
+    def cancel(self):
+        if not self.running():
+            return
+        if self._task:
+            self._task.cancel()
+        self.status = "cancelled"
+        self._report()
+
+    def _run_stage(self, index, args):
+        if not self.running():
+            return
+
+        self.stage, fn = self.stages[index]
+        self._report()
+
+        if index == len(self.stages) - 1:
+            # The last stage updates the widgets, so it runs here on the main loop
+            try:
+                fn(*args)
+            except Exception as e:
+                self._failed(e)
+                return
+            self._stage_done(index, None)
+            return
+
+        self._task = tasks.run(fn, *args, owner=self.owner, loading=self.loading,
+                               on_done=lambda result: self._stage_done(index, (result,)),
+                               on_error=self._failed)
+
+    def _stage_done(self, index, result):
+        self.completed_stages = index + 1
+        if self.completed_stages == len(self.stages):
+            self.status = "done"
+            self._report()
+        else:
+            self._run_stage(index + 1, result)
+
+    def _failed(self, error):
+        self.status = "failed"
+        self.error = error
+        self._report()
+        (self.on_error or tasks.show_database_error)(error)
+
+    def _report(self):
+        if self.on_progress and (self.owner is None or self.owner.winfo_exists()):
+            self.on_progress(self)
+
+class ReportScheduler:
+    """The report jobs of one screen, by name"""
+    def __init__(self):
+        self.jobs = {}
+
+    def start(self, name, stages, *args, **options):
+        """Start a job (cancelling a running one of the same name) and return it"""
+        self.cancel(name)
+        job = ReportJob(name, stages, **options)
+        self.jobs[name] = job
+        job.start(*args)
+        return job
+
+    def cancel(self, name):
+        job = self.jobs.get(name)
+        if job:
+            job.cancel()
+
+    def cancel_all(self):
+        for job in list(self.jobs.values()):
+            job.cancel()
+
+    def running(self):
+        return [job for job in self.jobs.values() if job.running()]
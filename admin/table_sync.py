@@ -0,0 +1,128 @@
+"""Keep a ttk.Treeview in step with query results by changing only what differs.
+
+KeyedTable remembers, for every row it put in the tree, its key (used as
+the item id), sort key, values and tags. sync() compares new rows with
+that copy and only inserts, updates, moves or deletes the items that
+changed, so refreshing after one edit touches one item. The rows are kept
+ordered by their sort keys; new and moved items are placed by bisecting
+the sorted keys instead of re-sorting the tree.
+
+Large changes (e.g. filling the table with 100k rows) are applied
+batch_size items per turn of the main loop, so the window keeps responding
+while they are applied. When most rows go away at once the tree is cleared
+and refilled instead, which is much cheaper than deleting items one by one.
+"""
+import bisect
+
+# Items inserted, changed or deleted per turn of the main loop
+BATCH_SIZE = 1000
+
+class KeyedTable:
+    """Rows of a Treeview by key, each with (sort key, values, tags)"""
+    def __init__(self, tree, batch_size=BATCH_SIZE):
+        self.tree = tree
+        self.batch_size = batch_size
+        self.rows = {}
+        self._order = []  # (sort key, key) of the items, in tree order
+        self._pending = []
+        self._after = None
+        self._on_finished = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def busy(self):
+        """True while changes are still being applied"""
+        return self._after is not None
+
+    def cancel(self):
+        """Stop applying changes; rows already applied stay and are remembered"""
+        if self._after is not None:
+            self.tree.after_cancel(self._after)
+        self._after = None
+        self._pending = []
+        self._on_finished = None
+
+    def clear(self):
+        """Delete every row, e.g. before rows with a different kind of sort key"""
+        self.cancel()
+        self.tree.delete(*self.tree.get_children())
+        self.rows = {}
+        self._order = []
+
+    def sync(self, rows, complete=True, on_finished=None):
+        """Apply rows ({key: (sort key, values, tags)}) to the tree.
+
+        Sort keys have to be comparable with those of the rows already in
+        the tree; clear() first when they aren't.
+
+        complete: rows are everything the table should show, so keys not in
+        them are deleted; otherwise they are only new and changed rows.
+        on_finished() is called once all the changes are in the tree.
+        """
+        self.cancel()
+
+        removed = [key for key in self.rows if key not in rows] if complete else []
+        if complete and len(removed) > len(self.rows) // 2:
+            # Cheaper to start again than to delete most items one at a time
+            self.clear()
+            removed = []
+
+        changes = [("delete", key, None) for key in removed]
+        if not self.rows:
+            # Filling an empty table: in sort order, so every item goes at the end
+            new_rows = sorted(rows.items(), key=lambda item: (item[1][0], item[0]))
+        else:
+            new_rows = [(key, row) for key, row in rows.items() if self.rows.get(key) != row]
+        changes.extend(("upsert", key, row) for key, row in new_rows)
+
+        self._pending = changes
+        self._on_finished = on_finished
+        self._apply_batch()
+
+    def remove(self, key):
+        """Delete one row now, e.g. after deleting its record"""
+        if key in self.rows:
+            self._delete(key)
+
+    def _apply_batch(self):
+        self._after = None
+        batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+        for action, key, row in batch:
+            if action == "delete":
+                self._delete(key)
+            else:
+                self._upsert(key, row)
+
+        if self._pending:
+            self._after = self.tree.after(1, self._apply_batch)
+        elif self._on_finished:
+            on_finished, self._on_finished = self._on_finished, None
+            on_finished()
+
+    def _delete(self, key):
+        sort_key = self.rows.pop(key)[0]
+        del self._order[bisect.bisect_left(self._order, (sort_key, key))]
+        self.tree.delete(str(key))
+
+    def _upsert(self, key, row):
+        sort_key, values, tags = row
+        old = self.rows.get(key)
+        self.rows[key] = row
+
+        if old is None:
+            index = bisect.bisect_left(self._order, (sort_key, key))
+            self._order.insert(index, (sort_key, key))
+            self.tree.insert("", index if index < len(self._order) - 1 else "end",
+                             iid=str(key), values=values, tags=tags)
+            return
+
+        self.tree.item(str(key), values=values, tags=tags)
+        if old[0] != sort_key:
+            del self._order[bisect.bisect_left(self._order, (old[0], key))]
+            index = bisect.bisect_left(self._order, (sort_key, key))
+            self._order.insert(index, (sort_key, key))
+            self.tree.move(str(key), "", index)
@@ -0,0 +1,161 @@
+import sys
+import os
+import random
+import datetime
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_db
+from product_search import index_products
+import daily_sales
+
+BENCH_DATABASE = "supermarket_bench"
+
+def use_database(name=BENCH_DATABASE):
+    """Point the app at a scratch database and create the schema in it"""
+    # Must run before the connection pool is created
+    config_db.DB_CONFIG["database"] = name
+
+    from main import setup_database
+    if not setup_database():
+        raise SystemExit(f"Could not set up benchmark database '{name}'")
+
+class CountingCursor:
+    """Cursor wrapper that counts round trips to the server"""
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.round_trips = 0
+
+    def execute(self, *args, **kwargs):
+        self.round_trips += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+def ensure_bench_user(cursor, username="bench_user"):
+    """Return the id of a bench user, creating it if needed"""
+    cursor.execute("SELECT user_id FROM Users WHERE username = %s", (username,))
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+    cursor.execute(
+        """
+        INSERT INTO Users (first_name, last_name, username, email, password, role)
+        VALUES ('Bench', 'User', %s, %s, 'x', 'user')
+        """,
+        (username, f"{username}@example.com")
+    )
+    return cursor.lastrowid
+
+# Words combined into product names, so searches have realistic matches
+NAME_PREFIXES = ["Fresh", "Organic", "Frozen", "Premium", "Classic", "Smoked", "Spicy", "Sweet",
+                 "Whole", "Low Fat", "Family Size", "Farmhouse", "Golden", "Wild", "Baby", "Crunchy"]
+NAME_ITEMS = ["Apples", "Bananas", "Broccoli", "Bread", "Almond Milk", "Eggs", "Chicken Breast",
+              "Brown Rice", "Cheddar Cheese", "Yogurt", "Orange Juice", "Pasta", "Tomatoes", "Coffee",
+              "Green Tea", "Salmon", "Butter", "Cereal", "Potatoes", "Carrots", "Strawberries",
+              "Peanut Butter", "Olive Oil", "Granola", "Spinach", "Mushrooms", "Honey", "Bagels"]
+
+def product_name(rng, n):
+    """A product-like name; the number keeps names unique"""
+    return f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_ITEMS)} {n}"
+
+def seed_products(target_count, seed=42):
+    """Insert products until the Products table holds target_count rows"""
+    rng = random.Random(seed)
+
+    with config_db.db_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM Products")
+        existing = cursor.fetchone()[0]
+        missing = target_count - existing
+        if missing > 0:
+            cursor.execute("SELECT COALESCE(MAX(product_id), 0) FROM Products")
+            first = cursor.fetchone()[0] + 1
+            # Mostly active and in stock, like a real catalog
+            rows = [
+                (n, product_name(rng, n), round(rng.uniform(0.5, 50), 2),
+                 0 if rng.random() < 0.1 else rng.randint(1, 200),
+                 "active" if rng.random() < 0.9 else "inactive")
+                for n in range(first, first + missing)
+            ]
+            for start in range(0, len(rows), 5000):
+                batch = rows[start:start + 5000]
+                cursor.executemany(
+                    "INSERT INTO Products (product_id, name, price, stock, status) VALUES (%s, %s, %s, %s, %s)",
+                    batch
+                )
+                index_products(cursor, [(row[0], row[1]) for row in batch])
+                connection.commit()
+        cursor.close()
+
+    return max(missing, 0)
+
+def seed_orders(target_count, days=30, items_per_order=3, seed=42, user_count=1):
+    """Insert completed orders, spread over user_count users, until Orders holds target_count rows"""
+    rng = random.Random(seed)
+
+    with config_db.db_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM Orders")
+        existing = cursor.fetchone()[0]
+        missing = target_count - existing
+        if missing <= 0:
+            cursor.close()
+            return 0
+
+        user_ids = [ensure_bench_user(cursor, f"bench_user_{n}" if n else "bench_user")
+                    for n in range(user_count)]
+        cursor.execute("SELECT product_id, name, price FROM Products")
+        products = [(row[0], row[1], float(row[2])) for row in cursor.fetchall()]
+        cursor.execute("SELECT COALESCE(MAX(cart_id), 0) FROM Carts")
+        next_cart_id = cursor.fetchone()[0] + 1
+        cursor.execute("SELECT COALESCE(MAX(order_id), 0) FROM Orders")
+        next_order_id = cursor.fetchone()[0] + 1
+
+        now = datetime.datetime.now()
+        batch_size = 5000
+        for start in range(0, missing, batch_size):
+            carts, items, orders, order_items = [], [], [], []
+            for offset in range(start, min(start + batch_size, missing)):
+                cart_id = next_cart_id + offset
+                user_id = rng.choice(user_ids)
+                order_id = next_order_id + offset
+                order_date = now - datetime.timedelta(seconds=rng.randint(0, days * 86400))
+                total = 0
+                for product_id, name, price in rng.sample(products, min(items_per_order, len(products))):
+                    quantity = rng.randint(1, 5)
+                    items.append((cart_id, product_id, quantity))
+                    order_items.append((order_id, product_id, name, price, quantity))
+                    total += price * quantity
+                carts.append((cart_id, user_id, order_date, "completed"))
+                orders.append((order_id, user_id, cart_id, order_date, round(total, 2), "completed"))
+
+            cursor.executemany(
+                "INSERT INTO Carts (cart_id, user_id, created_at, status) VALUES (%s, %s, %s, %s)", carts
+            )
+            cursor.executemany(
+                "INSERT INTO CartItems (cart_id, product_id, quantity) VALUES (%s, %s, %s)", items
+            )
+            cursor.executemany(
+                """
+                INSERT INTO Orders (order_id, user_id, cart_id, order_date, total_amount, status)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                orders
+            )
+            cursor.executemany(
+                """
+                INSERT INTO OrderItems (order_id, product_id, product_name, unit_price, quantity)
+                VALUES (%s, %s, %s, %s, %s)
+                """,
+                order_items
+            )
+            connection.commit()
+
+        # The orders bypassed checkout, so their days are summed up here instead
+        daily_sales.rebuild(cursor)
+        connection.commit()
+        cursor.close()
+
+    return missing
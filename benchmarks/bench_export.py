@@ -0,0 +1,54 @@
+"""Time and peak memory of the streaming sales export.
+
+Usage: python benchmarks/bench_export.py [--orders 500000] [--days 365] [--format csv]
+
+Seeds a scratch database with --orders orders spread over --days days,
+then exports all of them with admin.report_export.export_sales and reports
+the time taken and the peak Python heap (tracemalloc) while exporting.
+Peak memory should stay flat as --orders grows.
+"""
+import sys
+import os
+import time
+import argparse
+import datetime
+import tempfile
+import tracemalloc
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admin import report_export
+from benchmarks.bench_db import BENCH_DATABASE, use_database, seed_products, seed_orders
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=500000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--format", choices=["csv", "txt"], default="csv")
+    parser.add_argument("--database", default=BENCH_DATABASE)
+    args = parser.parse_args()
+
+    use_database(args.database)
+    print("Seeding...")
+    seed_products(args.products)
+    seed_orders(args.orders, days=args.days)
+
+    from_date = datetime.datetime.now() - datetime.timedelta(days=args.days)
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join(folder, f"sales.{args.format}")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        count = report_export.export_sales(filename, args.format, from_date, datetime.datetime.now())
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        size = os.path.getsize(filename)
+
+    print(f"Exported {count} orders ({size / 1e6:.1f} MB) in {elapsed:.2f} s, "
+          f"peak Python memory {peak / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    main()
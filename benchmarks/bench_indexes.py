@@ -0,0 +1,123 @@
+"""EXPLAIN plans and latency of the hot queries without and with the secondary indexes.
+
+Usage: python benchmarks/bench_indexes.py [--orders 1000000] [--users 1000] [--products 10000] [--repeat 20]
+
+Seeds a scratch database (created if needed; seeding 1M orders takes a
+while the first time), then runs each query with the schema as it was
+before migration 2 and again with the indexes migration 2 adds. The
+CartItems (cart_id, product_id) key is not toggled since cart upserts
+depend on it. The database is left with the indexes in place.
+"""
+import sys
+import os
+import time
+import argparse
+import datetime
+import statistics
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_db
+from main import SECONDARY_INDEXES, index_exists, create_secondary_indexes
+from benchmarks.bench_db import BENCH_DATABASE, use_database, seed_products, seed_orders, ensure_bench_user
+
+# Single-column indexes that back the foreign keys on a fresh install.
+# MySQL may drop these once a composite index can serve the foreign key,
+# so they are recreated before the composite indexes are dropped.
+FOREIGN_KEY_INDEXES = [
+    ("Carts", "bench_fk_carts_user", "user_id"),
+    ("Orders", "bench_fk_orders_user", "user_id"),
+]
+
+def hot_queries(user_id, since):
+    """(label, SQL, params) for the lookups the screens run most"""
+    return [
+        ("active cart lookup",
+         "SELECT cart_id FROM Carts WHERE user_id = %s AND status = 'active'",
+         (user_id,)),
+        ("user order history",
+         "SELECT order_id, order_date, total_amount, status FROM Orders WHERE user_id = %s ORDER BY order_date DESC",
+         (user_id,)),
+        ("sales report, last 7 days",
+         "SELECT order_id, user_id, order_date, total_amount FROM Orders WHERE order_date >= %s ORDER BY order_date DESC",
+         (since,)),
+        ("catalog in stock",
+         "SELECT product_id, name, price, stock FROM Products WHERE status = 'active' AND stock > 0",
+         ()),
+    ]
+
+def drop_secondary_indexes(cursor):
+    """Put the tables back to their pre-migration indexes"""
+    for table, index_name, columns in FOREIGN_KEY_INDEXES:
+        if not index_exists(cursor, table, index_name):
+            cursor.execute(f"ALTER TABLE {table} ADD INDEX {index_name} ({columns})")
+    for table, index_name, _ in SECONDARY_INDEXES:
+        if index_exists(cursor, table, index_name):
+            cursor.execute(f"ALTER TABLE {table} DROP INDEX {index_name}")
+
+def restore_secondary_indexes(cursor):
+    create_secondary_indexes(cursor)
+    for table, index_name, _ in FOREIGN_KEY_INDEXES:
+        if index_exists(cursor, table, index_name):
+            cursor.execute(f"ALTER TABLE {table} DROP INDEX {index_name}")
+
+def measure(cursor, sql, params, repeat):
+    """Return (EXPLAIN rows, median milliseconds)"""
+    cursor.execute("EXPLAIN " + sql, params)
+    plan = cursor.fetchall()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return plan, statistics.median(timings)
+
+def describe_plan(plan):
+    return "; ".join(
+        f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}"
+        + (f" ({row['Extra']})" if row.get("Extra") else "")
+        for row in plan
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database", default=BENCH_DATABASE)
+    args = parser.parse_args()
+
+    use_database(args.database)
+    print("Seeding...")
+    seed_products(args.products)
+    seed_orders(args.orders, user_count=args.users)
+
+    with config_db.db_connection() as connection:
+        cursor = connection.cursor()
+        explain_cursor = connection.cursor(dictionary=True)
+
+        user_id = ensure_bench_user(cursor, "bench_user_1" if args.users > 1 else "bench_user")
+        queries = hot_queries(user_id, datetime.datetime.now() - datetime.timedelta(days=7))
+
+        results = {}
+        for phase, prepare in (("before", drop_secondary_indexes), ("after", restore_secondary_indexes)):
+            prepare(cursor)
+            cursor.execute("ANALYZE TABLE Carts, Orders, Products")
+            cursor.fetchall()
+            for label, sql, params in queries:
+                results[(phase, label)] = measure(explain_cursor, sql, params, args.repeat)
+
+        explain_cursor.close()
+        cursor.close()
+
+    for label, _, _ in queries:
+        print(f"\n{label}")
+        for phase in ("before", "after"):
+            plan, median_ms = results[(phase, label)]
+            print(f"  {phase:<6} {median_ms:>9.2f} ms  {describe_plan(plan)}")
+
+if __name__ == "__main__":
+    main()
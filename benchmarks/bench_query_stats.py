@@ -0,0 +1,94 @@
+"""Cost of query_stats: the same queries with plain and instrumented cursors.
+
+Usage: python benchmarks/bench_query_stats.py [--products 5000] [--queries 5000] [--database NAME]
+
+Runs a cheap primary-key catalog page query (the worst case: the less the
+server does, the larger the share of the bookkeeping) --queries times on a
+plain cursor and on a query_stats.InstrumentedCursor over the same
+connection, alternating in rounds, and prints the median time per query
+and the overhead. The bookkeeping alone is also timed on a stub cursor that
+does nothing, which gives the microseconds added to every statement.
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_db
+import query_stats
+from benchmarks.bench_db import BENCH_DATABASE, use_database, seed_products
+
+QUERY = """
+    SELECT product_id, name, price, image_hash, stock FROM Products
+    WHERE stock > 0 AND status = 'active' AND product_id > %s
+    ORDER BY product_id
+    LIMIT %s
+"""
+ROUNDS = 10
+
+class StubCursor:
+    rowcount = 13
+
+    def execute(self, operation, params=None):
+        pass
+
+    def fetchall(self):
+        return []
+
+def time_queries(cursor, count, product_count):
+    """Seconds to run and fetch count queries"""
+    start = time.perf_counter()
+    for n in range(count):
+        cursor.execute(QUERY, (n * 7 % product_count, 13))
+        cursor.fetchall()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--database", default=BENCH_DATABASE)
+    args = parser.parse_args()
+
+    # Nothing here should reach the slow-query log
+    query_stats.SLOW_QUERY_MS = float("inf")
+
+    stub_us = statistics.median(
+        (time_queries(query_stats.InstrumentedCursor(StubCursor()), 100000, args.products)
+         - time_queries(StubCursor(), 100000, args.products)) / 100000 * 1e6
+        for _ in range(5)
+    )
+    print(f"Bookkeeping: {stub_us:.2f} us per statement")
+
+    use_database(args.database)
+    print("Seeding...")
+    seed_products(args.products)
+
+    per_round = max(1, args.queries // ROUNDS)
+    plain, instrumented = [], []
+    with config_db.db_connection() as connection:
+        cursor = connection.cursor()
+        wrapped = query_stats.InstrumentedCursor(connection.cursor())
+        # Warm up the server's caches and the fingerprint cache
+        time_queries(cursor, per_round, args.products)
+        time_queries(wrapped, per_round, args.products)
+        for _ in range(ROUNDS):
+            plain.append(time_queries(cursor, per_round, args.products) / per_round)
+            instrumented.append(time_queries(wrapped, per_round, args.products) / per_round)
+        cursor.close()
+        wrapped.close()
+
+    plain_us = statistics.median(plain) * 1e6
+    instrumented_us = statistics.median(instrumented) * 1e6
+    print(f"\n{'cursor':<14}{'us/query':>10}")
+    print(f"{'plain':<14}{plain_us:>10.1f}")
+    print(f"{'instrumented':<14}{instrumented_us:>10.1f}")
+    print(f"\nOverhead: {instrumented_us - plain_us:.1f} us per query "
+          f"({(instrumented_us - plain_us) / plain_us:.2%}); bookkeeping alone {stub_us / plain_us:.2%}")
+    print("\n" + query_stats.summary(limit=3))
+
+if __name__ == "__main__":
+    main()
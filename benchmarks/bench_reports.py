@@ -0,0 +1,102 @@
+"""Report aggregation time: Python loops over order dicts vs. NumPy columns.
+
+Usage: python benchmarks/bench_reports.py [--orders 1000000] [--users 5000] [--days 365]
+
+Builds --orders order rows in memory, shaped like the rows the report
+queries return (Decimal amounts, datetime dates), then computes the same
+report statistics both ways: the total, totals by day, by status and by
+user, and the top 15 spenders. The columnar time is split into converting
+the rows to arrays (paid once per report) and computing the statistics.
+No database is needed.
+"""
+import sys
+import os
+import math
+import time
+import random
+import argparse
+import datetime
+from decimal import Decimal
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admin.report_columns import OrderColumns
+
+STATUSES = ["completed", "completed", "completed", "pending", "cancelled"]
+
+def make_orders(count, users, days, seed=42):
+    """Order dicts with random users, dates, statuses and amounts"""
+    rng = random.Random(seed)
+    now = datetime.datetime.now()
+    return [
+        {
+            "order_id": order_id,
+            "user_id": rng.randint(1, users),
+            "order_date": now - datetime.timedelta(seconds=rng.randint(0, days * 86400)),
+            "status": rng.choice(STATUSES),
+            "total_amount": Decimal(rng.randint(100, 50000)) / 100,
+        }
+        for order_id in range(1, count + 1)
+    ]
+
+def loop_stats(orders, top=15):
+    """The statistics the way the report screens computed them, one dict loop each"""
+    total = sum(float(order["total_amount"]) for order in orders)
+
+    by_day = {}
+    for order in orders:
+        date_str = order["order_date"].strftime("%Y-%m-%d")
+        by_day[date_str] = by_day.get(date_str, 0) + float(order["total_amount"])
+
+    by_status = {}
+    for order in orders:
+        by_status[order["status"]] = by_status.get(order["status"], 0) + float(order["total_amount"])
+
+    by_user = {}
+    for order in orders:
+        by_user[order["user_id"]] = by_user.get(order["user_id"], 0) + float(order["total_amount"])
+    top_users = sorted(by_user.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    return total, len(by_day), len(by_status), top_users
+
+def column_stats(columns, top=15):
+    """The same statistics from the columns"""
+    total = columns.total()
+    days, _, _ = columns.by_day()
+    statuses, _, _ = columns.by_status()
+    user_ids, totals = columns.top_users(top)
+    return total, len(days), len(statuses), list(zip(user_ids.tolist(), totals.tolist()))
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    print(f"Building {args.orders} orders...")
+    orders = make_orders(args.orders, args.users, args.days)
+
+    loop_s, loop_result = timed(loop_stats, orders)
+    convert_s, columns = timed(OrderColumns.from_rows, orders)
+    numpy_s, numpy_result = timed(column_stats, columns)
+
+    # Both ways have to agree before their times mean anything
+    assert math.isclose(loop_result[0], numpy_result[0], rel_tol=1e-9)
+    assert loop_result[1:3] == numpy_result[1:3]
+    assert all(math.isclose(loop_total, numpy_total, rel_tol=1e-9)
+               for (_, loop_total), (_, numpy_total) in zip(loop_result[3], numpy_result[3]))
+
+    print(f"{'python loops':<22}{loop_s:>8.3f} s")
+    print(f"{'numpy (convert rows)':<22}{convert_s:>8.3f} s")
+    print(f"{'numpy (statistics)':<22}{numpy_s:>8.3f} s")
+    print(f"Statistics {loop_s / numpy_s:.0f}x faster, "
+          f"{loop_s / (convert_s + numpy_s):.1f}x including the conversion")
+
+if __name__ == "__main__":
+    main()
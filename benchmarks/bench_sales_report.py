@@ -0,0 +1,72 @@
+"""Sales report fetch time vs. order count: per-order item queries vs. batched.
+
+Usage: python benchmarks/bench_sales_report.py [--sizes 100 1000 10000] [--database supermarket_bench]
+
+Runs against a scratch database (created if needed) and seeds orders dated
+within the last 30 days up to each requested size.
+"""
+import sys
+import os
+import time
+import argparse
+import datetime
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_db
+from repositories import reports
+from benchmarks.bench_db import BENCH_DATABASE, CountingCursor, use_database, seed_orders
+
+def legacy_fetch_sales_data(cursor, from_date, to_date):
+    """The previous implementation: one item query per order"""
+    orders = reports.fetch_sales_orders(cursor, from_date, to_date)
+    for order in orders:
+        cursor.execute("""
+            SELECT p.name, ci.quantity, p.price
+            FROM CartItems ci
+            JOIN Products p ON ci.product_id = p.product_id
+            WHERE ci.cart_id = (
+                SELECT cart_id FROM Orders WHERE order_id = %s
+            )
+        """, (order['order_id'],))
+        order['items'] = cursor.fetchall()
+    return orders
+
+def time_fetch(fetch, from_date, to_date):
+    """Run one fetch and return (seconds, round trips, orders)"""
+    with config_db.db_cursor(dictionary=True) as cursor:
+        counting = CountingCursor(cursor)
+        start = time.perf_counter()
+        orders = fetch(counting, from_date, to_date)
+        elapsed = time.perf_counter() - start
+    return elapsed, counting.round_trips, len(orders)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--database", default=BENCH_DATABASE)
+    parser.add_argument("--skip-legacy-above", type=int, default=20000,
+                        help="don't run the per-order implementation above this many orders")
+    args = parser.parse_args()
+
+    use_database(args.database)
+
+    to_date = datetime.datetime.now()
+    from_date = to_date - datetime.timedelta(days=30)
+
+    print(f"{'orders':>8} | {'legacy s':>9} {'trips':>7} | {'batched s':>9} {'trips':>5}")
+    print("-" * 50)
+    for size in sorted(args.sizes):
+        seed_orders(size)
+
+        batched_s, batched_trips, count = time_fetch(reports.fetch_sales_data, from_date, to_date)
+        if size <= args.skip_legacy_above:
+            legacy_s, legacy_trips, _ = time_fetch(legacy_fetch_sales_data, from_date, to_date)
+            legacy = f"{legacy_s:>9.3f} {legacy_trips:>7}"
+        else:
+            legacy = f"{'skipped':>9} {'-':>7}"
+
+        print(f"{count:>8} | {legacy} | {batched_s:>9.3f} {batched_trips:>5}")
+
+if __name__ == "__main__":
+    main()
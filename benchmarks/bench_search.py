@@ -0,0 +1,74 @@
+"""Product search latency: LIKE '%term%' against the search index.
+
+Usage: python benchmarks/bench_search.py [--products 500000] [--repeat 20]
+
+Seeds a scratch database with --products products (created if needed),
+then times each query the old way (name LIKE '%term%') and through
+product_search.search, as a customer (active, in stock) would run it.
+The queries cover whole words, prefixes, short words, two-word queries
+and typos.
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_db
+import product_search
+from benchmarks.bench_db import BENCH_DATABASE, use_database, seed_products
+
+QUERIES = ["apples", "straw", "tea", "peanut butter", "organic milk", "brocoli", "chiken brest", "xyzzy"]
+
+# One page of the product grid plus the look-ahead row
+PAGE_SIZE = 13
+
+def time_like(cursor, query, repeat):
+    """Median ms and result count of the old LIKE search"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(
+            """
+            SELECT product_id, name, price, image_hash, stock FROM Products
+            WHERE stock > 0 AND status = 'active' AND name LIKE %s
+            ORDER BY product_id
+            LIMIT %s
+            """,
+            (f"%{query}%", PAGE_SIZE)
+        )
+        rows = cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(rows)
+
+def time_search(cursor, query, repeat):
+    """Median ms, result count and best match of product_search.search"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        products = product_search.search(cursor, query, 0, PAGE_SIZE, active_only=True, in_stock=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(products), products[0]["name"] if products else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database", default=BENCH_DATABASE)
+    args = parser.parse_args()
+
+    use_database(args.database)
+    print("Seeding...")
+    seed_products(args.products)
+
+    with config_db.db_cursor() as cursor:
+        print(f"\n{'query':<16} {'LIKE ms':>9} {'rows':>5} {'search ms':>10} {'rows':>5}  best match")
+        for query in QUERIES:
+            like_ms, like_rows = time_like(cursor, query, args.repeat)
+            search_ms, search_rows, best = time_search(cursor, query, args.repeat)
+            print(f"{query:<16} {like_ms:>9.2f} {like_rows:>5} {search_ms:>10.2f} {search_rows:>5}  {best}")
+
+if __name__ == "__main__":
+    main()
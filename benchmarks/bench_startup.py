@@ -0,0 +1,106 @@
+"""Import time of the admin panel and time until its login window is drawn.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--top 15] [--output startup.txt]
+
+Runs `python -X importtime -c "import admin.admin_view"` in fresh
+interpreters and reports the total and the slowest modules (cumulative
+time, best of --runs). Exits with status 1 if any of the charting/PDF
+packages are imported just by loading the admin panel, since those are
+meant to load the first time a graph or PDF is requested.
+
+With a display available it also times, in a fresh interpreter, how long
+the admin login window takes to appear (import + build + first update).
+"""
+import sys
+import os
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages the admin panel should only import on demand
+DEFERRED_PACKAGES = ["matplotlib", "numpy", "reportlab"]
+
+WINDOW_SCRIPT = """
+import time
+start = time.perf_counter()
+import customtkinter as ctk
+import router
+root = ctk.CTk()
+router.init(root)
+router.show("admin", username="login")
+root.update()
+print(time.perf_counter() - start)
+root.destroy()
+"""
+
+def import_times(module):
+    """Return {module name: cumulative microseconds} from one -X importtime run"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+def window_time():
+    """Seconds until the admin login window is drawn, or None without a display"""
+    result = subprocess.run([sys.executable, "-c", WINDOW_SCRIPT], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="admin.admin_view")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args()
+
+    # Best of several runs, per module, to keep disk cache noise out
+    best = {}
+    for _ in range(args.runs):
+        for name, cumulative in import_times(args.module).items():
+            best[name] = min(cumulative, best.get(name, cumulative))
+
+    lines = [f"python {sys.version.split()[0]}, best of {args.runs} runs",
+             f"import {args.module}: {best.get(args.module, 0) / 1000:.1f} ms cumulative", "",
+             f"{'cumulative ms':>14}  module"]
+    top_level = {name: us for name, us in best.items() if "." not in name or name == args.module}
+    for name, cumulative in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        lines.append(f"{cumulative / 1000:>14.1f}  {name}")
+
+    eager = [package for package in DEFERRED_PACKAGES if package in best]
+    lines.append("")
+    if eager:
+        lines.append("Imported at load time (should be deferred): " + ", ".join(eager))
+    else:
+        lines.append("Deferred packages not imported at load time: " + ", ".join(DEFERRED_PACKAGES))
+
+    seconds = [window_time() for _ in range(args.runs)]
+    seconds = [value for value in seconds if value is not None]
+    if seconds:
+        lines.append(f"Admin login window drawn after {min(seconds):.3f} s (best of {len(seconds)})")
+    else:
+        lines.append("Admin login window not timed (no display or database available)")
+
+    report = "\n".join(lines)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+
+    sys.exit(1 if eager else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Deterministic synthetic data for the whole supermarket schema.
+
+Usage: python benchmarks/gen_data.py [--scale 1] [--seed 42] [--today YYYY-MM-DD] [--database NAME]
+
+Wipes the data in a scratch database (supermarket_bench by default; the
+app's own database is refused) and fills it with users, products (some with
+images and thumbnails), active carts with items, and a history of orders
+with their carts, cart items and order items. Every count is SCALE times
+--scale. The same --scale, --seed and --today always produce the same rows
+with the same ids; --today (default: today) is the day the order history
+ends on.
+
+Rows are built in memory and written with executemany, BATCH_SIZE rows per
+statement, with foreign key and unique checks switched off for the session
+(the generated rows are consistent by construction). The search index and
+the DailySales rollup are filled as the app fills them.
+
+Shoppers log in as shopper<n> with the password SHOPPER_PASSWORD; the
+default admin123 and user1 logins are recreated too.
+"""
+import sys
+import os
+import io
+import time
+import random
+import argparse
+import datetime
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_db
+import daily_sales
+from product_search import index_products
+from utils_file import hash_password
+from benchmarks.bench_db import BENCH_DATABASE, use_database, product_name
+
+# Rows per unit of --scale
+SCALE = {
+    "users": 1000,
+    "products": 5000,
+    "orders": 20000,
+    "active_carts": 300,
+}
+SHOPPER_PASSWORD = "shopper123"
+# Days of order history before --today
+HISTORY_DAYS = 365
+# Share of products that have an image, and how many different images there are
+IMAGE_SHARE = 0.3
+IMAGE_VARIANTS = 24
+# Rows per executemany
+BATCH_SIZE = 5000
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda",
+               "David", "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+               "Thomas", "Sarah", "Priya", "Wei", "Fatima", "Carlos", "Aisha", "Kenji"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+              "Rodriguez", "Martinez", "Lee", "Patel", "Nguyen", "Kim", "Chen", "Khan"]
+# Completed orders dominate, as they do in a live store
+ORDER_STATUSES = ["completed"] * 17 + ["pending", "pending", "cancelled"]
+
+# Tables the generator fills, children before parents
+TABLES = ["OrderItems", "Orders", "CartItems", "Carts", "ProductTrigrams", "Products", "Users", "DailySales"]
+
+def make_images(count, seed):
+    """count distinct small PNG product images"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    images = []
+    for _ in range(count):
+        colour = tuple(rng.randint(40, 230) for _ in range(3))
+        image = Image.new("RGB", (300, 300), colour)
+        draw = ImageDraw.Draw(image)
+        inset = rng.randint(40, 110)
+        draw.ellipse((inset, inset, 300 - inset, 300 - inset), fill=tuple(255 - c for c in colour))
+        output = io.BytesIO()
+        image.save(output, format="PNG", optimize=True)
+        images.append(output.getvalue())
+    return images
+
+def write_rows(cursor, connection, query, rows):
+    """executemany rows in batches, committing after each"""
+    for start in range(0, len(rows), BATCH_SIZE):
+        cursor.executemany(query, rows[start:start + BATCH_SIZE])
+        connection.commit()
+
+def wipe(cursor, connection):
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for table in TABLES:
+        cursor.execute(f"TRUNCATE TABLE {table}")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+    connection.commit()
+
+def make_users(rng, count):
+    """(user_id, first, last, username, email, password, role) of the shoppers, ids from 3"""
+    password = hash_password(SHOPPER_PASSWORD)
+    return [
+        (user_id, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), f"shopper{n}",
+         f"shopper{n}@example.com", password, "user")
+        for n, user_id in enumerate(range(3, count + 3), start=1)
+    ]
+
+def make_products(rng, count):
+    """(product_id, name, price, stock, status, image variant or None) of the catalog"""
+    products = []
+    for product_id in range(1, count + 1):
+        stock = 0 if rng.random() < 0.05 else rng.randint(20, 500)
+        status = "active" if rng.random() < 0.95 else "inactive"
+        image = rng.randrange(IMAGE_VARIANTS) if rng.random() < IMAGE_SHARE else None
+        products.append((product_id, product_name(rng, product_id), round(rng.uniform(0.5, 60), 2),
+                         stock, status, image))
+    return products
+
+def make_orders(rng, count, user_ids, products, today):
+    """Carts, cart items, orders and order items of the order history, oldest order first"""
+    end = datetime.datetime.combine(today, datetime.time.min) + datetime.timedelta(days=1)
+    dates = sorted(end - datetime.timedelta(seconds=rng.randint(1, HISTORY_DAYS * 86400))
+                   for _ in range(count))
+
+    carts, cart_items, orders, order_items = [], [], [], []
+    for order_id, order_date in enumerate(dates, start=1):
+        user_id = rng.choice(user_ids)
+        # Each order has its own completed cart, with the same id
+        cart_id = order_id
+        total = 0
+        for product_id, name, price, _, _, _ in rng.sample(products, min(rng.randint(1, 6), len(products))):
+            quantity = rng.randint(1, 4)
+            cart_items.append((cart_id, product_id, quantity))
+            order_items.append((order_id, product_id, name, price, quantity))
+            total += price * quantity
+        status = rng.choice(ORDER_STATUSES)
+        carts.append((cart_id, user_id, order_date, "completed"))
+        orders.append((order_id, user_id, cart_id, order_date, round(total, 2), status))
+    return carts, cart_items, orders, order_items
+
+def make_active_carts(rng, count, first_cart_id, user_ids, products, today):
+    """Open carts (at most one per user) and their items"""
+    now = datetime.datetime.combine(today, datetime.time(12))
+    in_stock = [product for product in products if product[3] > 0 and product[4] == "active"]
+    carts, cart_items = [], []
+    for cart_id, user_id in enumerate(rng.sample(user_ids, min(count, len(user_ids))), start=first_cart_id):
+        carts.append((cart_id, user_id, now - datetime.timedelta(minutes=rng.randint(1, 600)), "active"))
+        for product in rng.sample(in_stock, min(rng.randint(1, 5), len(in_stock))):
+            cart_items.append((cart_id, product[0], rng.randint(1, min(3, product[3]))))
+    return carts, cart_items
+
+def generate(scale=1, seed=42, today=None):
+    """Replace the data of the current database with generated rows; returns rows per table"""
+    from main import create_default_user
+    from product_images import prepare_product_image
+
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    counts = {name: max(1, int(per_unit * scale)) for name, per_unit in SCALE.items()}
+
+    print("Building rows...")
+    users = make_users(rng, counts["users"])
+    user_ids = [user[0] for user in users]
+    products = make_products(rng, counts["products"])
+    carts, cart_items, orders, order_items = make_orders(rng, counts["orders"], user_ids, products, today)
+    open_carts, open_items = make_active_carts(rng, counts["active_carts"], len(carts) + 1,
+                                               user_ids, products, today)
+    carts += open_carts
+    cart_items += open_items
+
+    images = [(data,) + prepare_product_image(data) for data in make_images(IMAGE_VARIANTS, seed)]
+    product_rows = [
+        (product_id, name, price, stock, status) + (images[image] if image is not None else (None, None, None))
+        for product_id, name, price, stock, status, image in products
+    ]
+
+    written = {}
+    with config_db.db_connection() as connection:
+        cursor = connection.cursor()
+        try:
+            wipe(cursor, connection)
+            # The admin123 and user1 logins take ids 1 and 2
+            create_default_user(cursor, connection)
+
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            cursor.execute("SET UNIQUE_CHECKS = 0")
+            steps = [
+                ("Users", """
+                    INSERT INTO Users (user_id, first_name, last_name, username, email, password, role)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                 """, users),
+                ("Products", """
+                    INSERT INTO Products (product_id, name, price, stock, status, image, thumbnail, image_hash)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                 """, product_rows),
+                ("Carts", "INSERT INTO Carts (cart_id, user_id, created_at, status) VALUES (%s, %s, %s, %s)",
+                 carts),
+                ("CartItems", "INSERT INTO CartItems (cart_id, product_id, quantity) VALUES (%s, %s, %s)",
+                 cart_items),
+                ("Orders", """
+                    INSERT INTO Orders (order_id, user_id, cart_id, order_date, total_amount, status)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                 """, orders),
+                ("OrderItems", """
+                    INSERT INTO OrderItems (order_id, product_id, product_name, unit_price, quantity)
+                    VALUES (%s, %s, %s, %s, %s)
+                 """, order_items),
+            ]
+            for table, query, rows in steps:
+                start = time.perf_counter()
+                write_rows(cursor, connection, query, rows)
+                elapsed = time.perf_counter() - start
+                written[table] = len(rows)
+                print(f"{table:<12}{len(rows):>10} rows {elapsed:>8.2f} s ({len(rows) / elapsed:,.0f} rows/s)")
+
+            start = time.perf_counter()
+            index_products(cursor, [(product[0], product[1]) for product in products])
+            written["DailySales"] = daily_sales.rebuild(cursor)
+            connection.commit()
+            print(f"{'Indexes':<12}{'':>10}      {time.perf_counter() - start:>8.2f} s")
+
+            # Also reset by the pool when the connection goes back to it
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+            cursor.execute("SET UNIQUE_CHECKS = 1")
+        finally:
+            cursor.close()
+
+    return written
+
+def parse_date(text):
+    return datetime.datetime.strptime(text, "%Y-%m-%d").date()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1, help="multiplier of the SCALE row counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--today", type=parse_date, help="last day of the order history (default: today)")
+    parser.add_argument("--database", default=BENCH_DATABASE)
+    args = parser.parse_args()
+
+    if args.database == config_db.DB_CONFIG["database"]:
+        raise SystemExit(f"Refusing to replace the data of the app's database '{args.database}'")
+
+    use_database(args.database)
+    start = time.perf_counter()
+    written = generate(args.scale, args.seed, args.today)
+    print(f"Generated {sum(written.values())} rows in {time.perf_counter() - start:.1f} s")
+
+if __name__ == "__main__":
+    main()
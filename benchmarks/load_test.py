@@ -0,0 +1,168 @@
+"""Load test: concurrent shoppers on the customer screen's data paths.
+
+Usage: python benchmarks/load_test.py [--shoppers 20] [--duration 60] [--think-ms 0] [--seed 1] [--database NAME]
+
+Run benchmarks/gen_data.py on the database first. Each shopper thread logs
+in as one of the generated shopper<n> users and repeats a visit until
+--duration seconds have passed: browse a few catalog pages, sometimes
+search, add items to the cart, look at the cart, sometimes change a
+quantity, usually check out, and look at the previous orders. Every step
+calls the repositories function the customer screen runs for it, and its
+latency is recorded. At the end the p50/p95/p99 latency of every operation
+is printed.
+
+Stock and cart rejections (StockLimitError, CheckoutError) are expected
+under load and counted as rejected; any other exception counts as an error.
+All shoppers run in this process, so like the app's windows they share one
+catalog cache and one thumbnail cache.
+"""
+import sys
+import os
+import time
+import random
+import argparse
+import threading
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_db
+from repositories import cart, catalog, orders
+from benchmarks.bench_db import BENCH_DATABASE, use_database, NAME_PREFIXES, NAME_ITEMS
+
+# Products per page of the customer grid (users_view.PRODUCTS_PAGE_SIZE)
+PRODUCTS_PAGE_SIZE = 12
+OPERATIONS = ["browse", "search", "add_to_cart", "view_cart", "update_quantity", "checkout", "orders"]
+# Errors that are part of normal shopping rather than failures
+REJECTIONS = (cart.StockLimitError, orders.CheckoutError)
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of a sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class Shopper:
+    """One simulated customer, recording the latency (ms) of every operation it runs"""
+    def __init__(self, user_id, rng, think_s=0):
+        self.user_id = user_id
+        self.rng = rng
+        self.think_s = think_s
+        self.cart_id = None
+        self.latencies = {name: [] for name in OPERATIONS}
+        self.rejected = dict.fromkeys(OPERATIONS, 0)
+        self.errors = dict.fromkeys(OPERATIONS, 0)
+
+    def measure(self, name, fn, *args):
+        """Run fn(*args) and record its latency; returns its result, or None if it raised"""
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except REJECTIONS:
+            result = None
+            self.rejected[name] += 1
+        except Exception as err:
+            result = None
+            self.errors[name] += 1
+            print(f"{name} failed for user {self.user_id}: {err}")
+        self.latencies[name].append((time.perf_counter() - start) * 1000)
+        if self.think_s:
+            time.sleep(self.rng.uniform(0, 2 * self.think_s))
+        return result
+
+    def visit(self):
+        """One visit to the shop"""
+        rng = self.rng
+        seen = []
+
+        after_id = 0
+        for page_index in range(rng.randint(1, 3)):
+            products = self.measure("browse", catalog.grid_page, None, page_index, after_id,
+                                    PRODUCTS_PAGE_SIZE) or []
+            seen.extend(products[:PRODUCTS_PAGE_SIZE])
+            if len(products) <= PRODUCTS_PAGE_SIZE:
+                break
+            after_id = products[PRODUCTS_PAGE_SIZE - 1]["id"]
+
+        if rng.random() < 0.5:
+            query = rng.choice([rng.choice(NAME_ITEMS), rng.choice(NAME_PREFIXES),
+                                rng.choice(NAME_ITEMS)[:4].lower()])
+            seen.extend(self.measure("search", catalog.grid_page, query, 0, 0, PRODUCTS_PAGE_SIZE) or [])
+
+        for product in rng.sample(seen, min(rng.randint(1, 4), len(seen))):
+            added = self.measure("add_to_cart", cart.add_item,
+                                 self.user_id, product["id"], rng.randint(1, 3), self.cart_id)
+            if added:
+                self.cart_id = added[0]
+
+        cart_id, items = self.measure("view_cart", cart.load_cart, self.user_id) or (None, [])
+        if items and rng.random() < 0.3:
+            item = rng.choice(items)
+            self.measure("update_quantity", cart.set_item_quantity,
+                         item["cart_item_id"], item["product_id"], rng.randint(1, 5))
+
+        if cart_id and items and rng.random() < 0.7:
+            if self.measure("checkout", orders.checkout, self.user_id, cart_id):
+                self.cart_id = None
+
+        self.measure("orders", orders.recent_orders, self.user_id)
+
+def shopper_ids(count):
+    """user_ids of the first count generated shoppers"""
+    with config_db.db_cursor() as cursor:
+        cursor.execute(
+            "SELECT user_id FROM Users WHERE username LIKE 'shopper%%' ORDER BY user_id LIMIT %s",
+            (count,)
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+def run_shopper(shopper, deadline):
+    while time.monotonic() < deadline:
+        shopper.visit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shoppers", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause after each operation")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database", default=BENCH_DATABASE)
+    args = parser.parse_args()
+
+    # One pooled connection per shopper (mysql-connector caps pools at 32;
+    # beyond that connect_db opens direct connections)
+    config_db.POOL_CONFIG["pool_size"] = min(args.shoppers + 1, 32)
+    use_database(args.database)
+
+    user_ids = shopper_ids(args.shoppers)
+    if len(user_ids) < args.shoppers:
+        raise SystemExit(f"Only {len(user_ids)} shopper users; run benchmarks/gen_data.py with a larger --scale")
+
+    shoppers = [Shopper(user_id, random.Random(args.seed * 100003 + n), args.think_ms / 1000)
+                for n, user_id in enumerate(user_ids)]
+    deadline = time.monotonic() + args.duration
+    threads = [threading.Thread(target=run_shopper, args=(shopper, deadline)) for shopper in shoppers]
+
+    print(f"{args.shoppers} shoppers for {args.duration:.0f} s...")
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'operation':<16}{'count':>8}{'rejected':>9}{'errors':>7}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    total = 0
+    for name in OPERATIONS:
+        latencies = sorted(value for shopper in shoppers for value in shopper.latencies[name])
+        rejected = sum(shopper.rejected[name] for shopper in shoppers)
+        errors = sum(shopper.errors[name] for shopper in shoppers)
+        total += len(latencies)
+        print(f"{name:<16}{len(latencies):>8}{rejected:>9}{errors:>7}"
+              f"{percentile(latencies, 50):>9.1f}{percentile(latencies, 95):>9.1f}"
+              f"{percentile(latencies, 99):>9.1f}{(latencies[-1] if latencies else 0):>9.1f}")
+    print(f"\n{total} operations in {elapsed:.1f} s ({total / elapsed:.0f}/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Concurrent checkout stress test: stock must never go negative.
+
+Usage: python benchmarks/stress_checkout.py [--threads 16] [--checkouts 50] [--stock 100]
+
+Every worker repeatedly fills a fresh cart with random quantities of the
+same few products and checks it out, so the checkouts fight over the same
+product rows. At the end the remaining stock must equal the starting stock
+minus what the successful orders sold, and must never be negative. Exits
+with status 1 if either check fails.
+"""
+import sys
+import os
+import random
+import argparse
+import threading
+import datetime
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_db
+from repositories import orders
+from repositories.reports import chunked
+from benchmarks.bench_db import BENCH_DATABASE, use_database, ensure_bench_user
+
+STRESS_PRODUCTS = ["Stress Product A", "Stress Product B", "Stress Product C"]
+
+def reset_products(stock):
+    """Create (or reset) the contended products and return their ids"""
+    with config_db.db_cursor(commit=True) as cursor:
+        for name in STRESS_PRODUCTS:
+            cursor.execute(
+                """
+                INSERT INTO Products (name, price, stock, status) VALUES (%s, 1.00, %s, 'active')
+                ON DUPLICATE KEY UPDATE stock = VALUES(stock)
+                """,
+                (name, stock)
+            )
+        placeholders = ", ".join(["%s"] * len(STRESS_PRODUCTS))
+        cursor.execute(f"SELECT product_id FROM Products WHERE name IN ({placeholders})", STRESS_PRODUCTS)
+        return [row[0] for row in cursor.fetchall()]
+
+def fill_cart(user_id, product_ids, rng):
+    """Create an active cart holding random quantities of some of the products"""
+    with config_db.db_cursor(commit=True) as cursor:
+        cursor.execute(
+            "INSERT INTO Carts (user_id, created_at, status) VALUES (%s, %s, 'active')",
+            (user_id, datetime.datetime.now())
+        )
+        cart_id = cursor.lastrowid
+        # Shuffled so that insertion order doesn't match the lock order
+        chosen = rng.sample(product_ids, rng.randint(1, len(product_ids)))
+        cursor.executemany(
+            "INSERT INTO CartItems (cart_id, product_id, quantity) VALUES (%s, %s, %s)",
+            [(cart_id, product_id, rng.randint(1, 3)) for product_id in chosen]
+        )
+    return cart_id
+
+def worker(worker_id, user_id, product_ids, checkouts, results, lock):
+    rng = random.Random(worker_id)
+    placed, rejected, failed = [], 0, 0
+    for _ in range(checkouts):
+        cart_id = fill_cart(user_id, product_ids, rng)
+        try:
+            orders.checkout(user_id, cart_id)
+            placed.append(cart_id)
+        except orders.InsufficientStockError:
+            rejected += 1
+        except Exception as err:
+            print(f"Worker {worker_id}: checkout of cart {cart_id} failed: {err}")
+            failed += 1
+
+    with lock:
+        results["placed"].extend(placed)
+        results["rejected"] += rejected
+        results["failed"] += failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--checkouts", type=int, default=50, help="checkouts attempted per thread")
+    parser.add_argument("--stock", type=int, default=100, help="starting stock of each product")
+    parser.add_argument("--database", default=BENCH_DATABASE)
+    args = parser.parse_args()
+
+    # One pooled connection per worker (mysql-connector caps pools at 32)
+    config_db.POOL_CONFIG["pool_size"] = min(args.threads + 1, 32)
+    use_database(args.database)
+
+    product_ids = reset_products(args.stock)
+    with config_db.db_cursor(commit=True) as cursor:
+        user_id = ensure_bench_user(cursor)
+
+    results = {"placed": [], "rejected": 0, "failed": 0}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(i, user_id, product_ids, args.checkouts, results, lock))
+        for i in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    with config_db.db_cursor() as cursor:
+        cursor.execute(f"SELECT product_id, name, stock FROM Products WHERE product_id IN ({placeholders})",
+                       product_ids)
+        stock_rows = cursor.fetchall()
+
+        sold = dict.fromkeys(product_ids, 0)
+        for batch in chunked(results["placed"]):
+            cart_placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(
+                f"""
+                SELECT product_id, SUM(quantity) FROM CartItems
+                WHERE cart_id IN ({cart_placeholders})
+                GROUP BY product_id
+                """,
+                batch
+            )
+            for product_id, quantity in cursor.fetchall():
+                sold[product_id] += int(quantity)
+
+    print(f"Orders placed: {len(results['placed'])}, rejected for stock: {results['rejected']}, "
+          f"errors: {results['failed']}")
+
+    ok = results["failed"] == 0
+    for product_id, name, stock in stock_rows:
+        expected = args.stock - sold[product_id]
+        status = "ok" if stock >= 0 and stock == expected else "MISMATCH"
+        if status != "ok":
+            ok = False
+        print(f"{name:<20} stock {stock:>5}  sold {sold[product_id]:>5}  expected {expected:>5}  {status}")
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
+import os
+import threading
+from contextlib import contextmanager
+
 import mysql.connector
-from tkinter import messagebox
+from mysql.connector import pooling
+
+import query_stats
 
 # Database configuration
 # DB_CONFIG = {
@@ -13,13 +19,82 @@ DB_CONFIG = {
     "user": "root",
     "password": "new_password",
     "database": "supermarkettest",
-   
+
 }
 
+# Connection pool configuration (pool size can be overridden with SUPERMARKET_DB_POOL_SIZE)
+POOL_CONFIG = {
+    "pool_name": "supermarket_pool",
+    "pool_size": int(os.environ.get("SUPERMARKET_DB_POOL_SIZE", 5)),
+    "pool_reset_session": True,
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pooling.MySQLConnectionPool(**POOL_CONFIG, **DB_CONFIG)
+    return _pool
+
+def _checkout_connection():
+    """Take a connection from the pool and make sure it is still alive"""
+    connection = get_pool().get_connection()
+    try:
+        # Health check: reconnect connections the server has dropped while idle
+        connection.ping(reconnect=True, attempts=2, delay=0)
+    except mysql.connector.Error:
+        connection.close()
+        raise
+    return connection
+
 def connect_db():
-    """Create a connection to the database"""
+    """Get a pooled connection to the database (close() returns it to the pool)"""
     try:
-        return mysql.connector.connect(**DB_CONFIG)
+        return query_stats.instrument(_checkout_connection())
+    except pooling.PoolError as err:
+        # Pool exhausted - fall back to a dedicated connection rather than failing the click
+        print(f"Connection pool exhausted ({err}), opening a direct connection")
+        try:
+            return query_stats.instrument(mysql.connector.connect(**DB_CONFIG))
+        except mysql.connector.Error as err:
+            print(f"Database connection error: {err}")
+            return None
     except mysql.connector.Error as err:
         print(f"Database connection error: {err}")
-        return None
\ No newline at end of file
+        return None
+
+@contextmanager
+def db_connection():
+    """Context manager that yields a pooled connection and returns it to the pool afterwards"""
+    connection = connect_db()
+    if connection is None:
+        raise mysql.connector.Error("Could not connect to the database")
+    try:
+        yield connection
+    finally:
+        connection.close()
+
+@contextmanager
+def db_cursor(dictionary=False, commit=False):
+    """Context manager that yields a cursor on a pooled connection.
+
+    With commit=True the transaction is committed when the block succeeds and
+    rolled back if it raises.
+    """
+    with db_connection() as connection:
+        cursor = connection.cursor(dictionary=dictionary)
+        try:
+            yield cursor
+            if commit:
+                connection.commit()
+        except Exception:
+            if commit:
+                connection.rollback()
+            raise
+        finally:
+            cursor.close()
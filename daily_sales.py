@@ -0,0 +1,88 @@
+"""Per-day order counts and revenue, kept in the DailySales rollup table.
+
+The sales tab reads its totals, averages and daily chart from DailySales,
+so a report over a year reads at most 365 rows however many orders there
+were. Checkout calls record_order in the same transaction that inserts the
+order, so the rollup moves with Orders. rebuild recomputes days from Orders
+(admin/rebuild_daily_sales.py runs it), for orders written some other way
+and to repair any drift.
+
+Days are calendar days of Orders.order_date, which is local time.
+"""
+import datetime
+
+def _day_filter(from_date=None, to_date=None):
+    """WHERE clause (and its params) selecting the DailySales rows of the period"""
+    conditions, params = [], []
+    if from_date:
+        conditions.append("sales_date >= %s")
+        params.append(from_date)
+    if to_date:
+        conditions.append("sales_date <= %s")
+        params.append(to_date)
+    if not conditions:
+        return "", []
+    return " WHERE " + " AND ".join(conditions), params
+
+def create_table(cursor):
+    """Create DailySales (if needed) and fill it from the existing orders"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS DailySales (
+        sales_date DATE PRIMARY KEY,
+        order_count INT NOT NULL DEFAULT 0,
+        total_sales DECIMAL(14, 2) NOT NULL DEFAULT 0
+    )
+    """)
+    rebuild(cursor)
+
+def record_order(cursor, order_date, total_amount):
+    """Add one order to its day; call in the transaction that inserts the order"""
+    cursor.execute(
+        """
+        INSERT INTO DailySales (sales_date, order_count, total_sales)
+        VALUES (%s, 1, %s)
+        ON DUPLICATE KEY UPDATE
+            order_count = order_count + 1,
+            total_sales = total_sales + VALUES(total_sales)
+        """,
+        (order_date.date(), total_amount)
+    )
+
+def rebuild(cursor, from_date=None, to_date=None):
+    """Recompute the days from from_date to to_date (all days if None) from Orders.
+
+    Returns the number of days with orders. The caller commits; until then
+    readers keep seeing the old rows.
+    """
+    where, params = _day_filter(from_date, to_date)
+    cursor.execute("DELETE FROM DailySales" + where, params)
+
+    # Whole days as a range on order_date, so idx_orders_date can be used
+    conditions, params = [], []
+    if from_date:
+        conditions.append("order_date >= %s")
+        params.append(datetime.datetime.combine(from_date, datetime.time.min))
+    if to_date:
+        conditions.append("order_date < %s")
+        params.append(datetime.datetime.combine(to_date + datetime.timedelta(days=1), datetime.time.min))
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    cursor.execute(
+        f"""
+        INSERT INTO DailySales (sales_date, order_count, total_sales)
+        SELECT DATE(order_date), COUNT(*), SUM(total_amount)
+        FROM Orders
+        {where}
+        GROUP BY DATE(order_date)
+        """,
+        params
+    )
+    return cursor.rowcount
+
+def fetch_days(cursor, from_date=None, to_date=None):
+    """(sales_date, order_count, total_sales) of the days with orders in the period, oldest first"""
+    where, params = _day_filter(from_date, to_date)
+    cursor.execute(
+        f"SELECT sales_date, order_count, total_sales FROM DailySales{where} ORDER BY sales_date",
+        params
+    )
+    return cursor.fetchall()
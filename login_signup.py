@@ -4,12 +4,13 @@ from PIL import Image
 import mysql.connector
 import hashlib
 import os
-import subprocess
 import re
 import sys
 
-from config_db import connect_db
-from utils_file import hash_password, check_password_strength, write_login_file
+from utils_file import check_password_strength
+from repositories import accounts
+import router
+import session
 
 # Set environment variables
 
@@ -277,53 +278,38 @@ class LoginApp:
             messagebox.showwarning("Input Error", "All fields are required.")
             return
 
-        hashed_password = hash_password(password)
-
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            cursor.execute(
-                "SELECT first_name, last_name, role, status FROM Users WHERE username = %s AND password = %s",
-                (username, hashed_password)
-            )
-            user = cursor.fetchone()
+            user = accounts.authenticate(username, password)
 
             if user:
-                first_name, last_name, role, status = user
+                first_name, last_name, role = user["first_name"], user["last_name"], user["role"]
                 
                 # Check if user account is active
-                if status != "active":
+                if user["status"] != "active":
                     messagebox.showerror("Account Disabled", "Your account has been disabled. Please contact an administrator.")
                     return
                     
                 messagebox.showinfo("Success", f"Welcome {first_name} {last_name} ({role})!")
                 
-                # Save login info for other scripts
-                write_login_file(username, role)
+                # Remember the login for the other screens
+                session.login(username, role)
                 
-                # Launch appropriate view based on user role
-                self.root.destroy()
+                # Show the appropriate view based on user role
                 if role.lower() == "admin":
-                    subprocess.run(["python", "admin/admin_view.py", username])
+                    router.navigate("admin", username=username)
                 else:
-                    subprocess.run(["python", "users/users_view.py", username])
+                    router.navigate("user_dashboard", username=username)
             else:
                 messagebox.showerror("Error", "Invalid Username or Password")
                 
         except mysql.connector.Error as err:
             messagebox.showerror("Database Error", str(err))
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def open_signup(self):
-        self.root.destroy()
-        subprocess.run(["python", "login_signup.py", "signup"])
+        router.navigate("signup")
     
     def open_forgot_password(self):
-        self.root.destroy()
-        subprocess.run(["python", "users/forgot_password.py"])
+        router.navigate("forgot_password")
 
 class SignupApp:
     def __init__(self, root):
@@ -544,21 +530,9 @@ class SignupApp:
             messagebox.showwarning("Invalid Email", "Please enter a valid email address.")
             return
 
-        hashed_password = hash_password(password)
-
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            # Use email as username
-            username = email
-            
-            cursor.execute(
-                "INSERT INTO Users (first_name, last_name, username, email, password, role, secret_key) VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                (first_name, last_name, username, email, hashed_password, "user", secret_key)
-            )
-            
-            connection.commit()
+            # The email is the username
+            accounts.register(first_name, last_name, email, password, secret_key)
             messagebox.showinfo("Success", "User registered successfully!")
             
             # Clear the input fields
@@ -573,14 +547,9 @@ class SignupApp:
             
         except mysql.connector.Error as err:
             messagebox.showerror("Database Error", str(err))
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def open_login(self):
-        self.root.destroy()
-        subprocess.run(["python", "login_signup.py"])
+        router.navigate("login")
 
 # Run the app
 if __name__ == "__main__":
@@ -588,11 +557,12 @@ if __name__ == "__main__":
     ctk.set_default_color_theme("blue")
     
     root = ctk.CTk()
+    router.init(root)
     
     # Check if we should show signup instead of login
     if len(sys.argv) > 1 and sys.argv[1] == "signup":
-        app = SignupApp(root)
+        router.show("signup")
     else:
-        app = LoginApp(root)
+        router.show("login")
         
     root.mainloop()
\ No newline at end of file
@@ -2,12 +2,12 @@ import customtkinter as ctk
 import os
 import sys
 import mysql.connector
-import subprocess
 from tkinter import messagebox
 import shutil
 from PIL import Image, ImageTk
 
 from config_db import connect_db, DB_CONFIG
+import router
 
 # Set environment variables
 def connect_db_without_database():
@@ -84,6 +84,7 @@ def setup_database():
             cart_id INT NOT NULL,
             product_id INT NOT NULL,
             quantity INT NOT NULL DEFAULT 1,
+            UNIQUE KEY uq_cart_product (cart_id, product_id),
             FOREIGN KEY (cart_id) REFERENCES Carts(cart_id),
             FOREIGN KEY (product_id) REFERENCES Products(product_id)
         )
@@ -103,9 +104,24 @@ def setup_database():
         )
         """)
         
+        print("Creating OrderItems table")
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS OrderItems (
+            order_item_id INT AUTO_INCREMENT PRIMARY KEY,
+            order_id INT NOT NULL,
+            product_id INT,
+            product_name VARCHAR(100) NOT NULL,
+            unit_price DECIMAL(10, 2) NOT NULL,
+            quantity INT NOT NULL,
+            FOREIGN KEY (order_id) REFERENCES Orders(order_id)
+        )
+        """)
+        
         conn.commit()
         print("Database tables created successfully")
         
+        run_migrations(cursor, conn)
+        
         create_default_user(cursor, conn)
         create_default_products(cursor, conn)
         
@@ -120,6 +136,150 @@ def setup_database():
             cursor.close()
             conn.close()
 
+def index_exists(cursor, table, index_name):
+    """Check whether the table in the current database has an index with this name"""
+    cursor.execute("""
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    """, (table, index_name))
+    return cursor.fetchone()[0] > 0
+
+def ensure_cart_item_unique_key(cursor):
+    """Add the (cart_id, product_id) unique key to CartItems tables created before it existed"""
+    if index_exists(cursor, "CartItems", "uq_cart_product"):
+        return
+    
+    print("Merging duplicate cart items")
+    # Fold duplicate lines into the oldest one before the key can be added
+    cursor.execute("""
+    UPDATE CartItems ci
+    JOIN (
+        SELECT MIN(cart_item_id) AS keep_id, SUM(quantity) AS total_quantity
+        FROM CartItems
+        GROUP BY cart_id, product_id
+        HAVING COUNT(*) > 1
+    ) dup ON ci.cart_item_id = dup.keep_id
+    SET ci.quantity = dup.total_quantity
+    """)
+    cursor.execute("""
+    DELETE ci FROM CartItems ci
+    JOIN (
+        SELECT cart_id, product_id, MIN(cart_item_id) AS keep_id
+        FROM CartItems
+        GROUP BY cart_id, product_id
+        HAVING COUNT(*) > 1
+    ) dup ON ci.cart_id = dup.cart_id AND ci.product_id = dup.product_id AND ci.cart_item_id <> dup.keep_id
+    """)
+    
+    print("Adding unique key on CartItems (cart_id, product_id)")
+    cursor.execute("ALTER TABLE CartItems ADD UNIQUE KEY uq_cart_product (cart_id, product_id)")
+
+# Secondary indexes for the hot lookups: (table, index name, columns).
+# CartItems (cart_id, product_id) is covered by uq_cart_product.
+SECONDARY_INDEXES = [
+    ("Carts", "idx_carts_user_status", "user_id, status"),
+    ("Orders", "idx_orders_user_date", "user_id, order_date"),
+    ("Orders", "idx_orders_date", "order_date"),
+    ("Products", "idx_products_status_stock", "status, stock"),
+]
+
+def create_secondary_indexes(cursor):
+    """Create any of the SECONDARY_INDEXES that don't exist yet"""
+    for table, index_name, columns in SECONDARY_INDEXES:
+        if not index_exists(cursor, table, index_name):
+            print(f"Adding index {index_name} on {table} ({columns})")
+            cursor.execute(f"ALTER TABLE {table} ADD INDEX {index_name} ({columns})")
+
+def column_exists(cursor, table, column):
+    """Check whether the table in the current database has this column"""
+    cursor.execute("""
+    SELECT COUNT(*) FROM information_schema.columns
+    WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+def add_product_thumbnails(cursor):
+    """Add the thumbnail and image_hash columns and fill them for existing images"""
+    from product_images import prepare_product_image
+    
+    if not column_exists(cursor, "Products", "thumbnail"):
+        cursor.execute("ALTER TABLE Products ADD COLUMN thumbnail MEDIUMBLOB")
+    if not column_exists(cursor, "Products", "image_hash"):
+        cursor.execute("ALTER TABLE Products ADD COLUMN image_hash CHAR(64)")
+    
+    cursor.execute("SELECT product_id FROM Products WHERE image IS NOT NULL AND image_hash IS NULL")
+    product_ids = [row[0] for row in cursor.fetchall()]
+    if product_ids:
+        print(f"Creating thumbnails for {len(product_ids)} product images")
+    
+    # One image at a time so only a single full-size BLOB is held in memory
+    for product_id in product_ids:
+        cursor.execute("SELECT image FROM Products WHERE product_id = %s", (product_id,))
+        thumbnail, content_hash = prepare_product_image(cursor.fetchone()[0])
+        cursor.execute(
+            "UPDATE Products SET thumbnail = %s, image_hash = %s WHERE product_id = %s",
+            (thumbnail, content_hash, product_id)
+        )
+
+def add_product_search_index(cursor):
+    """FULLTEXT and trigram search index on product names"""
+    from product_search import create_search_index
+    create_search_index(cursor)
+
+def add_product_updated_at(cursor):
+    """Products.updated_at, kept current by MySQL, and the index MAX(updated_at) reads"""
+    if not column_exists(cursor, "Products", "updated_at"):
+        cursor.execute("""
+        ALTER TABLE Products ADD COLUMN updated_at TIMESTAMP(6) NOT NULL
+            DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+        """)
+    if not index_exists(cursor, "Products", "idx_products_updated_at"):
+        cursor.execute("ALTER TABLE Products ADD INDEX idx_products_updated_at (updated_at)")
+
+def add_daily_sales(cursor):
+    """DailySales rollup of order counts and revenue per day, filled from Orders"""
+    from daily_sales import create_table
+    create_table(cursor)
+
+# Schema migrations, applied in order and recorded in SchemaVersion.
+# MySQL commits DDL immediately, so a migration interrupted halfway is run
+# again from the start - every step has to be safe to repeat.
+MIGRATIONS = [
+    (1, "Unique (cart_id, product_id) key on CartItems", ensure_cart_item_unique_key),
+    (2, "Secondary indexes for cart, order and catalog lookups", create_secondary_indexes),
+    (3, "Product thumbnails and image hashes", add_product_thumbnails),
+    (4, "Product name search index", add_product_search_index),
+    (5, "Products.updated_at for catalog cache invalidation", add_product_updated_at),
+    (6, "DailySales rollup for the sales reports", add_daily_sales),
+]
+
+def run_migrations(cursor, conn):
+    """Apply the migrations newer than the recorded schema version; returns the new version"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS SchemaVersion (
+        version INT PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM SchemaVersion")
+    current_version = cursor.fetchone()[0]
+    
+    for version, description, migrate in MIGRATIONS:
+        if version <= current_version:
+            continue
+        print(f"Applying migration {version}: {description}")
+        migrate(cursor)
+        cursor.execute(
+            "INSERT INTO SchemaVersion (version, description) VALUES (%s, %s)",
+            (version, description)
+        )
+        conn.commit()
+        current_version = version
+    
+    print(f"Database schema is at version {current_version}")
+    return current_version
+
 def create_default_user(cursor, conn):
     try:
         cursor.execute("SELECT COUNT(*) FROM Users")
@@ -169,11 +329,13 @@ def create_default_products(cursor, conn):
                 ("Brown Rice", 2.00, 35, "available", None)
             ]
             
+            from product_search import index_product
             for product in products:
                 cursor.execute("""
                 INSERT INTO Products (name, price, stock, status, image)
                 VALUES (%s, %s, %s, %s, %s)
                 """, product)
+                index_product(cursor, cursor.lastrowid, product[0])
             
             conn.commit()
             print("Default products created successfully")
@@ -274,28 +436,13 @@ class SuperMarketApp:
         admin_btn.pack(side="left", padx=10)
 
     def open_login(self):
-        self.root.withdraw()
-        try:
-            subprocess.run(["python", "login_signup.py"])
-        except Exception as e:
-            print(f"Error opening login window: {e}")
-        self.root.destroy()
+        router.navigate("login")
 
     def open_signup(self):
-        self.root.withdraw()
-        try:
-            subprocess.run(["python", "login_signup.py", "signup"])
-        except Exception as e:
-            print(f"Error opening signup window: {e}")
-        self.root.destroy()
+        router.navigate("signup")
 
     def open_admin_login(self):
-        self.root.withdraw()
-        try:
-            subprocess.run(["python", "admin/admin_view.py", "login"])
-        except Exception as e:
-            print(f"Error opening admin login window: {e}")
-        self.root.destroy()
+        router.navigate("admin", username="login")
 
 def main():
     print("Checking database connection...")
@@ -318,7 +465,8 @@ def main():
     
     print("Starting SuperMarket Management System...")
     root = ctk.CTk()
-    app = SuperMarketApp(root)
+    router.init(root)
+    router.show("landing")
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,160 @@
+"""Product card thumbnails.
+
+Thumbnails are scaled to THUMBNAIL_SIZE once, when a product image is saved,
+and stored next to the original together with the original's SHA-256
+(Products.thumbnail / Products.image_hash). Screens that show product cards
+only select the hash; the thumbnail bytes are read from an on-disk cache
+keyed by that hash, and only fetched from the database when missing there.
+Ready CTkImage objects are kept in an in-memory LRU.
+"""
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+import ui_profiler
+
+THUMBNAIL_SIZE = (150, 150)
+THUMBNAIL_FORMAT = "PNG"
+
+# Cache directory can be overridden with SUPERMARKET_THUMBNAIL_CACHE
+CACHE_DIR = os.environ.get(
+    "SUPERMARKET_THUMBNAIL_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "supermarket", "thumbnails")
+)
+MEMORY_CACHE_SIZE = 256
+
+# Number of thumbnails fetched from the database per query
+FETCH_BATCH_SIZE = 200
+
+def image_hash(image_data):
+    """Content hash of an original product image"""
+    return hashlib.sha256(image_data).hexdigest()
+
+def make_thumbnail(image_data):
+    """Scale an image to fit THUMBNAIL_SIZE and return it encoded as PNG bytes"""
+    pil_image = Image.open(io.BytesIO(image_data))
+    pil_image = pil_image.convert("RGBA")
+    pil_image.thumbnail(THUMBNAIL_SIZE)
+
+    output = io.BytesIO()
+    pil_image.save(output, format=THUMBNAIL_FORMAT, optimize=True)
+    return output.getvalue()
+
+def prepare_product_image(image_data):
+    """Return (thumbnail, image_hash) to store alongside a product image.
+
+    Both are None when there is no image or it can't be decoded.
+    """
+    if not image_data:
+        return None, None
+    try:
+        return make_thumbnail(image_data), image_hash(image_data)
+    except Exception as e:
+        print(f"Error creating thumbnail: {e}")
+        return None, None
+
+def _cache_path(content_hash):
+    return os.path.join(CACHE_DIR, content_hash[:2], f"{content_hash}.png")
+
+def read_cached_thumbnail(content_hash):
+    """Thumbnail bytes from the disk cache, or None"""
+    try:
+        with open(_cache_path(content_hash), "rb") as file:
+            return file.read()
+    except OSError:
+        return None
+
+def write_cached_thumbnail(content_hash, thumbnail_data):
+    """Store thumbnail bytes in the disk cache (written atomically)"""
+    path = _cache_path(content_hash)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(thumbnail_data)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Error writing thumbnail cache: {e}")
+
+def fetch_thumbnails(cursor, product_ids):
+    """Fetch stored thumbnails for the products, as {image_hash: thumbnail bytes}"""
+    thumbnails = {}
+    product_ids = list(product_ids)
+    for start in range(0, len(product_ids), FETCH_BATCH_SIZE):
+        batch = product_ids[start:start + FETCH_BATCH_SIZE]
+        placeholders = ", ".join(["%s"] * len(batch))
+        cursor.execute(
+            f"""
+            SELECT image_hash, thumbnail FROM Products
+            WHERE product_id IN ({placeholders}) AND thumbnail IS NOT NULL
+            """,
+            batch
+        )
+        for content_hash, thumbnail in cursor.fetchall():
+            thumbnails[content_hash] = bytes(thumbnail)
+    return thumbnails
+
+def cache_thumbnails(cursor, products):
+    """Fetch the thumbnails of products (dicts with "id" and "image_hash") missing
+    from the disk cache into it. Doesn't create images, so it can run off the Tk thread."""
+    missing = [product["id"] for product in products
+               if product.get("image_hash") and not os.path.exists(_cache_path(product["image_hash"]))]
+    if missing:
+        for content_hash, thumbnail_data in fetch_thumbnails(cursor, missing).items():
+            write_cached_thumbnail(content_hash, thumbnail_data)
+
+class ThumbnailCache:
+    """LRU of CTkImage thumbnails keyed by image hash, backed by the disk cache"""
+    def __init__(self, max_items=MEMORY_CACHE_SIZE):
+        self.max_items = max_items
+        self._images = OrderedDict()
+
+    @ui_profiler.timed("decode thumbnail", "image")
+    def _remember(self, content_hash, thumbnail_data):
+        # Imported here so the functions above can be used without Tk
+        import customtkinter as ctk
+
+        pil_image = Image.open(io.BytesIO(thumbnail_data))
+        pil_image.load()
+        image = ctk.CTkImage(light_image=pil_image, size=THUMBNAIL_SIZE)
+
+        self._images[content_hash] = image
+        if len(self._images) > self.max_items:
+            self._images.popitem(last=False)
+        return image
+
+    def get(self, content_hash):
+        """Return the CTkImage for the hash from memory or disk, or None"""
+        if not content_hash:
+            return None
+        if content_hash in self._images:
+            self._images.move_to_end(content_hash)
+            return self._images[content_hash]
+
+        thumbnail_data = read_cached_thumbnail(content_hash)
+        if thumbnail_data is None:
+            return None
+        return self._remember(content_hash, thumbnail_data)
+
+    def put(self, content_hash, thumbnail_data):
+        """Add thumbnail bytes fetched from the database to both caches"""
+        write_cached_thumbnail(content_hash, thumbnail_data)
+        return self._remember(content_hash, thumbnail_data)
+
+    def is_cached(self, content_hash):
+        """True if the hash can be served without touching the database"""
+        return content_hash in self._images or os.path.exists(_cache_path(content_hash))
+
+    def missing_product_ids(self, products):
+        """Ids of products (dicts with "id" and "image_hash") whose thumbnails aren't cached"""
+        return [product["id"] for product in products
+                if product.get("image_hash") and not self.is_cached(product["image_hash"])]
+
+    def load(self, cursor, product_ids):
+        """Fetch the products' thumbnails from the database (in batches) into the caches"""
+        for content_hash, thumbnail_data in fetch_thumbnails(cursor, product_ids).items():
+            self.put(content_hash, thumbnail_data)
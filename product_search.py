@@ -0,0 +1,217 @@
+"""Product name search shared by the customer catalog and the admin inventory.
+
+A search runs in up to two stages:
+
+1. Word search. Every word of the query has to match the start of a word
+   in the product name. Words of at least FULLTEXT_MIN_TOKEN characters go
+   through the FULLTEXT index on Products.name as prefix terms (apple*);
+   shorter ones, which the index doesn't store, are matched with LIKE
+   prefixes instead. Results are ranked by whether the name starts with the
+   query, then FULLTEXT relevance, then shorter names first.
+2. Typo tolerant search, only when the word search finds nothing. Product
+   names are split into trigrams kept in ProductTrigrams; products sharing
+   enough trigrams with the query are candidates, and those whose words are
+   similar enough to the query words (trigram Jaccard similarity) are
+   ranked by that similarity.
+
+ProductTrigrams has to be kept in step with product names: call
+index_product whenever a product is created or renamed.
+"""
+import re
+import math
+
+# innodb_ft_min_token_size; shorter words are not in the FULLTEXT index
+FULLTEXT_MIN_TOKEN = 3
+
+# Minimum similarity (0-1) between a query word and a name word for typo matches
+SIMILARITY_THRESHOLD = 0.3
+# Products sharing the most trigrams with the query that are scored in Python
+FUZZY_CANDIDATES = 200
+# Typo tolerant searches return at most this many products
+MAX_FUZZY_RESULTS = 100
+
+# Products rows are returned as dicts with these keys
+SEARCH_COLUMNS = ["product_id", "name", "price", "stock", "status", "image_hash"]
+
+# Rows inserted per statement when (re)building the trigram index
+INDEX_BATCH_SIZE = 1000
+
+def tokenize(text):
+    """Lowercase words of a product name or query"""
+    return re.findall(r"\w+", text.lower())
+
+def word_trigrams(word):
+    """Trigrams of one word, padded so the start and end of the word count more"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def trigrams(text):
+    """Trigrams of all words in the text"""
+    result = set()
+    for word in tokenize(text):
+        result |= word_trigrams(word)
+    return result
+
+def similarity(query, name):
+    """How closely the name matches the query, from 0 to 1.
+
+    Each query word is compared with its closest word in the name, so extra
+    words in the name ("Fresh", "Organic") don't lower the score.
+    """
+    name_words = [word_trigrams(word) for word in tokenize(name)]
+    query_words = [word_trigrams(word) for word in tokenize(query)]
+    if not name_words or not query_words:
+        return 0.0
+
+    total = 0.0
+    for query_grams in query_words:
+        total += max(len(query_grams & grams) / len(query_grams | grams) for grams in name_words)
+    return total / len(query_words)
+
+def create_search_index(cursor):
+    """Add the FULLTEXT index and the trigram table, and index existing products"""
+    from main import index_exists
+
+    if not index_exists(cursor, "Products", "ft_products_name"):
+        print("Adding FULLTEXT index on Products (name)")
+        cursor.execute("ALTER TABLE Products ADD FULLTEXT INDEX ft_products_name (name)")
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS ProductTrigrams (
+        trigram CHAR(3) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+        product_id INT NOT NULL,
+        PRIMARY KEY (trigram, product_id),
+        INDEX idx_trigrams_product (product_id),
+        FOREIGN KEY (product_id) REFERENCES Products(product_id) ON DELETE CASCADE
+    )
+    """)
+
+    # Only products without trigrams, so an interrupted run picks up where it stopped
+    cursor.execute("""
+    SELECT p.product_id, p.name FROM Products p
+    WHERE NOT EXISTS (SELECT 1 FROM ProductTrigrams t WHERE t.product_id = p.product_id)
+    """)
+    products = cursor.fetchall()
+    if products:
+        print(f"Building search index for {len(products)} products")
+    index_products(cursor, products)
+
+def index_products(cursor, products):
+    """Add the trigrams of (product_id, name) pairs to the search index"""
+    rows = [(gram, product_id) for product_id, name in products for gram in trigrams(name)]
+    for start in range(0, len(rows), INDEX_BATCH_SIZE):
+        cursor.executemany(
+            "INSERT IGNORE INTO ProductTrigrams (trigram, product_id) VALUES (%s, %s)",
+            rows[start:start + INDEX_BATCH_SIZE]
+        )
+
+def index_product(cursor, product_id, name):
+    """Replace the search index entries of a product that was created or renamed"""
+    cursor.execute("DELETE FROM ProductTrigrams WHERE product_id = %s", (product_id,))
+    index_products(cursor, [(product_id, name)])
+
+def _filters(alias, active_only, in_stock):
+    conditions = []
+    if active_only:
+        conditions.append(f"{alias}.status = 'active'")
+    if in_stock:
+        conditions.append(f"{alias}.stock > 0")
+    return conditions
+
+def _escape_like(word):
+    return word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _word_search(cursor, query, words, offset, limit, active_only, in_stock):
+    """Stage 1: every query word must prefix a word of the name"""
+    long_words = [word for word in words if len(word) >= FULLTEXT_MIN_TOKEN]
+    short_words = [word for word in words if len(word) < FULLTEXT_MIN_TOKEN]
+
+    conditions = _filters("p", active_only, in_stock)
+    params = []
+    order = ["p.name LIKE %s DESC"]
+    order_params = [f"{_escape_like(query.strip())}%"]
+    if long_words:
+        boolean_query = " ".join(f"+{word}*" for word in long_words)
+        relevance = "MATCH(p.name) AGAINST (%s IN BOOLEAN MODE)"
+        conditions.append(relevance)
+        params.append(boolean_query)
+        order.append(f"{relevance} DESC")
+        order_params.append(boolean_query)
+    order += ["CHAR_LENGTH(p.name)", "p.product_id"]
+    for word in short_words:
+        # Start of the name (can use the index on name) or of a later word
+        conditions.append("(p.name LIKE %s OR p.name LIKE %s)")
+        params += [f"{_escape_like(word)}%", f"% {_escape_like(word)}%"]
+
+    columns = ", ".join(f"p.{column}" for column in SEARCH_COLUMNS)
+    cursor.execute(
+        f"""
+        SELECT {columns} FROM Products p
+        WHERE {" AND ".join(conditions)}
+        ORDER BY {", ".join(order)}
+        LIMIT %s OFFSET %s
+        """,
+        params + order_params + [limit, offset]
+    )
+    return [dict(zip(SEARCH_COLUMNS, row)) for row in cursor.fetchall()]
+
+def _fuzzy_search(cursor, query, active_only, in_stock):
+    """Stage 2: products with names similar to the query, best match first"""
+    query_grams = sorted(trigrams(query))
+    if not query_grams:
+        return []
+
+    # Candidates need at least a share of the query's trigrams in common
+    min_shared = max(1, math.ceil(len(query_grams) * SIMILARITY_THRESHOLD))
+    conditions = [f"t.trigram IN ({', '.join(['%s'] * len(query_grams))})"]
+    conditions += _filters("p", active_only, in_stock)
+    cursor.execute(
+        f"""
+        SELECT t.product_id FROM ProductTrigrams t
+        JOIN Products p ON p.product_id = t.product_id
+        WHERE {" AND ".join(conditions)}
+        GROUP BY t.product_id
+        HAVING COUNT(*) >= %s
+        ORDER BY COUNT(*) DESC, t.product_id
+        LIMIT %s
+        """,
+        query_grams + [min_shared, FUZZY_CANDIDATES]
+    )
+    candidate_ids = [row[0] for row in cursor.fetchall()]
+    if not candidate_ids:
+        return []
+
+    columns = ", ".join(SEARCH_COLUMNS)
+    cursor.execute(
+        f"SELECT {columns} FROM Products WHERE product_id IN ({', '.join(['%s'] * len(candidate_ids))})",
+        candidate_ids
+    )
+    scored = []
+    for row in cursor.fetchall():
+        product = dict(zip(SEARCH_COLUMNS, row))
+        score = similarity(query, product["name"])
+        if score >= SIMILARITY_THRESHOLD:
+            scored.append((score, product))
+
+    scored.sort(key=lambda item: (-item[0], len(item[1]["name"]), item[1]["product_id"]))
+    return [product for _, product in scored[:MAX_FUZZY_RESULTS]]
+
+def search(cursor, query, offset=0, limit=50, active_only=False, in_stock=False):
+    """Products matching the query, best match first, as a list of dicts.
+
+    Takes a plain (tuple) cursor. active_only/in_stock restrict the results
+    to what customers can buy. offset/limit page through the ranked results.
+    """
+    words = tokenize(query)
+    if not words:
+        return []
+
+    products = _word_search(cursor, query, words, offset, limit, active_only, in_stock)
+    if products:
+        return products
+    # Past the last page of word matches, rather than no word matches at all
+    if offset > 0 and _word_search(cursor, query, words, 0, 1, active_only, in_stock):
+        return []
+
+    # Nothing matched word for word: try again allowing for typos
+    return _fuzzy_search(cursor, query, active_only, in_stock)[offset:offset + limit]
@@ -0,0 +1,285 @@
+"""Per-query latency statistics and a slow-query log.
+
+Switched on by setting SUPERMARKET_QUERY_STATS=1. connect_db then hands out
+connections whose cursors time every statement: from the start of execute()
+until its result has been read (the fetches are included, since unbuffered
+cursors only read rows as they are fetched). When the cursor runs its next
+statement or is closed, the statement is recorded under its fingerprint -
+the SQL with literals and placeholders replaced by ? and IN lists collapsed -
+with its duration, row count and call site (the function that called
+execute, and the one that called it).
+
+For every fingerprint the totals are kept, and the durations of its last
+RECENT_SAMPLES executions give the percentiles and the latency histogram of
+the summary. Statements slower than SLOW_QUERY_MS are appended to
+SLOW_QUERY_LOG as they finish; only fingerprints are logged, never the
+parameters. The summary is printed when the process exits, and the admin
+panel shows it on Ctrl+Shift+Q.
+
+Recording costs a few microseconds per statement (fingerprints are cached),
+see benchmarks/bench_query_stats.py.
+"""
+import os
+import re
+import sys
+import atexit
+import bisect
+import datetime
+import functools
+import threading
+from collections import deque
+from time import perf_counter
+
+ENABLED = os.environ.get("SUPERMARKET_QUERY_STATS", "") not in ("", "0")
+# Statements at least this slow are written to the slow-query log
+SLOW_QUERY_MS = float(os.environ.get("SUPERMARKET_SLOW_QUERY_MS", 100))
+SLOW_QUERY_LOG = os.environ.get(
+    "SUPERMARKET_SLOW_QUERY_LOG",
+    os.path.join(os.path.expanduser("~"), ".cache", "supermarket", "slow_queries.log")
+)
+# Durations kept per fingerprint for the percentiles and histogram
+RECENT_SAMPLES = 1000
+# Tk key sequence that opens the summary in the admin panel (router unbinds it
+# when the screen changes)
+SHORTCUT = "<Control-Shift-Q>"
+# Upper bounds (ms) of the histogram buckets; the last bucket is open
+HISTOGRAM_MS = [1, 5, 10, 50, 100, 500, 1000]
+
+# Call sites are shown relative to the app's directory
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"|%\(\w+\)s|%s|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+_stats = {}
+_lock = threading.Lock()
+_log_file = None
+_log_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(query):
+    """The statement with its literal values replaced by ?, on one line"""
+    if isinstance(query, (bytes, bytearray)):
+        query = query.decode("utf-8", "replace")
+    query = _LITERALS.sub("?", query)
+    query = _IN_LISTS.sub("(...)", query)
+    return _SPACES.sub(" ", query).strip()
+
+def format_site(site):
+    """'file:line function' of a call site, with its caller after <-.
+
+    A site is (file, line, function) of the code that ran the statement
+    followed by those of its caller, or three Nones if there was none.
+    """
+    parts = []
+    for filename, lineno, name in (site[:3], site[3:]):
+        if filename is None:
+            continue
+        if filename.startswith(APP_DIR):
+            filename = os.path.relpath(filename, APP_DIR)
+        parts.append(f"{filename}:{lineno} {name}")
+    return " <- ".join(parts)
+
+class QueryStats:
+    """Totals of one fingerprint, and the durations of its recent executions"""
+    __slots__ = ("calls", "total_ms", "max_ms", "rows", "recent", "sites")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        # call site -> executions
+        self.sites = {}
+
+    def percentiles(self, *percents):
+        """Nearest-rank percentiles of the recent durations"""
+        durations = sorted(self.recent)
+        return [durations[max(1, round(percent / 100 * len(durations))) - 1] for percent in percents]
+
+    def histogram(self):
+        """Recent executions per HISTOGRAM_MS bucket"""
+        counts = [0] * (len(HISTOGRAM_MS) + 1)
+        for duration_ms in self.recent:
+            counts[bisect.bisect_right(HISTOGRAM_MS, duration_ms)] += 1
+        return counts
+
+    def top_site(self):
+        return max(self.sites, key=self.sites.get)
+
+def _write_slow(key, duration_ms, rows, site):
+    global _log_file
+    line = (f"{datetime.datetime.now():%Y-%m-%d %H:%M:%S.%f}\t{duration_ms:.1f} ms\t{rows} rows\t"
+            f"{format_site(site)}\t{key}\n")
+    with _log_lock:
+        try:
+            if _log_file is None:
+                os.makedirs(os.path.dirname(SLOW_QUERY_LOG), exist_ok=True)
+                _log_file = open(SLOW_QUERY_LOG, "a", encoding="utf-8", buffering=1)
+            _log_file.write(line)
+        except OSError as err:
+            print(f"Could not write the slow-query log: {err}")
+
+def record(query, duration_ms, rows, site):
+    """Add one finished statement to the statistics"""
+    key = fingerprint(query)
+    with _lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = QueryStats()
+        stats.calls += 1
+        stats.total_ms += duration_ms
+        if duration_ms > stats.max_ms:
+            stats.max_ms = duration_ms
+        stats.rows += rows
+        stats.recent.append(duration_ms)
+        stats.sites[site] = stats.sites.get(site, 0) + 1
+    if duration_ms >= SLOW_QUERY_MS:
+        _write_slow(key, duration_ms, rows, site)
+
+class InstrumentedCursor:
+    """Cursor wrapper that records every statement it runs"""
+    def __init__(self, cursor):
+        self._cursor = cursor
+        # [query, ms so far, call site] of the statement whose result is being read
+        self._pending = None
+
+    def _finish(self):
+        if self._pending is not None:
+            query, duration_ms, site = self._pending
+            self._pending = None
+            record(query, duration_ms, max(self._cursor.rowcount, 0), site)
+
+    def _site(self, frame):
+        code = frame.f_code
+        caller = frame.f_back
+        if caller is None:
+            return (code.co_filename, frame.f_lineno, code.co_name, None, None, None)
+        caller_code = caller.f_code
+        return (code.co_filename, frame.f_lineno, code.co_name,
+                caller_code.co_filename, caller.f_lineno, caller_code.co_name)
+
+    # execute and the fetches run for every statement, so they are kept flat
+    def execute(self, operation, *args, **kwargs):
+        site = self._site(sys._getframe(1))
+        if self._pending is not None:
+            self._finish()
+        start = perf_counter()
+        try:
+            return self._cursor.execute(operation, *args, **kwargs)
+        finally:
+            self._pending = [operation, (perf_counter() - start) * 1000, site]
+
+    def executemany(self, operation, *args, **kwargs):
+        site = self._site(sys._getframe(1))
+        if self._pending is not None:
+            self._finish()
+        start = perf_counter()
+        try:
+            return self._cursor.executemany(operation, *args, **kwargs)
+        finally:
+            self._pending = [operation, (perf_counter() - start) * 1000, site]
+
+    def fetchone(self):
+        start = perf_counter()
+        try:
+            return self._cursor.fetchone()
+        finally:
+            if self._pending is not None:
+                self._pending[1] += (perf_counter() - start) * 1000
+
+    def fetchmany(self, *args, **kwargs):
+        start = perf_counter()
+        try:
+            return self._cursor.fetchmany(*args, **kwargs)
+        finally:
+            if self._pending is not None:
+                self._pending[1] += (perf_counter() - start) * 1000
+
+    def fetchall(self):
+        start = perf_counter()
+        try:
+            return self._cursor.fetchall()
+        finally:
+            if self._pending is not None:
+                self._pending[1] += (perf_counter() - start) * 1000
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+class InstrumentedConnection:
+    """Connection wrapper whose cursors are InstrumentedCursors"""
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+def instrument(connection):
+    """The connection, wrapped to record its statements when statistics are enabled"""
+    if not ENABLED or connection is None:
+        return connection
+    return InstrumentedConnection(connection)
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+def summary(limit=25):
+    """Text table of the fingerprints that took the most time in total"""
+    # Copied under the lock, summarised outside it so recording isn't held up
+    with _lock:
+        copies = []
+        for key, stats in _stats.items():
+            copy = QueryStats()
+            copy.calls, copy.total_ms, copy.max_ms, copy.rows = stats.calls, stats.total_ms, stats.max_ms, stats.rows
+            copy.recent.extend(stats.recent)
+            copy.sites = dict(stats.sites)
+            copies.append((key, copy))
+    rows = [(key, stats.calls, stats.total_ms, stats.max_ms, stats.rows,
+             stats.percentiles(50, 95, 99), stats.histogram(), stats.top_site())
+            for key, stats in copies]
+    if not rows:
+        return "No queries recorded."
+    rows.sort(key=lambda row: row[2], reverse=True)
+
+    bucket_names = [f"<{bound}ms" for bound in HISTOGRAM_MS] + [f">={HISTOGRAM_MS[-1]}ms"]
+    lines = [
+        f"{len(rows)} queries, {sum(row[1] for row in rows)} executions, "
+        f"{sum(row[2] for row in rows):.0f} ms in total (slow-query log: >= {SLOW_QUERY_MS:g} ms)",
+        "",
+        f"{'calls':>8}{'total ms':>11}{'mean':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>9}{'rows/call':>11}",
+    ]
+    for key, calls, total_ms, max_ms, row_count, (p50, p95, p99), histogram, site in rows[:limit]:
+        lines.append(f"{calls:>8}{total_ms:>11.1f}{total_ms / calls:>8.2f}{p50:>8.2f}{p95:>8.2f}{p99:>8.2f}"
+                     f"{max_ms:>9.2f}{row_count / calls:>11.1f}")
+        lines.append(f"    {key[:200]}")
+        lines.append(f"    at {format_site(site)}")
+        lines.append("    " + "  ".join(f"{name} {count}" for name, count in zip(bucket_names, histogram) if count))
+    if len(rows) > limit:
+        lines.append(f"... and {len(rows) - limit} more")
+    return "\n".join(lines)
+
+def dump_summary():
+    print("\nQuery statistics\n" + summary())
+
+if ENABLED:
+    atexit.register(dump_summary)
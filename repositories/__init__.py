@@ -0,0 +1,12 @@
+"""Data access for the screens, without Tk.
+
+Every query the customer and admin screens run lives in one of these
+modules: catalog (products and the customer catalog), cart, orders
+(checkout and order history), accounts (users and logins) and reports.
+The public functions take and return plain values, open their own pooled
+connections and commit their own transactions, so they can be called from
+worker threads, scripts and benchmarks without a display. The rows they
+return are dicts whose keys are declared as TypedDicts. Failures the user
+has to be told about are raised as the module's exceptions; the screens
+decide how to show them.
+"""
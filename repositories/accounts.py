@@ -0,0 +1,184 @@
+"""User accounts: logins, sign-ups, password resets and the admin user list.
+
+Passwords are stored as utils_file.hash_password hashes; functions here
+take and compare plain passwords and hash them themselves. Accounts the
+admin panel creates get the part of the email before the @ as username,
+sign-ups get the whole email.
+"""
+from typing import Optional, TypedDict
+
+from config_db import db_cursor
+from utils_file import hash_password
+
+# Password given to accounts the admin creates or resets
+DEFAULT_PASSWORD = "password123"
+
+class User(TypedDict):
+    """The logged-in user of a screen"""
+    user_id: int
+    username: str
+    first_name: str
+    last_name: str
+    role: str
+
+class LoginUser(TypedDict):
+    user_id: int
+    first_name: str
+    last_name: str
+    role: str
+    status: str
+
+class UserAccount(TypedDict):
+    """A row of the admin user list"""
+    user_id: int
+    first_name: str
+    last_name: str
+    username: str
+    email: str
+    role: str
+    status: str
+
+class DuplicateUsernameError(Exception):
+    """Raised when another user already has the username"""
+
+class UserInUseError(Exception):
+    """Raised when deleting a user that orders or carts still refer to"""
+
+def get_user(username) -> Optional[User]:
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(
+            "SELECT user_id, username, first_name, last_name, role FROM Users WHERE username = %s",
+            (username,)
+        )
+        return cursor.fetchone()
+
+def authenticate(username, password) -> Optional[LoginUser]:
+    """The user with this username and password, or None; check status before letting them in"""
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(
+            "SELECT user_id, first_name, last_name, role, status FROM Users WHERE username = %s AND password = %s",
+            (username, hash_password(password))
+        )
+        return cursor.fetchone()
+
+def register(first_name, last_name, email, password, secret_key) -> int:
+    """Sign up a customer, with the email as username; returns the user_id"""
+    with db_cursor(commit=True) as cursor:
+        cursor.execute(
+            """
+            INSERT INTO Users (first_name, last_name, username, email, password, role, secret_key)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """,
+            (first_name, last_name, email, email, hash_password(password), "user", secret_key)
+        )
+        return cursor.lastrowid
+
+def reset_forgotten_password(username, secret_key, new_password) -> bool:
+    """Set a new password if the secret key matches; False if it doesn't"""
+    with db_cursor(commit=True) as cursor:
+        cursor.execute(
+            "SELECT user_id FROM Users WHERE username = %s AND secret_key = %s",
+            (username, secret_key)
+        )
+        if cursor.fetchone() is None:
+            return False
+        cursor.execute(
+            "UPDATE Users SET password = %s WHERE username = %s",
+            (hash_password(new_password), username)
+        )
+        return True
+
+def list_users(search_term=None) -> list[UserAccount]:
+    """All users, or those whose name, username or email contains the term"""
+    query = "SELECT user_id, first_name, last_name, username, email, role, status FROM Users"
+    params = ()
+    if search_term:
+        search_pattern = f"%{search_term}%"
+        query += " WHERE first_name LIKE %s OR last_name LIKE %s OR username LIKE %s OR email LIKE %s"
+        params = (search_pattern,) * 4
+    query += " ORDER BY role, first_name, last_name"
+
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+def count_users() -> int:
+    with db_cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM Users")
+        return cursor.fetchone()[0]
+
+def user_details(user_id) -> Optional[dict]:
+    """user_id, first_name, last_name, username, email and role of a user, or None"""
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(
+            "SELECT user_id, first_name, last_name, username, email, role FROM Users WHERE user_id = %s",
+            (user_id,)
+        )
+        return cursor.fetchone()
+
+def _username_taken(cursor, username, user_id=None):
+    if user_id is None:
+        cursor.execute("SELECT user_id FROM Users WHERE username = %s", (username,))
+    else:
+        cursor.execute("SELECT user_id FROM Users WHERE username = %s AND user_id != %s", (username, user_id))
+    return cursor.fetchone() is not None
+
+def add_user(first_name, last_name, email, role, password=DEFAULT_PASSWORD) -> int:
+    """Create an account; raises DuplicateUsernameError if its username is taken"""
+    username = email.split("@")[0]
+    with db_cursor(commit=True) as cursor:
+        if _username_taken(cursor, username):
+            raise DuplicateUsernameError("A user with this username already exists.")
+        cursor.execute(
+            """
+            INSERT INTO Users (first_name, last_name, username, email, password, role)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            (first_name, last_name, username, email, hash_password(password), role)
+        )
+        return cursor.lastrowid
+
+def update_user(user_id, first_name, last_name, email, role) -> None:
+    """Change an account's details; raises DuplicateUsernameError if the new username is taken"""
+    username = email.split("@")[0]
+    with db_cursor(commit=True) as cursor:
+        if _username_taken(cursor, username, user_id):
+            raise DuplicateUsernameError("Another user with this username already exists.")
+        cursor.execute(
+            """
+            UPDATE Users
+            SET first_name = %s, last_name = %s, username = %s, email = %s, role = %s
+            WHERE user_id = %s
+            """,
+            (first_name, last_name, username, email, role, user_id)
+        )
+
+def set_status(user_id, status) -> None:
+    with db_cursor(commit=True) as cursor:
+        cursor.execute("UPDATE Users SET status = %s WHERE user_id = %s", (status, user_id))
+
+def reset_password(user_id, password=DEFAULT_PASSWORD) -> None:
+    with db_cursor(commit=True) as cursor:
+        cursor.execute("UPDATE Users SET password = %s WHERE user_id = %s", (hash_password(password), user_id))
+
+def delete_user(user_id) -> None:
+    """Delete an account; raises UserInUseError if it has orders or carts"""
+    with db_cursor(commit=True) as cursor:
+        cursor.execute("SELECT COUNT(*) FROM Orders WHERE user_id = %s", (user_id,))
+        order_count = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM Carts WHERE user_id = %s", (user_id,))
+        cart_count = cursor.fetchone()[0]
+        if order_count > 0 or cart_count > 0:
+            raise UserInUseError("This user has orders or carts. Consider deactivating their account instead.")
+        cursor.execute("DELETE FROM Users WHERE user_id = %s", (user_id,))
+
+def repair_status_column() -> tuple[bool, int]:
+    """Add Users.status if it is missing and set NULL statuses to active;
+    returns (column added, users fixed)"""
+    with db_cursor(commit=True) as cursor:
+        cursor.execute("SHOW COLUMNS FROM Users LIKE 'status'")
+        column_added = cursor.fetchone() is None
+        if column_added:
+            cursor.execute("ALTER TABLE Users ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'active'")
+        cursor.execute("UPDATE Users SET status = 'active' WHERE status IS NULL")
+        return column_added, cursor.rowcount
@@ -0,0 +1,173 @@
+"""The customer's cart: reading it, and adding or changing its items.
+
+Each mutation runs on one pooled connection: the stock check is part of the
+same statement as the write, and the transaction is committed once.
+"""
+import datetime
+from decimal import Decimal
+from typing import Optional, TypedDict
+
+from config_db import db_connection, db_cursor
+
+# Insert the item, or add to its quantity if the cart already holds it.
+# The SELECT yields no row when the cart is no longer active or the new
+# total would exceed stock, so nothing is written in those cases.
+# LAST_INSERT_ID(expr) makes cursor.lastrowid the existing row's id on update.
+ADD_ITEM_SQL = """
+    INSERT INTO CartItems (cart_id, product_id, quantity)
+    SELECT c.cart_id, p.product_id, %s
+    FROM Carts c
+    JOIN Products p ON p.product_id = %s
+    WHERE c.cart_id = %s AND c.user_id = %s AND c.status = 'active'
+        AND p.stock >= %s + COALESCE((
+            SELECT ci.quantity FROM CartItems ci
+            WHERE ci.cart_id = c.cart_id AND ci.product_id = p.product_id
+        ), 0)
+    ON DUPLICATE KEY UPDATE
+        quantity = quantity + VALUES(quantity),
+        cart_item_id = LAST_INSERT_ID(cart_item_id)
+"""
+
+SET_QUANTITY_SQL = """
+    UPDATE CartItems ci
+    JOIN Products p ON p.product_id = ci.product_id
+    SET ci.quantity = %s
+    WHERE ci.cart_item_id = %s AND p.stock >= %s
+"""
+
+class CartLine(TypedDict):
+    """One item of a cart, with the product's current name and price"""
+    cart_item_id: int
+    product_id: int
+    name: str
+    price: Decimal
+    quantity: int
+
+class StockLimitError(Exception):
+    """Raised when a cart change would take more units than are in stock"""
+    def __init__(self, available):
+        super().__init__(f"Only {available} available")
+        self.available = available
+
+def get_or_create_active_cart(cursor, user_id) -> int:
+    """Return the user's active cart id, creating a cart if there is none"""
+    cursor.execute(
+        "SELECT cart_id FROM Carts WHERE user_id = %s AND status = 'active' LIMIT 1",
+        (user_id,)
+    )
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+
+    cursor.execute(
+        "INSERT INTO Carts (user_id, created_at, status) VALUES (%s, %s, %s)",
+        (user_id, datetime.datetime.now(), "active")
+    )
+    return cursor.lastrowid
+
+def active_cart_id(user_id) -> int:
+    """The user's active cart id, creating a cart if there is none"""
+    with db_cursor(commit=True) as cursor:
+        return get_or_create_active_cart(cursor, user_id)
+
+def load_cart(user_id) -> tuple[Optional[int], list[CartLine]]:
+    """(cart_id, items) of the user's active cart, or (None, [])"""
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(
+            "SELECT cart_id FROM Carts WHERE user_id = %s AND status = 'active' LIMIT 1",
+            (user_id,)
+        )
+        cart = cursor.fetchone()
+        if not cart:
+            return None, []
+
+        cursor.execute(
+            """
+            SELECT ci.cart_item_id, p.product_id, p.name, p.price, ci.quantity
+            FROM CartItems ci
+            JOIN Products p ON ci.product_id = p.product_id
+            WHERE ci.cart_id = %s
+            """,
+            (cart["cart_id"],)
+        )
+        return cart["cart_id"], cursor.fetchall()
+
+def _available_to_add(cursor, cart_id, product_id):
+    """Units of the product that can still be added to the cart"""
+    cursor.execute(
+        """
+        SELECT p.stock - COALESCE(ci.quantity, 0)
+        FROM Products p
+        LEFT JOIN CartItems ci ON ci.product_id = p.product_id AND ci.cart_id = %s
+        WHERE p.product_id = %s
+        """,
+        (cart_id, product_id)
+    )
+    row = cursor.fetchone()
+    return max(row[0], 0) if row else 0
+
+def _cart_is_active(cursor, cart_id, user_id):
+    cursor.execute(
+        "SELECT 1 FROM Carts WHERE cart_id = %s AND user_id = %s AND status = 'active'",
+        (cart_id, user_id)
+    )
+    return cursor.fetchone() is not None
+
+def add_item(user_id, product_id, quantity, cart_id=None) -> tuple[int, int, bool]:
+    """Add quantity units of a product to the user's active cart.
+
+    Pass the cached cart_id to skip the cart lookup; a stale id (e.g. a cart
+    checked out elsewhere) is detected and replaced. Returns
+    (cart_id, cart_item_id, inserted) where inserted is False when an existing
+    line was incremented. Raises StockLimitError if stock is short.
+    """
+    with db_connection() as connection:
+        cursor = connection.cursor()
+        try:
+            if cart_id is None:
+                cart_id = get_or_create_active_cart(cursor, user_id)
+
+            cursor.execute(ADD_ITEM_SQL, (quantity, product_id, cart_id, user_id, quantity))
+
+            if cursor.rowcount == 0:
+                # Either the cached cart is gone or stock is short - find out which
+                if not _cart_is_active(cursor, cart_id, user_id):
+                    cart_id = get_or_create_active_cart(cursor, user_id)
+                    cursor.execute(ADD_ITEM_SQL, (quantity, product_id, cart_id, user_id, quantity))
+
+                if cursor.rowcount == 0:
+                    available = _available_to_add(cursor, cart_id, product_id)
+                    connection.rollback()
+                    raise StockLimitError(available)
+
+            # rowcount is 1 for a new row and 2 when the duplicate key was updated
+            inserted = cursor.rowcount == 1
+            cart_item_id = cursor.lastrowid
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    return cart_id, cart_item_id, inserted
+
+def set_item_quantity(cart_item_id, product_id, quantity) -> None:
+    """Set a cart line's quantity if stock allows it, otherwise raise StockLimitError"""
+    with db_connection() as connection:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(SET_QUANTITY_SQL, (quantity, cart_item_id, quantity))
+
+            if cursor.rowcount == 0:
+                cursor.execute("SELECT stock FROM Products WHERE product_id = %s", (product_id,))
+                row = cursor.fetchone()
+                connection.rollback()
+                raise StockLimitError(row[0] if row else 0)
+
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
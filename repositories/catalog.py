@@ -0,0 +1,183 @@
+"""Products: the customer catalog and the admin inventory.
+
+The customer grid reads pages of cards (CatalogProduct, prices already
+formatted) through page_cache, a CatalogCache shared by the whole process,
+or ranked search results. The admin inventory reads InventoryProduct rows
+and creates, edits and deletes products; every write keeps the search index
+(product_search) and the stored thumbnail in step with the product.
+"""
+import datetime
+from decimal import Decimal
+from typing import Optional, TypedDict
+
+from config_db import db_cursor
+from product_images import prepare_product_image, cache_thumbnails
+from repositories.catalog_cache import CatalogCache
+import product_search
+
+# Catalog pages, refetched only when the catalog has changed
+page_cache = CatalogCache()
+
+class CatalogProduct(TypedDict):
+    """A product card of the customer grid"""
+    id: int
+    name: str
+    price: str  # formatted for display
+    raw_price: float
+    image_hash: Optional[str]  # thumbnail cache key
+    stock: int
+
+class InventoryProduct(TypedDict):
+    """A row of the admin inventory table"""
+    product_id: int
+    name: str
+    price: Decimal
+    stock: int
+    status: str
+    updated_at: datetime.datetime
+
+class DuplicateProductError(Exception):
+    """Raised when another product already has the name"""
+    def __init__(self, name):
+        super().__init__(f"Product '{name}' already exists.")
+        self.name = name
+
+class ProductInUseError(Exception):
+    """Raised when deleting a product that carts still refer to"""
+
+def _card(product) -> CatalogProduct:
+    return {
+        "id": product["product_id"],
+        "name": product["name"],
+        "price": f"${float(product['price']):.2f}",
+        "raw_price": float(product["price"]),
+        "image_hash": product["image_hash"],
+        "stock": product["stock"],
+    }
+
+def catalog_page(after_id, limit) -> list[CatalogProduct]:
+    """Products customers can buy, by product_id, starting after after_id (keyset paging)"""
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(
+            """
+            SELECT product_id, name, price, image_hash, stock FROM Products
+            WHERE stock > 0 AND status = 'active' AND product_id > %s
+            ORDER BY product_id
+            LIMIT %s
+            """,
+            (after_id, limit)
+        )
+        return [_card(product) for product in cursor.fetchall()]
+
+def search_catalog(query, offset, limit) -> list[CatalogProduct]:
+    """Products customers can buy matching the query, best matches first"""
+    with db_cursor() as cursor:
+        products = product_search.search(cursor, query, offset, limit, active_only=True, in_stock=True)
+    return [_card(product) for product in products]
+
+def grid_page(search_query, page_index, after_id, page_size) -> list[CatalogProduct]:
+    """One page of the customer grid plus a look-ahead product, with their
+    thumbnails in the disk cache. Search results are ranked by relevance, so
+    they are paged by position instead of product_id."""
+    if search_query:
+        products = search_catalog(search_query, page_index * page_size, page_size + 1)
+    else:
+        products = page_cache.get_page(after_id, page_size + 1, catalog_page)
+
+    with db_cursor() as cursor:
+        cache_thumbnails(cursor, products)
+    return products
+
+def inventory(since=None) -> tuple[list[InventoryProduct], set[int]]:
+    """(products, every product_id) for the inventory table.
+
+    With since, only the products changed at or after it are read (through
+    idx_products_updated_at); the ids, read from the primary key, show which
+    were deleted since.
+    """
+    with db_cursor(dictionary=True) as cursor:
+        if since is None:
+            cursor.execute("SELECT product_id, name, price, stock, status, updated_at FROM Products")
+            products = cursor.fetchall()
+            return products, {product["product_id"] for product in products}
+
+        cursor.execute(
+            "SELECT product_id, name, price, stock, status, updated_at FROM Products WHERE updated_at >= %s",
+            (since,)
+        )
+        products = cursor.fetchall()
+        cursor.execute("SELECT product_id FROM Products")
+        return products, {row["product_id"] for row in cursor.fetchall()}
+
+def search_inventory(search_term, limit) -> list[dict]:
+    """All products (whatever their status) matching the term, best matches first,
+    with the product_search.SEARCH_COLUMNS keys"""
+    with db_cursor() as cursor:
+        return product_search.search(cursor, search_term, limit=limit)
+
+def product_details(product_id) -> Optional[dict]:
+    """Every column of a product, or None"""
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute("SELECT * FROM Products WHERE product_id = %s", (product_id,))
+        return cursor.fetchone()
+
+def _name_taken(cursor, name, product_id=None):
+    if product_id is None:
+        cursor.execute("SELECT product_id FROM Products WHERE name = %s", (name,))
+    else:
+        cursor.execute("SELECT product_id FROM Products WHERE name = %s AND product_id != %s",
+                       (name, product_id))
+    return cursor.fetchone() is not None
+
+def add_product(name, price, stock, image_data=None, status="active") -> int:
+    """Create a product (with the thumbnail of its image) and return its id.
+
+    Raises DuplicateProductError if the name is taken.
+    """
+    thumbnail, image_hash = prepare_product_image(image_data)
+    with db_cursor(commit=True) as cursor:
+        if _name_taken(cursor, name):
+            raise DuplicateProductError(name)
+        cursor.execute(
+            """
+            INSERT INTO Products (name, price, stock, image, thumbnail, image_hash, status)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """,
+            (name, price, stock, image_data, thumbnail, image_hash, status)
+        )
+        product_id = cursor.lastrowid
+        product_search.index_product(cursor, product_id, name)
+    return product_id
+
+def update_product(product_id, name, price, stock, image_data=None, status="active") -> None:
+    """Replace a product's fields and image; raises DuplicateProductError if
+    another product has the name"""
+    thumbnail, image_hash = prepare_product_image(image_data)
+    with db_cursor(commit=True) as cursor:
+        if _name_taken(cursor, name, product_id):
+            raise DuplicateProductError(name)
+        cursor.execute(
+            """
+            UPDATE Products
+            SET name = %s, price = %s, stock = %s, image = %s, thumbnail = %s, image_hash = %s, status = %s
+            WHERE product_id = %s
+            """,
+            (name, price, stock, image_data, thumbnail, image_hash, status, product_id)
+        )
+        product_search.index_product(cursor, product_id, name)
+
+def set_status(product_id, status) -> None:
+    with db_cursor(commit=True) as cursor:
+        cursor.execute("UPDATE Products SET status = %s WHERE product_id = %s", (status, product_id))
+
+def delete_product(product_id) -> None:
+    """Delete a product; raises ProductInUseError if a cart holds it"""
+    with db_cursor(commit=True) as cursor:
+        cursor.execute("SELECT COUNT(*) FROM CartItems WHERE product_id = %s", (product_id,))
+        if cursor.fetchone()[0] > 0:
+            raise ProductInUseError(
+                "This product is in active carts or orders. Consider marking it as out of stock instead."
+            )
+        cursor.execute("DELETE FROM Products WHERE product_id = %s", (product_id,))
+    # Deletes don't move MAX(updated_at), so the cached pages wouldn't notice
+    page_cache.invalidate()
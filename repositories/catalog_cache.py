@@ -0,0 +1,78 @@
+"""Read-through cache of the customer catalog pages.
+
+Pages of the product grid are kept in memory. For TTL seconds after the
+catalog was last known to be current they are served without touching the
+database; after that, one small query (MAX(Products.updated_at), answered
+from an index) tells whether anything changed. If nothing did, the cached
+pages are trusted for another TTL seconds; otherwise they are dropped and
+refetched as they are asked for.
+
+updated_at is maintained by MySQL (ON UPDATE CURRENT_TIMESTAMP(6)), so every
+insert or update of a product moves it forward, whether it comes from the
+admin panel or from checkout taking stock. Deletes, and transactions that
+commit after a newer change was already seen, don't move it, so pages are
+refetched regardless after MAX_AGE seconds.
+"""
+import time
+import threading
+
+from config_db import db_cursor
+
+# Seconds cached pages are used without checking the catalog version
+TTL = 10
+# Seconds after which cached pages are refetched even if the version didn't change
+MAX_AGE = 120
+
+class CatalogCache:
+    """Catalog pages keyed by (after_id, limit), invalidated when the catalog changes.
+
+    Used from worker threads, so all access goes through a lock.
+    """
+    def __init__(self, ttl=TTL, max_age=MAX_AGE):
+        self.ttl = ttl
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._filled_at = 0.0
+
+    def invalidate(self):
+        """Forget all pages, e.g. after this process changed the catalog"""
+        with self._lock:
+            self._pages.clear()
+            self._version = None
+
+    def get_page(self, after_id, limit, fetch):
+        """Return the page from the cache, or fetch(after_id, limit) and remember it"""
+        key = (after_id, limit)
+        with self._lock:
+            self._check_version()
+            if key in self._pages:
+                return self._pages[key]
+            version = self._version
+
+        products = fetch(after_id, limit)
+
+        with self._lock:
+            # Don't store a page if the catalog changed while it was fetched
+            if self._version == version:
+                self._pages[key] = products
+        return products
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._filled_at > self.max_age:
+            self._pages.clear()
+            self._version = None
+        elif now - self._checked_at < self.ttl and self._version is not None:
+            return
+
+        with db_cursor() as cursor:
+            cursor.execute("SELECT MAX(updated_at) FROM Products")
+            version = cursor.fetchone()[0]
+        self._checked_at = now
+        if version != self._version or not self._pages:
+            self._pages.clear()
+            self._version = version
+            self._filled_at = now
@@ -0,0 +1,211 @@
+"""Orders: checking out a cart, and a customer's order history.
+
+Checkout turns a user's active cart into an order without overselling.
+
+The cart row and then the product rows (in product_id order, so concurrent
+checkouts always take locks in the same order) are locked with
+SELECT ... FOR UPDATE. Stock is checked and decremented while the locks are
+held, and the whole order is rejected if any line is short. The sold lines
+are copied into OrderItems so order history keeps the prices paid, and the
+order is added to its day in DailySales.
+"""
+import time
+import random
+import datetime
+from decimal import Decimal
+from typing import Optional, TypedDict
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from config_db import db_connection, db_cursor
+import daily_sales
+
+# Errors after which the whole transaction can simply be run again
+RETRYABLE_ERRORS = (errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT)
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 0.05  # seconds, doubled on every retry
+BACKOFF_MAX = 1.0
+
+# Orders the customer screen lists
+RECENT_ORDERS = 5
+
+class OrderSummary(TypedDict):
+    order_id: int
+    order_date: datetime.datetime
+    total_amount: Decimal
+    status: str
+
+class OrderLine(TypedDict):
+    """A sold line, with the name and price it was sold under"""
+    name: str
+    price: Decimal
+    quantity: int
+
+class CheckoutError(Exception):
+    """Raised when a cart cannot be checked out"""
+
+class EmptyCartError(CheckoutError):
+    """Raised when the cart has no items"""
+    def __init__(self):
+        super().__init__("Your cart is empty.")
+
+class InsufficientStockError(CheckoutError):
+    """Raised when one or more cart lines ask for more than is in stock.
+
+    shortages is a list of (product name, requested, available) tuples.
+    """
+    def __init__(self, shortages):
+        self.shortages = shortages
+        lines = [f"{name}: requested {requested}, only {available} available"
+                 for name, requested, available in shortages]
+        super().__init__("Not enough stock for:\n" + "\n".join(lines))
+
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+def _place_order(connection, user_id, cart_id):
+    """Run one checkout attempt inside the connection's current transaction"""
+    cursor = connection.cursor()
+    try:
+        # Lock the cart first so two checkouts of the same cart serialize here
+        cursor.execute(
+            "SELECT status FROM Carts WHERE cart_id = %s AND user_id = %s FOR UPDATE",
+            (cart_id, user_id)
+        )
+        cart = cursor.fetchone()
+        if not cart or cart[0] != "active":
+            raise CheckoutError("This cart has already been checked out.")
+
+        # Locked too, so a quantity change can't commit between the stock check
+        # and the decrement
+        cursor.execute(
+            "SELECT product_id, quantity FROM CartItems WHERE cart_id = %s FOR UPDATE",
+            (cart_id,)
+        )
+        quantities = dict(cursor.fetchall())
+        if not quantities:
+            raise EmptyCartError()
+
+        # Lock the product rows in ascending product_id order
+        product_ids = sorted(quantities)
+        placeholders = ", ".join(["%s"] * len(product_ids))
+        cursor.execute(
+            f"""
+            SELECT product_id, name, price, stock FROM Products
+            WHERE product_id IN ({placeholders})
+            ORDER BY product_id
+            FOR UPDATE
+            """,
+            product_ids
+        )
+        products = cursor.fetchall()
+
+        shortages = []
+        total_amount = Decimal("0.00")
+        for product_id, name, price, stock in products:
+            requested = quantities[product_id]
+            if stock < requested:
+                shortages.append((name, requested, stock))
+            total_amount += price * requested
+        if shortages:
+            raise InsufficientStockError(shortages)
+
+        # Take exactly the quantities that were checked and priced above
+        cursor.executemany(
+            "UPDATE Products SET stock = stock - %s WHERE product_id = %s",
+            [(quantities[product_id], product_id) for product_id in product_ids]
+        )
+        cursor.execute(
+            "UPDATE Carts SET status = 'completed' WHERE cart_id = %s",
+            (cart_id,)
+        )
+        order_date = datetime.datetime.now()
+        cursor.execute(
+            """
+            INSERT INTO Orders (user_id, cart_id, order_date, total_amount, status)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            (user_id, cart_id, order_date, total_amount, "completed")
+        )
+        order_id = cursor.lastrowid
+
+        # Snapshot the lines at the prices they were sold for
+        cursor.executemany(
+            """
+            INSERT INTO OrderItems (order_id, product_id, product_name, unit_price, quantity)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            [(order_id, product_id, name, price, quantities[product_id])
+             for product_id, name, price, _ in products]
+        )
+        # Last, as every checkout of the day waits for this row's lock until commit
+        daily_sales.record_order(cursor, order_date, total_amount)
+        return order_id, total_amount
+    finally:
+        cursor.close()
+
+def checkout(user_id, cart_id, max_attempts=MAX_ATTEMPTS) -> tuple[int, Decimal]:
+    """Check out the cart and return (order_id, total_amount).
+
+    Raises InsufficientStockError (nothing is changed) if stock is short,
+    CheckoutError for other business-rule failures, and mysql.connector.Error
+    if the database keeps failing after max_attempts tries.
+    """
+    for attempt in range(max_attempts):
+        with db_connection() as connection:
+            try:
+                result = _place_order(connection, user_id, cart_id)
+                connection.commit()
+                return result
+            except mysql.connector.Error as err:
+                connection.rollback()
+                if err.errno not in RETRYABLE_ERRORS or attempt == max_attempts - 1:
+                    raise
+                print(f"Checkout of cart {cart_id} hit {err.msg}, retrying")
+            except Exception:
+                connection.rollback()
+                raise
+
+        time.sleep(_backoff_delay(attempt))
+
+def recent_orders(user_id, limit=RECENT_ORDERS) -> list[OrderSummary]:
+    """The user's most recent orders, newest first"""
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(
+            """
+            SELECT order_id, order_date, total_amount, status
+            FROM Orders
+            WHERE user_id = %s
+            ORDER BY order_date DESC
+            LIMIT %s
+            """,
+            (user_id, limit)
+        )
+        return cursor.fetchall()
+
+def order_details(order_id, user_id) -> tuple[Optional[OrderSummary], list[OrderLine]]:
+    """(order, items) of one of the user's orders, or (None, []) if it isn't theirs"""
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(
+            """
+            SELECT order_id, order_date, total_amount, status
+            FROM Orders
+            WHERE order_id = %s AND user_id = %s
+            """,
+            (order_id, user_id)
+        )
+        order = cursor.fetchone()
+        if not order:
+            return None, []
+
+        cursor.execute(
+            """
+            SELECT quantity, product_name AS name, unit_price AS price
+            FROM OrderItems
+            WHERE order_id = %s
+            """,
+            (order_id,)
+        )
+        return order, cursor.fetchall()
@@ -0,0 +1,269 @@
+"""Database queries behind the admin report tabs.
+
+The query builders and fetch_* helpers only take a cursor and return plain
+rows, so they can be used from AdminApp as well as from the benchmark
+scripts; admin/report_export streams the same queries to files. The
+*_report functions at the end open their own connections and are what the
+report tabs run as their query stage.
+"""
+import datetime
+from decimal import Decimal
+from typing import TypedDict
+
+from config_db import db_cursor
+import daily_sales
+
+# Maximum number of ids sent in a single IN (...) list
+IN_BATCH_SIZE = 1000
+
+def chunked(values, size=IN_BATCH_SIZE):
+    """Yield successive slices of at most `size` values"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def sales_period_filter(from_date=None, to_date=None):
+    """WHERE clause (and its params) selecting the orders placed in the period"""
+    if from_date and to_date:
+        return " WHERE o.order_date BETWEEN %s AND %s", [
+            from_date.strftime("%Y-%m-%d %H:%M:%S"), to_date.strftime("%Y-%m-%d %H:%M:%S")
+        ]
+    if from_date:
+        return " WHERE o.order_date >= %s", [from_date.strftime("%Y-%m-%d %H:%M:%S")]
+    return "", []
+
+def sales_orders_query(from_date=None, to_date=None, limit=None):
+    """Query (and params) for the orders, with customer names, placed in the period, newest first"""
+    where, params = sales_period_filter(from_date, to_date)
+    query = f"""
+        SELECT o.order_id, u.username, u.first_name, u.last_name,
+            o.order_date, o.total_amount, o.status
+        FROM Orders o
+        JOIN Users u ON o.user_id = u.user_id
+        {where}
+        ORDER BY o.order_date DESC
+    """
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, params
+
+def sales_summary_query(from_date=None, to_date=None):
+    """Query (and params) for the order count and revenue of the period"""
+    where, params = sales_period_filter(from_date, to_date)
+    query = f"""
+        SELECT COUNT(*) AS total_orders, COALESCE(SUM(o.total_amount), 0) AS total_sales
+        FROM Orders o
+        {where}
+    """
+    return query, params
+
+def fetch_sales_orders(cursor, from_date=None, to_date=None, limit=None):
+    """Fetch the orders (with customer names) placed in the given period"""
+    cursor.execute(*sales_orders_query(from_date, to_date, limit))
+    return cursor.fetchall()
+
+def fetch_order_items(cursor, order_ids):
+    """Fetch the line items of many orders at once, grouped by order_id"""
+    items_by_order = {order_id: [] for order_id in order_ids}
+
+    for batch in chunked(list(items_by_order)):
+        placeholders = ", ".join(["%s"] * len(batch))
+        cursor.execute(f"""
+            SELECT order_id, product_name AS name, quantity, unit_price AS price
+            FROM OrderItems
+            WHERE order_id IN ({placeholders})
+        """, batch)
+
+        for row in cursor.fetchall():
+            items_by_order[row["order_id"]].append(
+                {"name": row["name"], "quantity": row["quantity"], "price": row["price"]}
+            )
+
+    return items_by_order
+
+def fetch_sales_data(cursor, from_date=None, to_date=None, limit=None):
+    """Fetch orders in the period together with their items (cursor must be a dictionary cursor)"""
+    orders = fetch_sales_orders(cursor, from_date, to_date, limit)
+
+    if orders:
+        items_by_order = fetch_order_items(cursor, [order["order_id"] for order in orders])
+        for order in orders:
+            order["items"] = items_by_order[order["order_id"]]
+
+    return orders
+
+def fetch_user_activity(cursor, user_type, activity_type, from_date=None):
+    """Fetch users with their orders in the period and lifetime order counts.
+
+    Uses one query for the users (with lifetime counts aggregated in SQL) and
+    one for all of their orders in the period, instead of two per user.
+    """
+    role_filter = user_role_filter(user_type)
+
+    include_orders = activity_type in ["all_activity", "orders"]
+
+    if include_orders:
+        cursor.execute(f"""
+            SELECT u.user_id, u.first_name, u.last_name, u.username, u.email, u.role, u.created_at,
+                COALESCE(oc.total_orders, 0) AS total_orders
+            FROM Users u
+            LEFT JOIN (
+                SELECT user_id, COUNT(*) AS total_orders
+                FROM Orders
+                GROUP BY user_id
+            ) oc ON oc.user_id = u.user_id
+            {role_filter}
+            ORDER BY u.created_at DESC
+        """)
+    else:
+        cursor.execute(f"""
+            SELECT u.user_id, u.first_name, u.last_name, u.username, u.email, u.role, u.created_at
+            FROM Users u
+            {role_filter}
+            ORDER BY u.created_at DESC
+        """)
+    users = cursor.fetchall()
+
+    if not include_orders or not users:
+        return users
+
+    # All orders in the window for the selected users, grouped per user below
+    order_query = f"""
+        SELECT o.user_id, o.order_id, o.order_date, o.total_amount, o.status
+        FROM Orders o
+        JOIN Users u ON u.user_id = o.user_id
+        {role_filter}
+    """
+    params = []
+    if from_date:
+        order_query += (" AND" if role_filter else " WHERE") + " o.order_date >= %s"
+        params.append(from_date)
+    cursor.execute(order_query, params)
+
+    orders_by_user = {}
+    for order in cursor.fetchall():
+        user_id = order.pop("user_id")
+        orders_by_user.setdefault(user_id, []).append(order)
+
+    for user in users:
+        user["orders"] = orders_by_user.get(user["user_id"], [])
+        user["total_orders"] = int(user["total_orders"])
+
+    return users
+
+def inventory_filter(report_type):
+    """WHERE clause selecting the products of an inventory report type"""
+    if report_type == "low_stock":
+        return " WHERE stock <= 10 AND stock > 0"
+    if report_type == "out_of_stock":
+        return " WHERE stock = 0"
+    return ""
+
+def inventory_report_query(report_type, sort_by):
+    """Query for the products of an inventory report, in the selected order"""
+    query = "SELECT product_id, name, price, stock FROM Products" + inventory_filter(report_type)
+
+    if sort_by == "name":
+        query += " ORDER BY name"
+    elif sort_by == "price":
+        query += " ORDER BY price DESC"
+    elif sort_by == "stock":
+        query += " ORDER BY stock"
+    return query
+
+def inventory_summary_query(report_type):
+    """Query for the product count, stock value and stock alerts of an inventory report"""
+    return f"""
+        SELECT COUNT(*) AS total_products,
+            COALESCE(SUM(price * stock), 0) AS total_value,
+            COALESCE(SUM(stock = 0), 0) AS out_of_stock,
+            COALESCE(SUM(stock > 0 AND stock <= 10), 0) AS low_stock
+        FROM Products
+        {inventory_filter(report_type)}
+    """
+
+def user_role_filter(user_type):
+    """WHERE clause selecting the users of a user report type"""
+    if user_type == "admins":
+        return " WHERE u.role = 'admin'"
+    if user_type == "customers":
+        return " WHERE u.role = 'user'"
+    return ""
+
+def user_activity_export_query(user_type, activity_type, from_date=None):
+    """Query (and params) for one row per user with their order count and spend in the period"""
+    role_filter = user_role_filter(user_type)
+    if activity_type not in ["all_activity", "orders"]:
+        query = f"""
+            SELECT u.user_id, u.first_name, u.last_name, u.username, u.email, u.role, u.created_at,
+                0 AS orders_count, 0 AS total_spent
+            FROM Users u
+            {role_filter}
+            ORDER BY u.created_at DESC
+        """
+        return query, []
+
+    params = []
+    order_filter = ""
+    if from_date:
+        order_filter = " AND o.order_date >= %s"
+        params.append(from_date)
+    query = f"""
+        SELECT u.user_id, u.first_name, u.last_name, u.username, u.email, u.role, u.created_at,
+            COUNT(o.order_id) AS orders_count, COALESCE(SUM(o.total_amount), 0) AS total_spent
+        FROM Users u
+        LEFT JOIN Orders o ON o.user_id = u.user_id{order_filter}
+        {role_filter}
+        GROUP BY u.user_id
+        ORDER BY u.created_at DESC
+    """
+    return query, params
+
+def user_summary_query(user_type):
+    """Query for the user counts of a user report"""
+    return f"""
+        SELECT COUNT(*) AS total_users,
+            COALESCE(SUM(u.role = 'admin'), 0) AS admin_count,
+            COALESCE(SUM(u.role = 'user'), 0) AS customer_count
+        FROM Users u
+        {user_role_filter(user_type)}
+    """
+
+class SalesOrder(TypedDict):
+    """An order of the sales report, with its customer and its items
+    (dicts with name, quantity and price)"""
+    order_id: int
+    username: str
+    first_name: str
+    last_name: str
+    order_date: datetime.datetime
+    total_amount: Decimal
+    status: str
+    items: list[dict]
+
+class InventoryRow(TypedDict):
+    product_id: int
+    name: str
+    price: Decimal
+    stock: int
+
+def sales_report(from_date, to_date, limit=None) -> tuple[list[SalesOrder], list[tuple]]:
+    """(orders, days) of the period: the latest orders with their items, and the
+    (sales_date, order_count, total_sales) rows of DailySales"""
+    with db_cursor(dictionary=True) as cursor:
+        # Orders first, then the items of all of them in a few batched queries
+        orders = fetch_sales_data(cursor, from_date, to_date, limit=limit)
+    with db_cursor() as cursor:
+        days = daily_sales.fetch_days(cursor, from_date.date(), to_date.date())
+    return orders, days
+
+def inventory_report(report_type, sort_by) -> list[InventoryRow]:
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(inventory_report_query(report_type, sort_by))
+        return cursor.fetchall()
+
+def user_activity_report(user_type, activity_type, from_date=None) -> list[dict]:
+    """Users with their orders in the period (see fetch_user_activity)"""
+    with db_cursor(dictionary=True) as cursor:
+        # Users, their orders in range and lifetime order counts in two queries
+        return fetch_user_activity(cursor, user_type, activity_type, from_date)
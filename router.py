@@ -0,0 +1,71 @@
+"""In-process navigation: every screen is built inside the one CTk root.
+
+Screens are the existing app classes, which take the root as their first
+argument. Showing a screen clears whatever the previous one put on the
+root and constructs the new one in its place. Screen modules are imported
+the first time they are shown, so e.g. the admin panel's dependencies are
+only loaded when an admin logs in.
+"""
+import importlib
+
+import query_stats
+import tasks
+import ui_profiler
+
+# Screen name -> (module, class)
+SCREENS = {
+    "landing": ("main", "SuperMarketApp"),
+    "login": ("login_signup", "LoginApp"),
+    "signup": ("login_signup", "SignupApp"),
+    "forgot_password": ("users.forgot_password", "ForgotPasswordApp"),
+    "user_dashboard": ("users.users_view", "UserApp"),
+    "order_details": ("users.order_details", "OrderDetailsApp"),
+    "admin": ("admin.admin_view", "AdminApp"),
+}
+
+_root = None
+current_screen = None
+current_app = None
+
+def init(root):
+    """Use this root window for all screens and background tasks"""
+    global _root
+    _root = root
+    tasks.init(root)
+    ui_profiler.init(root)
+
+def _clear_root():
+    """Remove everything the previous screen put on the root window"""
+    for child in _root.winfo_children():
+        child.destroy()
+    _root.unbind("<Configure>")
+    # The admin panel's hidden query statistics shortcut
+    _root.unbind(query_stats.SHORTCUT)
+    _root.minsize(1, 1)
+    _root.resizable(True, True)
+
+def show(name, **kwargs):
+    """Replace the current screen with the named one right away and return the new app"""
+    global current_screen, current_app
+    module_name, class_name = SCREENS[name]
+    screen_class = getattr(importlib.import_module(module_name), class_name)
+
+    _clear_root()
+    current_screen = name
+    with ui_profiler.span(f"show {name}", "screen"):
+        app = screen_class(_root, **kwargs)
+
+    # The constructor may itself have navigated elsewhere (e.g. failed login)
+    if current_screen == name:
+        current_app = app
+    return app
+
+def navigate(name, **kwargs):
+    """Switch screens once the current event handler has finished.
+
+    Use this from inside a screen so its widgets aren't destroyed while one
+    of its callbacks (or its constructor) is still running.
+    """
+    global current_screen
+    current_screen = name
+    _root.after_idle(lambda: show(name, **kwargs))
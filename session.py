@@ -0,0 +1,20 @@
+"""Login session of the running app, kept in memory and shared by all screens"""
+
+current_user = {
+    "username": None,
+    "role": None
+}
+
+def login(username, role="user"):
+    """Remember who is logged in"""
+    current_user["username"] = username
+    current_user["role"] = role
+
+def logout():
+    """Forget the logged-in user"""
+    current_user["username"] = None
+    current_user["role"] = None
+
+def get_user():
+    """Return (username, role) of the logged-in user, or (None, None)"""
+    return current_user["username"], current_user["role"]
@@ -0,0 +1,135 @@
+"""Background tasks, so database calls never block the Tk event loop.
+
+run() submits a function to a shared thread pool and returns a Task. When
+the function finishes, its result is put on a queue that the main loop
+polls with root.after; on_done(result) or on_error(exception) are then
+called there, so they can safely update widgets. The functions themselves
+run on worker threads and must not touch Tk.
+
+A task can show a "Loading..." label over a widget while it runs, and can
+be cancelled: a cancelled task that hasn't started is skipped, and the
+callbacks of one that has are not called. Callbacks are also skipped once
+the task's owner widget has been destroyed (e.g. the screen was left).
+"""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+import customtkinter as ctk
+from tkinter import messagebox
+
+import ui_profiler
+
+# Kept below the connection pool size so the main thread can still get a connection
+MAX_WORKERS = 3
+# How often the main loop checks for finished tasks while any are running
+POLL_MS = 30
+
+_root = None
+_executor = None
+_finished = queue.Queue()
+_running = 0
+_poll_after = None
+
+def init(root):
+    """Deliver task results on this root window's event loop"""
+    global _root
+    _root = root
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="task")
+    return _executor
+
+def show_database_error(error):
+    """Default on_error: report the failure the way the screens do"""
+    print(f"Background task failed: {error}")
+    messagebox.showerror("Database Error", str(error))
+
+class Task:
+    """A function running on the worker pool, with callbacks on the main loop"""
+    def __init__(self, fn, args, kwargs, on_done, on_error, owner, loading):
+        self.name = getattr(fn, "__qualname__", repr(fn))
+        self.on_done = on_done
+        self.on_error = on_error or show_database_error
+        self.owner = owner
+        self.cancelled = False
+        self.finished = False
+
+        self._loading_label = None
+        if loading is not None:
+            self._loading_label = ctk.CTkLabel(
+                loading, text="Loading...", font=("Arial", 14),
+                fg_color="#e2e8f0", text_color="#334155", corner_radius=8, padx=20, pady=10
+            )
+            self._loading_label.place(relx=0.5, rely=0.5, anchor="center")
+
+        # Traced on its worker thread when the UI profiler is on
+        self.future = _get_executor().submit(ui_profiler.timed(self.name, "task")(fn), *args, **kwargs)
+        self.future.add_done_callback(lambda future: _finished.put(self))
+
+    def cancel(self):
+        """Skip the function if it hasn't started, and never call the callbacks"""
+        self.cancelled = True
+        self.future.cancel()
+        self._hide_loading()
+
+    def running(self):
+        """True until the task's callbacks have run or it was cancelled"""
+        return not (self.cancelled or self.finished)
+
+    def _hide_loading(self):
+        if self._loading_label:
+            try:
+                self._loading_label.destroy()
+            except Exception:
+                pass  # Already gone with its screen
+        self._loading_label = None
+
+    def _deliver(self):
+        """Main loop: hand the result to the callbacks"""
+        self.finished = True
+        self._hide_loading()
+        if self.cancelled or self.future.cancelled():
+            return
+        if self.owner is not None and not self.owner.winfo_exists():
+            return
+
+        error = self.future.exception()
+        with ui_profiler.span(f"{self.name} callback", "task"):
+            if error is not None:
+                self.on_error(error)
+            elif self.on_done:
+                self.on_done(self.future.result())
+
+def run(fn, *args, on_done=None, on_error=None, owner=None, loading=None, **kwargs):
+    """Run fn(*args, **kwargs) on a worker thread and return its Task.
+
+    on_done(result) / on_error(exception) are called on the main loop; by
+    default errors are shown in a message box. owner: widget whose
+    destruction cancels the callbacks. loading: widget to show a loading
+    label over while the task runs.
+    """
+    global _running, _poll_after
+    task = Task(fn, args, kwargs, on_done, on_error, owner, loading)
+    _running += 1
+    if _poll_after is None:
+        _poll_after = _root.after(POLL_MS, _poll)
+    return task
+
+def _poll():
+    global _running, _poll_after
+    _poll_after = None
+    while True:
+        try:
+            task = _finished.get_nowait()
+        except queue.Empty:
+            break
+        _running -= 1
+        try:
+            task._deliver()
+        except Exception as e:
+            print(f"Error in task callback: {e}")
+
+    if _running > 0:
+        _poll_after = _root.after(POLL_MS, _poll)
@@ -0,0 +1,63 @@
+"""Validation of catalog import rows (admin/catalog_io.parse_row)."""
+import sys
+import os
+from decimal import Decimal
+# Add parent directory to path so we can import from other modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from admin.catalog_io import parse_row
+
+def row(**fields):
+    product = {"name": "Fresh Apples", "price": "2.00", "stock": "50"}
+    product.update(fields)
+    return product
+
+def test_valid_row():
+    assert parse_row(row(price="$2.499", status="Inactive")) == (
+        "Fresh Apples", Decimal("2.50"), 50, "inactive", None
+    )
+
+def test_exported_statuses_import_again():
+    # main.create_default_products and the column default use 'available'
+    for status in ("active", "inactive", "available"):
+        assert parse_row(row(status=status))[3] == status
+    assert parse_row(row(status=""))[3] == "active"
+
+@pytest.mark.parametrize("price", ["1e1000", "-1e1000", "inf", "NaN", "sNaN", "abc", None])
+def test_price_that_is_not_a_number(price):
+    with pytest.raises(ValueError):
+        parse_row(row(price=price))
+
+@pytest.mark.parametrize("price", ["0", "-1", "0.001", "0.004"])
+def test_price_that_rounds_to_zero_or_less(price):
+    with pytest.raises(ValueError):
+        parse_row(row(price=price))
+
+def test_price_range_of_the_column():
+    assert parse_row(row(price="99999999.99"))[1] == Decimal("99999999.99")
+    for price in ("100000000", "123456789012", "99999999.995"):
+        with pytest.raises(ValueError):
+            parse_row(row(price=price))
+
+def test_stock_range_of_the_column():
+    assert parse_row(row(stock="0"))[2] == 0
+    assert parse_row(row(stock=str(2 ** 31 - 1)))[2] == 2 ** 31 - 1
+    for stock in ("-1", str(2 ** 31), "99999999999", "1.5", "many"):
+        with pytest.raises(ValueError):
+            parse_row(row(stock=stock))
+
+@pytest.mark.parametrize("product", [
+    row(name=""),
+    row(name="x" * 101),
+    row(status="discontinued"),
+    row(image="apple.png"),
+    ["Fresh Apples", "2.00", "50"],
+])
+def test_invalid_rows(product):
+    with pytest.raises(ValueError):
+        parse_row(product)
+
+def test_image_path():
+    assert parse_row(row(image="apple.png"), images_dir="images")[4] == os.path.join("images", "apple.png")
@@ -0,0 +1,137 @@
+"""Event-loop lag and timings of named spans in the screens, as a Chrome trace.
+
+Off unless SUPERMARKET_UI_PROFILE is set: to the trace file to write, or to
+1 for TRACE_FILE. Once router.init hands it the root window, a heartbeat
+scheduled with root.after every HEARTBEAT_MS measures how late it runs; the
+lag is how long the event loop was kept from handling events. Functions
+decorated with timed() and blocks run in span() are recorded with their
+start and duration on the thread that ran them, as are background tasks
+and their callbacks (see tasks) and screen changes (see router).
+
+When the app exits the events are written in the Chrome trace event format,
+to open in chrome://tracing or https://ui.perfetto.dev. The lag is a
+counter track, and every stall of at least STALL_MS is a "stall" span on
+the main thread, lined up with the spans that ran during it.
+"""
+import os
+import json
+import atexit
+import functools
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+TRACE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "supermarket", "ui_trace.json")
+_setting = os.environ.get("SUPERMARKET_UI_PROFILE", "")
+ENABLED = _setting not in ("", "0")
+if _setting == "1":
+    _setting = TRACE_FILE
+
+HEARTBEAT_MS = 50
+# Heartbeats at least this late are also recorded as stall spans
+STALL_MS = 100
+# Events kept in memory; later ones are dropped (about 20 heartbeats a second)
+MAX_EVENTS = 500000
+
+_origin = perf_counter()
+_pid = os.getpid()
+_events = []
+_dropped = 0
+_thread_names = {}
+_root = None
+_expected = None
+
+def _add(event):
+    global _dropped
+    if len(_events) >= MAX_EVENTS:
+        _dropped += 1
+        return
+    tid = threading.get_ident()
+    if tid not in _thread_names:
+        _thread_names[tid] = threading.current_thread().name
+    event["pid"] = _pid
+    event["tid"] = tid
+    # list.append is atomic, so worker threads need no lock
+    _events.append(event)
+
+def add_span(name, category, start, end):
+    """Record a span from perf_counter() values start to end on the current thread"""
+    _add({"name": name, "cat": category, "ph": "X",
+          "ts": (start - _origin) * 1e6, "dur": (end - start) * 1e6})
+
+@contextmanager
+def span(name, category="ui"):
+    """Time the block as a span called name"""
+    if not ENABLED:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        add_span(name, category, start, perf_counter())
+
+def timed(name=None, category="ui"):
+    """Decorator: time every call as a span (named after the function by default).
+
+    The function is returned unchanged when profiling is off.
+    """
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                add_span(span_name, category, start, perf_counter())
+        return wrapper
+    return decorate
+
+def init(root):
+    """Start the heartbeat on this root window's event loop"""
+    global _root
+    if not ENABLED or _root is not None:
+        return
+    _root = root
+    _schedule_heartbeat()
+
+def _schedule_heartbeat():
+    global _expected
+    _expected = perf_counter() + HEARTBEAT_MS / 1000
+    _root.after(HEARTBEAT_MS, _heartbeat)
+
+def _heartbeat():
+    now = perf_counter()
+    lag = max(0.0, now - _expected)
+    _add({"name": "event loop lag", "ph": "C", "ts": (now - _origin) * 1e6,
+          "args": {"lag_ms": round(lag * 1000, 2)}})
+    if lag * 1000 >= STALL_MS:
+        add_span("stall", "lag", _expected, now)
+    _schedule_heartbeat()
+
+def write(path=None):
+    """Write the events recorded so far as a Chrome trace"""
+    path = path or _setting
+    events = list(_events)
+    events.extend(
+        {"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid, "args": {"name": name}}
+        for tid, name in list(_thread_names.items())
+    )
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+    except OSError as err:
+        print(f"Could not write the UI trace: {err}")
+        return
+    print(f"UI trace with {len(events)} events written to {path}"
+          + (f" ({_dropped} dropped)" if _dropped else ""))
+
+if ENABLED:
+    atexit.register(write)
@@ -5,11 +5,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import customtkinter as ctk
 from tkinter import messagebox
-import subprocess
 from PIL import Image
 
-from config_db import connect_db
-from utils_file import hash_password
+from repositories import accounts
+import router
 
 class ForgotPasswordApp:
     def __init__(self, root):
@@ -137,26 +136,8 @@ class ForgotPasswordApp:
             return
 
         try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            # Verify email and secret key
-            cursor.execute(
-                "SELECT user_id FROM Users WHERE username = %s AND secret_key = %s",
-                (email, secret_key)
-            )
-            
-            user = cursor.fetchone()
-            
-            if user:
-                # Update password
-                hashed_password = hash_password(new_password)
-                cursor.execute(
-                    "UPDATE Users SET password = %s WHERE username = %s",
-                    (hashed_password, email)
-                )
-                
-                connection.commit()
+            # The email is the username; the secret key has to match it
+            if accounts.reset_forgotten_password(email, secret_key, new_password):
                 messagebox.showinfo("Success", "Password has been reset successfully!")
                 
                 # Clear the input fields
@@ -172,14 +153,9 @@ class ForgotPasswordApp:
                 
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def open_login(self):
-        self.root.destroy()
-        subprocess.run(["python", os.path.join(os.path.dirname(os.path.dirname(__file__)), "login_signup.py")])
+        router.navigate("login")
 
 # Run the app if this file is executed directly
 if __name__ == "__main__":
@@ -187,5 +163,6 @@ if __name__ == "__main__":
     ctk.set_default_color_theme("blue")
     
     root = ctk.CTk()
-    app = ForgotPasswordApp(root)
+    router.init(root)
+    router.show("forgot_password")
     root.mainloop()
\ No newline at end of file
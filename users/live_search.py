@@ -0,0 +1,108 @@
+"""Search-as-you-type: runs searches off the Tk main loop.
+
+Keystrokes are debounced, so a search only starts once typing pauses for
+delay_ms. Searches run as background tasks (see tasks.py); starting a new
+search cancels the previous one, so a search that newer typing has
+replaced is either skipped or its results are dropped. Recent results are
+cached for a short time so retyping or deleting back to an earlier query
+shows its results straight away.
+"""
+import time
+from collections import OrderedDict
+
+import tasks
+
+# Pause in typing before a search starts
+SEARCH_DELAY_MS = 300
+# Recent searches kept, and for how long (seconds) their results are reused
+CACHE_SIZE = 50
+CACHE_TTL = 30
+
+class LiveSearch:
+    """Debounced background search for one entry widget.
+
+    search(query) runs on a worker thread and must not touch Tk.
+    on_results(query, results) and on_error(query, error) run on the main loop.
+    """
+    def __init__(self, widget, search, on_results, on_error=None, delay_ms=SEARCH_DELAY_MS, loading=None):
+        self.widget = widget
+        self.search = search
+        self.on_results = on_results
+        self.on_error = on_error
+        self.delay_ms = delay_ms
+        self.loading = loading
+
+        self._cache = OrderedDict()  # query -> (time stored, results)
+        self._task = None
+        self._task_query = None
+        self._debounce_after = None
+
+        widget.bind("<Destroy>", lambda event: self.cancel(), add="+")
+
+    def schedule(self, query):
+        """Search for the query once typing has paused"""
+        self._cancel_debounce()
+        self._debounce_after = self.widget.after(self.delay_ms, lambda: self.search_now(query))
+
+    def search_now(self, query):
+        """Search for the query right away, replacing any search in progress"""
+        self._cancel_debounce()
+        query = query.strip().lower()
+        if self._task and self._task.running() and self._task_query == query:
+            return  # Already on its way
+
+        self._cancel_task()
+        cached = self._cached(query)
+        if cached is not None:
+            self.on_results(query, cached)
+            return
+
+        self._task_query = query
+        self._task = tasks.run(
+            self.search, query,
+            on_done=lambda results: self._deliver(query, results),
+            on_error=lambda error: self._fail(query, error),
+            owner=self.widget, loading=self.loading
+        )
+
+    def cancel(self):
+        """Drop the pending search and ignore the results of a running one"""
+        self._cancel_debounce()
+        self._cancel_task()
+
+    def _cancel_debounce(self):
+        if self._debounce_after is not None:
+            self.widget.after_cancel(self._debounce_after)
+            self._debounce_after = None
+
+    def _cancel_task(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _deliver(self, query, results):
+        self._remember(query, results)
+        self.on_results(query, results)
+
+    def _fail(self, query, error):
+        if self.on_error:
+            self.on_error(query, error)
+        else:
+            tasks.show_database_error(error)
+
+    def _cached(self, query):
+        entry = self._cache.get(query)
+        if entry is None:
+            return None
+        stored, results = entry
+        if time.monotonic() - stored > CACHE_TTL:
+            del self._cache[query]
+            return None
+        self._cache.move_to_end(query)
+        return results
+
+    def _remember(self, query, results):
+        self._cache[query] = (time.monotonic(), results)
+        self._cache.move_to_end(query)
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
@@ -5,9 +5,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import customtkinter as ctk
 from tkinter import messagebox
-import subprocess
 
-from config_db import connect_db
+from repositories import accounts, orders
+import router
+import session
 
 
 class OrderDetailsApp:
@@ -31,7 +32,7 @@ class OrderDetailsApp:
         # Authenticate user
         if not self.get_user_info(username):
             messagebox.showerror("Authentication Error", "User not found. Please login again.")
-            self.root.destroy()
+            router.navigate("login")
             return
         
         self.setup_ui()
@@ -39,15 +40,7 @@ class OrderDetailsApp:
     
     def get_user_info(self, username):
         try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute(
-                "SELECT user_id, username, first_name, last_name, role FROM Users WHERE username = %s",
-                (username,)
-            )
-            
-            user = cursor.fetchone()
+            user = accounts.get_user(username)
             if user:
                 self.current_user["user_id"] = user["user_id"]
                 self.current_user["username"] = user["username"]
@@ -60,10 +53,6 @@ class OrderDetailsApp:
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return False
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def setup_ui(self):
         # Main container
@@ -109,42 +98,11 @@ class OrderDetailsApp:
     
     def fetch_order_details(self):
         try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            # First, get basic order information
-            cursor.execute("""
-                SELECT o.order_id, o.order_date, o.total_amount, o.status, c.cart_id
-                FROM Orders o
-                JOIN Carts c ON o.cart_id = c.cart_id
-                WHERE o.order_id = %s AND o.user_id = %s
-                """, (self.order_id, self.current_user["user_id"]))
-            
-            order = cursor.fetchone()
-            
-            if not order:
-                return None, []
-            
-            cart_id = order["cart_id"]
-            
-            # Now, get the items in this cart
-            cursor.execute("""
-                SELECT ci.quantity, p.name, p.price
-                FROM CartItems ci
-                JOIN Products p ON ci.product_id = p.product_id
-                WHERE ci.cart_id = %s
-                """, (cart_id,))
-            
-            items = cursor.fetchall()
-            
-            return order, items
+            # The order only if it belongs to this user, with the items as they were sold
+            return orders.order_details(self.order_id, self.current_user["user_id"])
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return None, []
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def display_order_details(self):
         # Fetch order details
@@ -264,7 +222,7 @@ class OrderDetailsApp:
         ctk.CTkLabel(total_row, text=f"${float(order['total_amount']):.2f}", font=("Arial", 16, "bold"), text_color="#1e40af").pack(side="right")
     
     def return_to_home(self):
-        self.root.destroy()
+        router.navigate("user_dashboard", username=self.username)
 
 # Run the app if this file is executed directly
 if __name__ == "__main__":
@@ -279,5 +237,7 @@ if __name__ == "__main__":
     ctk.set_default_color_theme("blue")
     
     root = ctk.CTk()
-    app = OrderDetailsApp(root, order_id, username)
+    router.init(root)
+    session.login(username)
+    router.show("order_details", order_id=order_id, username=username)
     root.mainloop()
\ No newline at end of file
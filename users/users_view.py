@@ -4,14 +4,23 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import customtkinter as ctk
-from PIL import Image
 from tkinter import messagebox
-import subprocess
-import datetime
 
 from users.users_nav import UserNavigation
-from config_db import connect_db
-from utils_file import read_login_file, write_login_file
+from users.live_search import LiveSearch
+from repositories import accounts, cart, catalog, orders
+from product_images import ThumbnailCache
+import router
+import session
+import tasks
+import ui_profiler
+
+# Product grid layout: cards per row and cards per page
+PRODUCTS_PER_ROW = 3
+PRODUCTS_PAGE_SIZE = 12
+
+# Product card thumbnails, kept across refreshes, searches and screen changes
+thumbnail_cache = ThumbnailCache()
 
 class UserApp:
     def __init__(self, root, username=None):
@@ -35,27 +44,31 @@ class UserApp:
         self.cart_item_frames = {}
         self.total_amount = 0
         
-        # If username is provided, try to authenticate
-        if username:
-            if not self.get_user_info(username):
-                messagebox.showerror("Authentication Error", "User not found. Please login again.")
-                self.root.destroy()
-                subprocess.run(["python", os.path.join(os.path.dirname(os.path.dirname(__file__)), "login_signup.py")])
-                return
-        else:
-            # Try to read from file
-            username_from_file, _ = read_login_file()
-            if username_from_file:
-                if not self.get_user_info(username_from_file):
-                    messagebox.showerror("Authentication Error", "User not found. Please login again.")
-                    self.root.destroy()
-                    subprocess.run(["python", os.path.join(os.path.dirname(os.path.dirname(__file__)), "login_signup.py")])
-                    return
-            else:
-                messagebox.showerror("Authentication Error", "User not found. Please login again.")
-                self.root.destroy()
-                subprocess.run(["python", os.path.join(os.path.dirname(os.path.dirname(__file__)), "login_signup.py")])
-                return
+        # Active cart id, cached so cart changes don't have to look it up
+        self.active_cart_id = None
+        
+        self.thumbnails = thumbnail_cache
+        
+        # Product grid paging: reusable card widgets and the product_id each
+        # visited page starts after (keyset paging)
+        self.product_cards = []
+        self.product_search = None
+        self.page_start_ids = [0]
+        self.page_index = 0
+        
+        # Background fetches in progress, so a newer one can replace them
+        self.products_task = None
+        self.cart_task = None
+        self.orders_task = None
+        
+        # Fall back to the logged-in user of this session
+        if not username:
+            username, _ = session.get_user()
+        
+        if not username or not self.get_user_info(username):
+            messagebox.showerror("Authentication Error", "User not found. Please login again.")
+            router.navigate("login")
+            return
         
         # Setup UI
         self.setup_main_ui()
@@ -65,15 +78,7 @@ class UserApp:
     
     def get_user_info(self, username):
         try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute(
-                "SELECT user_id, username, first_name, last_name, role FROM Users WHERE username = %s",
-                (username,)
-            )
-            
-            user = cursor.fetchone()
+            user = accounts.get_user(username)
             if user:
                 self.current_user["user_id"] = user["user_id"]
                 self.current_user["username"] = user["username"]
@@ -81,8 +86,8 @@ class UserApp:
                 self.current_user["last_name"] = user["last_name"]
                 self.current_user["role"] = user["role"]
                 
-                # Save user info to file for other scripts to use
-                write_login_file(user["username"], user["role"])
+                # Remember the login for the other screens
+                session.login(user["username"], user["role"])
                 
                 return True
             
@@ -91,10 +96,6 @@ class UserApp:
             print(f"Database Error in get_user_info: {err}")
             messagebox.showerror("Database Error", str(err))
             return False
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def setup_main_ui(self):
         # Main frame
@@ -173,6 +174,41 @@ class UserApp:
         # Grid layout for products with scrolling
         self.products_frame = ctk.CTkFrame(self.products_container, fg_color="#f3f4f6")
         self.products_frame.pack(fill="x", padx=20, pady=20)
+        
+        # Cards are created once and re-bound to each page's products
+        self.products_grid = ctk.CTkFrame(self.products_frame, fg_color="#f3f4f6")
+        self.products_grid.pack(fill="both", expand=True)
+        for i in range(PRODUCTS_PER_ROW):
+            self.products_grid.columnconfigure(i, weight=1)
+        
+        self.no_products_label = ctk.CTkLabel(self.products_frame, text="No products available", 
+                                        font=("Arial", 16), text_color="gray")
+        
+        # Page controls
+        pager_frame = ctk.CTkFrame(self.products_frame, fg_color="#f3f4f6")
+        pager_frame.pack(fill="x", pady=(10, 0))
+        
+        self.prev_page_button = ctk.CTkButton(pager_frame, text="< Previous", 
+                                        fg_color="#2563eb", hover_color="#1d4ed8", 
+                                        font=("Arial", 14), height=35, width=120,
+                                        command=lambda: self.show_products_page(self.page_index - 1))
+        self.prev_page_button.pack(side="left")
+        
+        self.next_page_button = ctk.CTkButton(pager_frame, text="Next >", 
+                                        fg_color="#2563eb", hover_color="#1d4ed8", 
+                                        font=("Arial", 14), height=35, width=120,
+                                        command=lambda: self.show_products_page(self.page_index + 1))
+        self.next_page_button.pack(side="right")
+        
+        self.page_label = ctk.CTkLabel(pager_frame, text="", font=("Arial", 14), text_color="black")
+        self.page_label.pack(expand=True)
+        
+        # Search as you type, in the background so typing never waits for the database
+        self.live_search = LiveSearch(self.search_entry, lambda query: self.load_products_page(query, 0, 0),
+                                      self.show_search_results, self.show_search_error,
+                                      loading=self.products_container)
+        self.search_entry.bind("<KeyRelease>", self.on_search_typed)
+        self.search_entry.bind("<Return>", lambda event: self.handle_search())
     
     def setup_checkout_section(self):
         checkout_label = ctk.CTkLabel(self.checkout_section, text="Checkout", 
@@ -283,6 +319,7 @@ class UserApp:
         self.refresh_previous_orders()
         
         # Reset search
+        self.live_search.cancel()
         self.search_entry.delete(0, ctk.END)
         self.clear_search_button.pack_forget()
     
@@ -315,140 +352,77 @@ class UserApp:
         self.refresh_previous_orders()
     
     def clear_search(self):
+        self.live_search.cancel()
         self.search_entry.delete(0, ctk.END)
         self.refresh_products_display()
         self.clear_search_button.pack_forget()
     
-    def refresh_products_display(self, search_query=None):
-        # Clear existing products
-        for widget in self.products_frame.winfo_children():
-            widget.destroy()
-        
-        # Get products (filtered if search query provided)
+    @ui_profiler.timed()
+    def refresh_products_display(self, search_query=None, products=None):
+        # Show or hide the clear button depending on whether a search is active
         if search_query:
-            products = self.search_products(search_query)
-            # Show clear button when search is active
             self.clear_search_button.pack(side="left")
         else:
-            products = self.fetch_products()
-            # Hide clear button when no search is active
             self.clear_search_button.pack_forget()
         
+        # Start again from the first page
+        self.product_search = search_query
+        self.page_start_ids = [0]
+        self.show_products_page(0, products)
+    
+    @ui_profiler.timed()
+    def show_products_page(self, page_index, products=None):
+        """Show one page of products, fetching it in the background unless already fetched"""
+        if page_index < 0 or page_index >= len(self.page_start_ids):
+            return
+        
+        # Whatever page was on its way is no longer wanted
+        if self.products_task:
+            self.products_task.cancel()
+            self.products_task = None
+        
+        if products is None:
+            self.products_task = tasks.run(
+                self.load_products_page, self.product_search, page_index, self.page_start_ids[page_index],
+                on_done=lambda products: self.show_products_page(page_index, products),
+                owner=self.products_grid, loading=self.products_container
+            )
+            return
+        
+        # One extra row tells us whether there is a next page
+        has_next = len(products) > PRODUCTS_PAGE_SIZE
+        products = products[:PRODUCTS_PAGE_SIZE]
+        
+        self.page_index = page_index
+        if has_next and len(self.page_start_ids) == page_index + 1:
+            self.page_start_ids.append(products[-1]["id"])
+        
+        # Create more cards only the first time a page needs them
+        while len(self.product_cards) < len(products):
+            index = len(self.product_cards)
+            card = ProductCard(self.products_grid, self)
+            card.frame.grid(row=index // PRODUCTS_PER_ROW, column=index % PRODUCTS_PER_ROW,
+                            padx=10, pady=10, sticky="nsew")
+            self.product_cards.append(card)
+        
+        for card, product in zip(self.product_cards, products):
+            card.bind(product)
+        for card in self.product_cards[len(products):]:
+            card.hide()
+        
         # If no products found, display message
-        if not products:
-            no_products_label = ctk.CTkLabel(self.products_frame, text="No products available", 
-                                        font=("Arial", 16), text_color="gray")
-            no_products_label.pack(pady=30)
+        if products:
+            self.no_products_label.pack_forget()
         else:
-            # Create a frame for grid layout
-            grid_frame = ctk.CTkFrame(self.products_frame, fg_color="#f3f4f6")
-            grid_frame.pack(fill="both", expand=True)
-            
-            # Calculate how many products per row based on window width
-            # We'll use 3 products per row as default
-            products_per_row = 3
-            
-            # Layout products in a grid
-            for i, product in enumerate(products):
-                row = i // products_per_row
-                col = i % products_per_row
-                
-                # Create a white card with shadow effect
-                item_card = ctk.CTkFrame(grid_frame, fg_color="white", corner_radius=10)
-                item_card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-                
-                # Add some padding inside the card
-                inner_card = ctk.CTkFrame(item_card, fg_color="white", corner_radius=10)
-                inner_card.pack(padx=20, pady=20, fill="both", expand=True)
-                
-                # Try to load image
-                try:
-                    if product["image"]:
-                        # Convert binary data to image
-                        import io
-                        image_stream = io.BytesIO(product["image"])
-                        pil_image = Image.open(image_stream)
-                        img = ctk.CTkImage(light_image=pil_image, size=(150, 150))
-                        img_label = ctk.CTkLabel(inner_card, image=img, text="")
-                        img_label.pack(pady=10)
-                    else:
-                        # Use emoji based on product name
-                        emoji = "🍎"  # default
-                        if "apple" in product["name"].lower():
-                            emoji = "🍎"
-                        elif "banana" in product["name"].lower():
-                            emoji = "🍌"
-                        elif "broccoli" in product["name"].lower():
-                            emoji = "🥦"
-                        
-                        ctk.CTkLabel(inner_card, text=emoji, font=("Arial", 72)).pack(pady=10)
-                except Exception as e:
-                    print(f"Error loading image for {product['name']}: {e}")
-                    # Fallback to emoji
-                    emoji = "🍎"  # default
-                    if "apple" in product["name"].lower():
-                        emoji = "🍎"
-                    elif "banana" in product["name"].lower():
-                        emoji = "🍌"
-                    elif "broccoli" in product["name"].lower():
-                        emoji = "🥦"
-                    
-                    ctk.CTkLabel(inner_card, text=emoji, font=("Arial", 72)).pack(pady=10)
-                
-                # Product details
-                ctk.CTkLabel(inner_card, text=product["name"], 
-                        font=("Arial", 16, "bold"), text_color="black").pack(pady=(5, 0))
-                
-                ctk.CTkLabel(inner_card, text=product["price"], 
-                        font=("Arial", 16), text_color="black").pack(pady=(0, 10))
-                
-                # Quantity selector frame
-                quantity_frame = ctk.CTkFrame(inner_card, fg_color="white")
-                quantity_frame.pack(pady=(0, 10))
-                
-                # Decrease quantity button
-                decrease_btn = ctk.CTkButton(
-                    quantity_frame, text="-", width=30, height=30,
-                    fg_color="#d1d5db", hover_color="#9ca3af", text_color="black",
-                    command=lambda qv=f"quantity_{product['id']}": self.decrease_quantity(qv)
-                )
-                decrease_btn.pack(side="left", padx=(0, 5))
-                
-                # Quantity variable and display
-                quantity_var = ctk.StringVar(value="1")
-                quantity_label = ctk.CTkLabel(
-                    quantity_frame, textvariable=quantity_var,
-                    width=30, font=("Arial", 14, "bold")
-                )
-                quantity_label.pack(side="left", padx=5)
-                
-                # Set a tag to identify this quantity variable
-                quantity_var_id = f"quantity_{product['id']}"
-                setattr(self, quantity_var_id, quantity_var)
-                
-                # Increase quantity button
-                increase_btn = ctk.CTkButton(
-                    quantity_frame, text="+", width=30, height=30,
-                    fg_color="#d1d5db", hover_color="#9ca3af", text_color="black",
-                    command=lambda qv=quantity_var_id: self.increase_quantity(qv)
-                )
-                increase_btn.pack(side="left", padx=(5, 0))
-                
-                # Add to Cart button
-                add_cart_btn = ctk.CTkButton(
-                    inner_card, text="Add to Cart", 
-                    fg_color="#2563eb", hover_color="#1d4ed8", 
-                    font=("Arial", 14), height=35,
-                    command=lambda id=product["id"], name=product["name"], 
-                                price=product["price"], raw_price=product["raw_price"],
-                                qv=quantity_var_id: 
-                            self.add_to_cart(id, name, price, raw_price, qv)
-                )
-                add_cart_btn.pack(pady=5)
-            
-            # Configure grid column weights to make them equal width
-            for i in range(products_per_row):
-                grid_frame.columnconfigure(i, weight=1)    
+            self.no_products_label.pack(pady=30, before=self.products_grid)
+        
+        first = page_index * PRODUCTS_PAGE_SIZE + 1
+        self.page_label.configure(
+            text=f"Showing {first}-{first + len(products) - 1}" if products else ""
+        )
+        self.prev_page_button.configure(state="normal" if page_index > 0 else "disabled")
+        self.next_page_button.configure(state="normal" if has_next else "disabled")
+    
     def increase_quantity(self, quantity_var_id):
         var = getattr(self, quantity_var_id)
         current_val = int(var.get())
@@ -460,190 +434,96 @@ class UserApp:
         if current_val > 1:
             var.set(str(current_val - 1))
     
-    def fetch_products(self):
-        try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute(
-                "SELECT product_id, name, price, image, stock FROM Products WHERE stock > 0 AND status = 'active'"
-            )
-            products_db = cursor.fetchall()
-            
-            # Format products for display
-            products = []
-            for product in products_db:
-                price_formatted = f"${float(product['price']):.2f}"
-                products.append({
-                    "id": product["product_id"],
-                    "name": product["name"],
-                    "price": price_formatted,
-                    "raw_price": float(product["price"]),
-                    "image": product["image"],  # Binary data or None
-                    "stock": product["stock"]
-                })
-            
-            return products
-        except Exception as err:
-            messagebox.showerror("Database Error", str(err))
-            return []
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
-        
-    def search_products(self, search_query):
-        """Search products by name"""
-        if not search_query:
-            return self.fetch_products()
+    def load_products_page(self, search_query, page_index, after_id):
+        """One page of products plus a look-ahead row, with their thumbnails in the
+        disk cache; runs on a worker thread"""
+        return catalog.grid_page(search_query, page_index, after_id, PRODUCTS_PAGE_SIZE)
+    
+    def show_search_results(self, search_query, products):
+        self.refresh_products_display(search_query, products)
+    
+    def show_search_error(self, search_query, error):
+        print(f"Error searching for '{search_query}': {error}")
+    
+    def on_search_typed(self, event):
+        search_query = self.search_entry.get().strip()
+        if search_query.lower() == (self.product_search or "").lower():
+            # Not a change to the text (arrow keys, shift...) or back to what is shown
+            self.live_search.cancel()
+            return
         
-        try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            # Use LIKE for partial matching
-            cursor.execute(
-                "SELECT product_id, name, price, image, stock FROM Products WHERE stock > 0 AND status = 'active' AND name LIKE %s",
-                (f"%{search_query}%",)
-            )
-            products_db = cursor.fetchall()
-            
-            # Format products for display
-            products = []
-            for product in products_db:
-                price_formatted = f"${float(product['price']):.2f}"
-                products.append({
-                    "id": product["product_id"],
-                    "name": product["name"],
-                    "price": price_formatted,
-                    "raw_price": float(product["price"]),
-                    "image": product["image"],  # Binary data or None
-                    "stock": product["stock"]
-                })
-            
-            return products
-        except Exception as err:
-            messagebox.showerror("Database Error", str(err))
-            return []
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
-
+        if search_query:
+            self.live_search.schedule(search_query)
+        else:
+            # Cleared by hand: back to browsing the catalog
+            self.live_search.cancel()
+            self.refresh_products_display()
+    
     def handle_search(self):
         search_query = self.search_entry.get().strip()
-        self.refresh_products_display(search_query)
+        if search_query:
+            self.live_search.search_now(search_query)
+        else:
+            self.live_search.cancel()
+            self.refresh_products_display()
     
     def fetch_user_cart(self):
+        """Reload the cart from the database in the background"""
         if not self.current_user["user_id"]:
             return
         
-        try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            # Check if user has an active cart
-            cursor.execute(
-                "SELECT cart_id FROM Carts WHERE user_id = %s AND status = 'active'",
-                (self.current_user["user_id"],)
-            )
-            
-            cart = cursor.fetchone()
-            
-            if cart:
-                # Fetch cart items
-                cursor.execute(
-                    """
-                    SELECT ci.cart_item_id, p.product_id, p.name, p.price, ci.quantity 
-                    FROM CartItems ci
-                    JOIN Products p ON ci.product_id = p.product_id
-                    WHERE ci.cart_id = %s
-                    """,
-                    (cart["cart_id"],)
-                )
-                
-                cart_items_db = cursor.fetchall()
-                
-                # Clear existing cart display
-                self.empty_cart_label.pack_forget()
-                for frame_info in self.cart_item_frames.values():
-                    frame_info["frame"].destroy()
-                
-                self.cart_items.clear()
-                self.cart_item_frames.clear()
-                
-                # If no items, show empty cart message
-                if not cart_items_db:
-                    self.empty_cart_label.pack(pady=20)
-                    self.update_cart_total()
-                    return
-                
-                # Add items to cart
-                for item in cart_items_db:
-                    price_str = f"${float(item['price']):.2f}"
-                    self.cart_items[item["name"]] = {
-                        "name": item["name"],
-                        "price": price_str,
-                        "raw_price": float(item["price"]),
-                        "quantity": item["quantity"],
-                        "product_id": item["product_id"],
-                        "cart_item_id": item["cart_item_id"]
-                    }
-                    
-                    # Create visual representation
-                    self.create_cart_item_display(item["name"], price_str, item["quantity"], item["product_id"])
-                
-                self.update_cart_total()
-            else:
-                # No active cart, show empty cart
-                self.empty_cart_label.pack(pady=20)
-                self.update_cart_total()
-            
-        except Exception as err:
-            messagebox.showerror("Database Error", str(err))
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
+        if self.cart_task:
+            self.cart_task.cancel()
+        self.cart_task = tasks.run(cart.load_cart, self.current_user["user_id"],
+                                   on_done=self.show_cart, owner=self.cart_container,
+                                   loading=self.cart_container)
+    
+    @ui_profiler.timed()
+    def show_cart(self, loaded_cart):
+        cart_id, cart_items_db = loaded_cart
+        self.active_cart_id = cart_id
+        
+        # Clear existing cart display
+        self.empty_cart_label.pack_forget()
+        for frame_info in self.cart_item_frames.values():
+            frame_info["frame"].destroy()
+        
+        self.cart_items.clear()
+        self.cart_item_frames.clear()
+        
+        # If no cart or no items, show empty cart message
+        if not cart_items_db:
+            self.empty_cart_label.pack(pady=20)
+            self.update_cart_total()
+            return
+        
+        # Add items to cart
+        for item in cart_items_db:
+            price_str = f"${float(item['price']):.2f}"
+            self.cart_items[item["name"]] = {
+                "name": item["name"],
+                "price": price_str,
+                "raw_price": float(item["price"]),
+                "quantity": item["quantity"],
+                "product_id": item["product_id"],
+                "cart_item_id": item["cart_item_id"]
+            }
+            
+            # Create visual representation
+            self.create_cart_item_display(item["name"], price_str, item["quantity"], item["product_id"])
+        
+        self.update_cart_total()
     
     def get_active_cart_id(self):
+        if self.active_cart_id:
+            return self.active_cart_id
+        
         try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            # Check if user has an active cart
-            cursor.execute(
-                "SELECT cart_id FROM Carts WHERE user_id = %s AND status = 'active'",
-                (self.current_user["user_id"],)
-            )
-            
-            cart = cursor.fetchone()
-            
-            if cart:
-                return cart["cart_id"]
-            else:
-                # Create a new cart
-                cursor.execute(
-                    "INSERT INTO Carts (user_id, created_at, status) VALUES (%s, %s, %s)",
-                    (self.current_user["user_id"], datetime.datetime.now(), "active")
-                )
-                
-                connection.commit()
-                
-                # Get the new cart ID
-                cursor.execute(
-                    "SELECT LAST_INSERT_ID() as cart_id"
-                )
-                
-                new_cart = cursor.fetchone()
-                return new_cart["cart_id"]
+            self.active_cart_id = cart.active_cart_id(self.current_user["user_id"])
+            return self.active_cart_id
         except Exception as err:
             messagebox.showerror("Database Error", str(err))
             return None
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     def add_to_cart(self, product_id, product_name, product_price, raw_price, quantity_var_id):
         # Get the quantity from the quantity variable
@@ -657,92 +537,46 @@ class UserApp:
         # Database operations
         if self.current_user["user_id"]:
             try:
-                connection = connect_db()
-                cursor = connection.cursor(dictionary=True)
-                
-                # Get or create active cart
-                cart_id = self.get_active_cart_id()
-                
-                if not cart_id:
-                    messagebox.showerror("Error", "Could not create a cart. Please try again.")
-                    return
-                
-                # Check if item already exists in cart
-                cursor.execute(
-                    "SELECT cart_item_id, quantity FROM CartItems WHERE cart_id = %s AND product_id = %s",
-                    (cart_id, product_id)
+                cart_id, cart_item_id, inserted = cart.add_item(
+                    self.current_user["user_id"], product_id, quantity, self.active_cart_id
                 )
-                
-                existing_item = cursor.fetchone()
-                
-                if existing_item:
-                    # Update quantity
-                    new_quantity = existing_item["quantity"] + quantity
-                    cursor.execute(
-                        "UPDATE CartItems SET quantity = %s WHERE cart_item_id = %s",
-                        (new_quantity, existing_item["cart_item_id"])
-                    )
-                    
-                    # Also update in our local cart
-                    if product_name in self.cart_items:
-                        self.cart_items[product_name]["quantity"] = new_quantity
-                        self.cart_items[product_name]["cart_item_id"] = existing_item["cart_item_id"]
-                        quantity_label = self.cart_item_frames[product_name]["quantity_label"]
-                        quantity_label.configure(text=f"Qty: {new_quantity}")
-                    else:
-                        # This would be an unusual state, let's fetch the cart again to sync
-                        self.fetch_user_cart()
-                else:
-                    # Check product stock before adding
-                    cursor.execute(
-                        "SELECT stock FROM Products WHERE product_id = %s",
-                        (product_id,)
-                    )
-                    
-                    product = cursor.fetchone()
-                    if not product or product["stock"] < quantity:
-                        available = product["stock"] if product else 0
-                        messagebox.showwarning("Stock Limit", 
-                                               f"Cannot add {quantity} of {product_name}. Only {available} available.")
-                        return
-                    
-                    # Add new item to cart
-                    cursor.execute(
-                        "INSERT INTO CartItems (cart_id, product_id, quantity) VALUES (%s, %s, %s)",
-                        (cart_id, product_id, quantity)
-                    )
-                    
-                    # Get the inserted item's ID
-                    cursor.execute(
-                        "SELECT LAST_INSERT_ID() as cart_item_id"
-                    )
-                    
-                    result = cursor.fetchone()
-                    cart_item_id = result["cart_item_id"]
-                    
-                    # Add to local cart
-                    self.cart_items[product_name] = {
-                        "name": product_name,
-                        "price": product_price,
-                        "raw_price": raw_price,
-                        "quantity": quantity,
-                        "product_id": product_id,
-                        "cart_item_id": cart_item_id
-                    }
-                    
-                    # Create UI element
-                    self.create_cart_item_display(product_name, product_price, quantity, product_id)
-                
-                # Commit changes
-                connection.commit()
-                
+            except cart.StockLimitError as err:
+                messagebox.showwarning("Stock Limit", 
+                                       f"Cannot add {quantity} of {product_name}. Only {err.available} available.")
+                return
             except Exception as err:
                 messagebox.showerror("Database Error", str(err))
                 return
-            finally:
-                if connection and connection.is_connected():
-                    cursor.close()
-                    connection.close()
+            
+            stale_cart = self.active_cart_id is not None and cart_id != self.active_cart_id
+            self.active_cart_id = cart_id
+            
+            if stale_cart:
+                # The cached cart was checked out elsewhere; resync with the new one
+                self.fetch_user_cart()
+            elif not inserted and product_name in self.cart_items:
+                # Update quantity in our local cart
+                new_quantity = self.cart_items[product_name]["quantity"] + quantity
+                self.cart_items[product_name]["quantity"] = new_quantity
+                self.cart_items[product_name]["cart_item_id"] = cart_item_id
+                quantity_label = self.cart_item_frames[product_name]["quantity_label"]
+                quantity_label.configure(text=f"Qty: {new_quantity}")
+            elif not inserted:
+                # This would be an unusual state, let's fetch the cart again to sync
+                self.fetch_user_cart()
+            else:
+                # Add to local cart
+                self.cart_items[product_name] = {
+                    "name": product_name,
+                    "price": product_price,
+                    "raw_price": raw_price,
+                    "quantity": quantity,
+                    "product_id": product_id,
+                    "cart_item_id": cart_item_id
+                }
+                
+                # Create UI element
+                self.create_cart_item_display(product_name, product_price, quantity, product_id)
         else:
             # No user logged in, display warning
             messagebox.showwarning("Login Required", "Please log in to add items to your cart.")
@@ -765,53 +599,34 @@ class UserApp:
         
         # Update in database
         if self.current_user["user_id"] and product_name in self.cart_items:
-            try:
-                connection = connect_db()
-                cursor = connection.cursor()
-                
-                # Check available stock
-                cursor.execute(
-                    "SELECT stock FROM Products WHERE product_id = %s",
-                    (product_id,)
-                )
-                product = cursor.fetchone()
-                
-                if not product or product[0] < new_quantity:
-                    available = product[0] if product else 0
+            # Get cart_item_id
+            cart_item_id = self.cart_items[product_name].get("cart_item_id")
+            
+            if cart_item_id:
+                try:
+                    # Stock check and update happen in one statement
+                    cart.set_item_quantity(cart_item_id, product_id, new_quantity)
+                except cart.StockLimitError as err:
                     messagebox.showwarning("Stock Limit", 
-                                          f"Cannot update to {new_quantity}. Only {available} available.")
+                                          f"Cannot update to {new_quantity}. Only {err.available} available.")
+                    return False
+                except Exception as err:
+                    messagebox.showerror("Database Error", str(err))
                     return False
                 
-                # Get cart_item_id
-                cart_item_id = self.cart_items[product_name].get("cart_item_id")
+                # Update local cart item
+                self.cart_items[product_name]["quantity"] = new_quantity
                 
-                if cart_item_id:
-                    cursor.execute(
-                        "UPDATE CartItems SET quantity = %s WHERE cart_item_id = %s",
-                        (new_quantity, cart_item_id)
+                # Update UI
+                if product_name in self.cart_item_frames:
+                    self.cart_item_frames[product_name]["quantity_label"].configure(
+                        text=f"Qty: {new_quantity}"
                     )
-                    connection.commit()
-                    
-                    # Update local cart item
-                    self.cart_items[product_name]["quantity"] = new_quantity
-                    
-                    # Update UI
-                    if product_name in self.cart_item_frames:
-                        self.cart_item_frames[product_name]["quantity_label"].configure(
-                            text=f"Qty: {new_quantity}"
-                        )
-                    
-                    # Update total
-                    self.update_cart_total()
-                    
-                return True
-            except Exception as err:
-                messagebox.showerror("Database Error", str(err))
-                return False
-            finally:
-                if connection and connection.is_connected():
-                    cursor.close()
-                    connection.close()
+                
+                # Update total
+                self.update_cart_total()
+                
+            return True
                     
         return False
     
@@ -869,127 +684,81 @@ class UserApp:
             messagebox.showinfo("Empty Cart", "Your cart is empty.")
             return
         
-        try:
-            connection = connect_db()
-            cursor = connection.cursor()
-            
-            # Get the active cart
-            cart_id = self.get_active_cart_id()
-            
-            if not cart_id:
-                messagebox.showerror("Error", "Could not find your cart. Please try again.")
-                return
-            
-            # Calculate total amount directly from the database
-            cursor.execute(
-                """
-                SELECT SUM(p.price * ci.quantity) as total
-                FROM CartItems ci
-                JOIN Products p ON ci.product_id = p.product_id
-                WHERE ci.cart_id = %s
-                """,
-                (cart_id,)
-            )
-            result = cursor.fetchone()
-            total_amount = result[0] if result[0] else 0
-            
-            # Update cart status to 'completed'
-            cursor.execute(
-                "UPDATE Carts SET status = 'completed' WHERE cart_id = %s",
-                (cart_id,)
-            )
-            
-            # Create an order - ensure cart_id is properly stored
-            cursor.execute(
-                """
-                INSERT INTO Orders (user_id, cart_id, order_date, total_amount, status) 
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (self.current_user["user_id"], cart_id, datetime.datetime.now(), total_amount, "completed")
-            )
-            
-            # Get the order ID
-            cursor.execute("SELECT LAST_INSERT_ID()")
-            order_id = cursor.fetchone()[0]
-            
-            # Update product inventory (reduce stock)
-            cursor.execute(
-                """
-                UPDATE Products p
-                JOIN CartItems ci ON p.product_id = ci.product_id
-                SET p.stock = p.stock - ci.quantity
-                WHERE ci.cart_id = %s
-                """,
-                (cart_id,)
-            )
-            
-            connection.commit()
-            
-            messagebox.showinfo("Success", f"Your order #{order_id} has been placed successfully!")
-            
-            # Clear cart display
-            self.empty_cart_label.pack(pady=20)
-            for frame_info in self.cart_item_frames.values():
-                frame_info["frame"].destroy()
-            
-            self.cart_items.clear()
-            self.cart_item_frames.clear()
-            self.update_cart_total()
-            
-            # Refresh orders display
-            self.refresh_previous_orders()
-            
-        except Exception as err:
+        # Get the active cart
+        cart_id = self.get_active_cart_id()
+        
+        if not cart_id:
+            messagebox.showerror("Error", "Could not find your cart. Please try again.")
+            return
+        
+        # Locks the products, checks stock and places the order in one transaction;
+        # retries on lock conflicts can take a moment, so it runs in the background
+        self.checkout_btn.configure(state="disabled", text="Placing order...")
+        tasks.run(orders.checkout, self.current_user["user_id"], cart_id,
+                  on_done=self.order_placed, on_error=self.checkout_failed, owner=self.checkout_btn)
+    
+    def checkout_failed(self, err):
+        self.checkout_btn.configure(text="Proceed to Checkout")
+        self.update_cart_total()
+        
+        if isinstance(err, orders.InsufficientStockError):
+            messagebox.showwarning("Stock Limit", str(err))
+        elif isinstance(err, orders.CheckoutError):
+            # Cart was emptied or checked out elsewhere; show what the database has
+            messagebox.showerror("Checkout Error", str(err))
+            self.active_cart_id = None
+            self.fetch_user_cart()
+        else:
             print(f"Error completing purchase: {err}")
             messagebox.showerror("Database Error", str(err))
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
-    def fetch_previous_orders(self):
-        if not self.current_user["user_id"]:
-            return []
+    def order_placed(self, order):
+        order_id, _ = order
+        self.checkout_btn.configure(text="Proceed to Checkout")
         
-        try:
-            connection = connect_db()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute(
-                """
-                SELECT order_id, order_date, total_amount, status
-                FROM Orders
-                WHERE user_id = %s
-                ORDER BY order_date DESC
-                LIMIT 5
-                """,
-                (self.current_user["user_id"],)
-            )
-            
-            return cursor.fetchall()
-        except Exception as err:
-            messagebox.showerror("Database Error", str(err))
-            return []
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
+        # The completed cart can't take new items, and the order changed stock levels
+        self.active_cart_id = None
+        catalog.page_cache.invalidate()
+        
+        messagebox.showinfo("Success", f"Your order #{order_id} has been placed successfully!")
+        
+        # Clear cart display
+        self.empty_cart_label.pack(pady=20)
+        for frame_info in self.cart_item_frames.values():
+            frame_info["frame"].destroy()
+        
+        self.cart_items.clear()
+        self.cart_item_frames.clear()
+        self.update_cart_total()
+        
+        # Refresh orders display
+        self.refresh_previous_orders()
     
     def refresh_previous_orders(self):
+        """Reload the previous orders in the background"""
+        if not self.current_user["user_id"]:
+            self.show_previous_orders([])
+            return
+        
+        if self.orders_task:
+            self.orders_task.cancel()
+        self.orders_task = tasks.run(orders.recent_orders, self.current_user["user_id"],
+                                     on_done=self.show_previous_orders, owner=self.orders_container,
+                                     loading=self.orders_container)
+    
+    @ui_profiler.timed()
+    def show_previous_orders(self, previous_orders):
         # Clear existing orders
         for widget in self.orders_container.winfo_children():
             widget.destroy()
         
-        # Fetch and display orders
-        orders = self.fetch_previous_orders()
-        
-        if not orders:
+        if not previous_orders:
             no_orders_label = ctk.CTkLabel(self.orders_container, text="No previous orders", 
                                          font=("Arial", 14), text_color="gray")
             no_orders_label.pack(pady=20)
             return
         
-        for order in orders:
+        for order in previous_orders:
             order_row = ctk.CTkFrame(self.orders_container, fg_color="white")
             order_row.pack(fill="x", padx=20, pady=5)
             
@@ -1014,21 +783,118 @@ class UserApp:
             view_btn.pack(side="right", padx=10, pady=10)
     
     def view_order_details(self, order_id):
-        # Make sure current user info is saved to file
-        write_login_file(self.current_user["username"], self.current_user["role"])
-        
-        # Launch the order details window
-        self.root.withdraw()  # Hide current window
-        subprocess.run(["python", os.path.join(os.path.dirname(__file__), "order_details.py"), str(order_id), self.current_user["username"]])
-        self.root.deiconify()  # Show window again when order details is closed
+        router.navigate("order_details", order_id=order_id, username=self.current_user["username"])
     
     def logout(self):
-        # Remove the user file when logging out
-        if os.path.exists("current_user.txt"):
-            os.remove("current_user.txt")
+        session.logout()
+        router.navigate("login")
+
+def product_emoji(name):
+    """Placeholder shown on cards for products without an image"""
+    name = name.lower()
+    if "banana" in name:
+        return "🍌"
+    elif "broccoli" in name:
+        return "🥦"
+    return "🍎"
+
+class ProductCard:
+    """A product card whose widgets are reused for whichever product it is bound to"""
+    def __init__(self, parent, user_app):
+        self.user_app = user_app
+        self.product = None
+        self.quantity_var_id = None
+        
+        # Create a white card with shadow effect
+        self.frame = ctk.CTkFrame(parent, fg_color="white", corner_radius=10)
+        
+        # Add some padding inside the card
+        inner_card = ctk.CTkFrame(self.frame, fg_color="white", corner_radius=10)
+        inner_card.pack(padx=20, pady=20, fill="both", expand=True)
+        
+        # Thumbnail, or an emoji when the product has no image
+        media_frame = ctk.CTkFrame(inner_card, fg_color="white", width=150, height=150)
+        media_frame.pack(pady=10)
+        media_frame.pack_propagate(False)
+        self.image_label = ctk.CTkLabel(media_frame, text="")
+        self.emoji_label = ctk.CTkLabel(media_frame, text="", font=("Arial", 72))
+        
+        # Product details
+        self.name_label = ctk.CTkLabel(inner_card, text="", 
+                                font=("Arial", 16, "bold"), text_color="black")
+        self.name_label.pack(pady=(5, 0))
+        
+        self.price_label = ctk.CTkLabel(inner_card, text="", 
+                                font=("Arial", 16), text_color="black")
+        self.price_label.pack(pady=(0, 10))
+        
+        # Quantity selector frame
+        quantity_frame = ctk.CTkFrame(inner_card, fg_color="white")
+        quantity_frame.pack(pady=(0, 10))
+        
+        ctk.CTkButton(
+            quantity_frame, text="-", width=30, height=30,
+            fg_color="#d1d5db", hover_color="#9ca3af", text_color="black",
+            command=lambda: self.user_app.decrease_quantity(self.quantity_var_id)
+        ).pack(side="left", padx=(0, 5))
+        
+        self.quantity_var = ctk.StringVar(value="1")
+        ctk.CTkLabel(
+            quantity_frame, textvariable=self.quantity_var,
+            width=30, font=("Arial", 14, "bold")
+        ).pack(side="left", padx=5)
+        
+        ctk.CTkButton(
+            quantity_frame, text="+", width=30, height=30,
+            fg_color="#d1d5db", hover_color="#9ca3af", text_color="black",
+            command=lambda: self.user_app.increase_quantity(self.quantity_var_id)
+        ).pack(side="left", padx=(5, 0))
+        
+        # Add to Cart button
+        ctk.CTkButton(
+            inner_card, text="Add to Cart", 
+            fg_color="#2563eb", hover_color="#1d4ed8", 
+            font=("Arial", 14), height=35,
+            command=self.add_to_cart
+        ).pack(pady=5)
+    
+    def bind(self, product):
+        """Show the given product on this card"""
+        # The app looks quantity variables up by name (quantity_<product_id>)
+        if self.quantity_var_id and getattr(self.user_app, self.quantity_var_id, None) is self.quantity_var:
+            delattr(self.user_app, self.quantity_var_id)
+        self.product = product
+        self.quantity_var_id = f"quantity_{product['id']}"
+        setattr(self.user_app, self.quantity_var_id, self.quantity_var)
+        self.quantity_var.set("1")
+        
+        self.name_label.configure(text=product["name"])
+        self.price_label.configure(text=product["price"])
         
-        self.root.destroy()
-        subprocess.run(["python", os.path.join(os.path.dirname(os.path.dirname(__file__)), "login_signup.py")])
+        try:
+            img = self.user_app.thumbnails.get(product["image_hash"])
+        except Exception as e:
+            print(f"Error loading image for {product['name']}: {e}")
+            img = None
+        
+        if img:
+            self.emoji_label.pack_forget()
+            self.image_label.configure(image=img)
+            self.image_label.pack(expand=True)
+        else:
+            self.image_label.pack_forget()
+            self.emoji_label.configure(text=product_emoji(product["name"]))
+            self.emoji_label.pack(expand=True)
+        
+        self.frame.grid()
+    
+    def hide(self):
+        self.frame.grid_remove()
+    
+    def add_to_cart(self):
+        product = self.product
+        self.user_app.add_to_cart(product["id"], product["name"], product["price"],
+                                  product["raw_price"], self.quantity_var_id)
 
 class UserNavigationExtended(UserNavigation):
     def __init__(self, parent_frame, user_app):
@@ -1051,20 +917,12 @@ if __name__ == "__main__":
     ctk.set_default_color_theme("blue")
     
     root = ctk.CTk()
+    router.init(root)
     
     # Check if username was provided from command line
-    if len(sys.argv) > 1:
-        username = sys.argv[1]
-    else:
-        # Try to read from file
-        username, _ = read_login_file()
-        if not username:
-            # No user info available
-            messagebox.showerror("Authentication Error", "User not found. Please login again.")
-            root.destroy()
-            subprocess.run(["python", os.path.join(os.path.dirname(os.path.dirname(__file__)), "login_signup.py")])
-            sys.exit(1)
+    username = sys.argv[1] if len(sys.argv) > 1 else None
+    if username:
+        session.login(username)
     
-    app = UserApp(root, username)
+    router.show("user_dashboard", username=username)
     root.mainloop()
-    
\ No newline at end of file
@@ -1,7 +1,6 @@
 import hashlib
 import os
 import re
-from tkinter import messagebox
 
 # User session management
 def write_login_file(username, role="user"):